@@ -1,5 +1,4 @@
 from src.painel import iniciar_painel
-from src.data_manager import DataManager
 from src.icon import apply_windows_app_user_model_id
 from src.version import APP_VERSION
 import os
@@ -26,12 +25,5 @@ if __name__ == '__main__':
     apply_windows_app_user_model_id()
     if getattr(sys, 'frozen', False):
         criar_atalho_na_area_de_trabalho()
-    try:
-        DataManager().executar_validacao_inicial()
-    except Exception:
-        pass
-    try:
-        DataManager().backup_auto_se_versao_mudou(APP_VERSION)
-    except Exception:
-        pass
-    iniciar_painel()
+    # Validação e backup automático rodam em segundo plano após a janela abrir
+    iniciar_painel(versao_tarefas_iniciais=APP_VERSION)
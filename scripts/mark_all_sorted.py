@@ -1,21 +1,25 @@
-import json
 import os
+import sys
 from datetime import datetime
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-FAMILIAS = os.path.join(BASE_DIR, "dados", "familias.json")
+
+sys.path.insert(0, BASE_DIR)
+from src.persistencia import criar_backend
 
 def main():
     hoje = datetime.now().strftime("%d/%m/%Y")
-    with open(FAMILIAS, "r", encoding="utf-8") as f:
-        familias = json.load(f)
-    for f in familias:
-        f["sorteado"] = True
-        f["data_sorteio"] = hoje
-    tmp = FAMILIAS + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(familias, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, FAMILIAS)
+    # O mesmo backend que o app usa: SQLite quando dados/familias.db existir
+    backend = criar_backend(BASE_DIR)
+    try:
+        familias = backend.carregar_familias()
+        for f in familias:
+            f["sorteado"] = True
+            f["data_sorteio"] = hoje
+        backend.substituir_familias(familias)
+    finally:
+        if hasattr(backend, "fechar"):
+            backend.fechar()
     print(f"Atualizadas {len(familias)} famílias como sorteadas em {hoje}.")
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import os
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+sys.path.insert(0, BASE_DIR)
+from src.data_manager import DataManager
+from src.persistencia_sqlite import migrar_json_para_sqlite
+
+def main():
+    # Uso: python scripts/migrar_sqlite.py [pasta de dados] [--substituir]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    base = args[0] if args else DataManager().base_path_data
+    total = migrar_json_para_sqlite(base, substituir="--substituir" in sys.argv)
+    print(f"Migradas {total} famílias para {os.path.join(base, 'dados', 'familias.db')}.")
+
+if __name__ == "__main__":
+    main()
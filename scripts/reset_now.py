@@ -1,23 +1,25 @@
-import json
 import os
+import sys
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-FAMILIAS = os.path.join(BASE_DIR, "dados", "familias.json")
-SORTEIO = os.path.join(BASE_DIR, "dados", "sorteio.json")
+
+sys.path.insert(0, BASE_DIR)
+from src.persistencia import criar_backend
 
 def main():
-    with open(FAMILIAS, "r", encoding="utf-8") as f:
-        familias = json.load(f)
-    for f in familias:
-        f["sorteado"] = False
-        if "data_sorteio" in f:
-            f.pop("data_sorteio")
-    tmp = FAMILIAS + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(familias, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, FAMILIAS)
-    if os.path.exists(SORTEIO):
-        os.remove(SORTEIO)
+    # O mesmo backend que o app usa: SQLite quando dados/familias.db existir
+    backend = criar_backend(BASE_DIR)
+    try:
+        familias = backend.carregar_familias()
+        for f in familias:
+            f["sorteado"] = False
+            if "data_sorteio" in f:
+                f.pop("data_sorteio")
+        backend.substituir_familias(familias)
+        backend.apagar_ultimo()
+    finally:
+        if hasattr(backend, "fechar"):
+            backend.fechar()
     print(f"Reset concluído: {len(familias)} famílias definidas como aguardando.")
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+import os
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+sys.path.insert(0, BASE_DIR)
+from src.backup import RepositorioBackup
+from src.data_manager import DataManager
+
+def main():
+    # Uso: python scripts/restaurar_backup.py [--pasta=<dados>] [nome do backup] [destino]
+    # Sem nome, lista os backups disponíveis. Sem destino, restaura sobre a pasta de dados.
+    pasta = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--pasta=")), None)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    base = pasta or DataManager().base_path_data
+    repositorio = RepositorioBackup(base)
+    if not args:
+        for nome in repositorio.listar():
+            manifesto = repositorio.ler_manifesto(nome)
+            print(f"{nome}\t{manifesto.get('criado_em')}\t{len(manifesto.get('arquivos', []))} arquivos")
+        return
+    nome = args[0]
+    destino = args[1] if len(args) > 1 else None
+    if destino is None:
+        dm = DataManager(base_path_override=base)
+        if not dm.restaurar_backup(nome):
+            sys.exit(f"Falha ao restaurar {nome}.")
+        print(f"Backup {nome} restaurado em {base}.")
+        return
+    total = repositorio.restaurar(nome, destino, limpar=())
+    print(f"{total} arquivos do backup {nome} restaurados em {destino}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import datetime
+
+# Só JSON/texto é comprimido; fotos (.jpg/.jpeg/.png) e o resto já vêm
+# comprimidos ou não compensam e são guardados como estão.
+EXTENSOES_COMPRIMIDAS = {".json", ".journal", ".txt", ".log", ".csv", ".md", ".descartado", ".bak"}
+
+
+class BackupCancelado(Exception):
+    pass
+
+
+class TrabalhoBackup:
+    """Controle de um backup em andamento: cancelamento e progresso.
+
+    Pode ser consultado e cancelado de outra thread; o backup para no
+    próximo arquivo e não grava manifesto.
+    """
+
+    def __init__(self):
+        self._cancelar = threading.Event()
+        self.arquivos_feitos = 0
+        self.arquivos_total = 0
+        self.bytes_feitos = 0
+        self.bytes_total = 0
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelar.is_set()
+
+
+class RepositorioBackup:
+    """Backups incrementais com deduplicação em `backups/`.
+
+    Cada arquivo é guardado uma única vez em `backups/objetos/`, com o nome
+    do seu sha256 (`.z` quando comprimido, conforme `EXTENSOES_COMPRIMIDAS`);
+    cada backup é só um manifesto em `backups/manifestos/`
+    listando caminho, hash, tamanho e mtime dos arquivos. Arquivos com mesmo
+    tamanho e mtime do backup anterior nem são relidos, então o custo de um
+    backup acompanha o que mudou, não o tamanho da biblioteca de fotos.
+    """
+
+    def __init__(self, base_dir, backups_dir=None):
+        self.base_dir = base_dir
+        self.backups_dir = backups_dir or os.path.join(base_dir, "backups")
+        self.objetos_dir = os.path.join(self.backups_dir, "objetos")
+        self.manifestos_dir = os.path.join(self.backups_dir, "manifestos")
+
+    # Objetos
+
+    def _caminho_objeto(self, sha, comprimido=False):
+        return os.path.join(self.objetos_dir, sha[:2], sha + (".z" if comprimido else ""))
+
+    def _objeto_existente(self, sha):
+        for comprimido in (False, True):
+            caminho = self._caminho_objeto(sha, comprimido)
+            if os.path.exists(caminho):
+                return caminho
+        return None
+
+    def _guardar_objeto(self, origem):
+        """Copia `origem` para o repositório calculando o hash na mesma leitura."""
+        os.makedirs(self.objetos_dir, exist_ok=True)
+        comprimir = os.path.splitext(origem)[1].lower() in EXTENSOES_COMPRIMIDAS
+        h = hashlib.sha256()
+        tmp_path = os.path.join(self.objetos_dir, f".{os.getpid()}_{id(h)}.tmp")
+        try:
+            compressor = zlib.compressobj(6) if comprimir else None
+            with open(origem, "rb") as src, open(tmp_path, "wb") as dst:
+                for bloco in iter(lambda: src.read(1024 * 1024), b""):
+                    h.update(bloco)
+                    dst.write(compressor.compress(bloco) if compressor else bloco)
+                if compressor:
+                    dst.write(compressor.flush())
+            sha = h.hexdigest()
+            if self._objeto_existente(sha):
+                os.remove(tmp_path)
+                return sha, False
+            destino = self._caminho_objeto(sha, comprimir)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(tmp_path, destino)
+            return sha, True
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # Manifestos
+
+    def _caminho_manifesto(self, nome):
+        return os.path.join(self.manifestos_dir, f"{nome}.json")
+
+    def listar(self):
+        """Nomes dos backups, do mais antigo ao mais recente."""
+        if not os.path.isdir(self.manifestos_dir):
+            return []
+        nomes = [os.path.splitext(n)[0] for n in os.listdir(self.manifestos_dir) if n.endswith(".json")]
+        return sorted(nomes, key=lambda n: (os.path.getmtime(self._caminho_manifesto(n)), n))
+
+    def ler_manifesto(self, nome):
+        with open(self._caminho_manifesto(nome), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def nome_disponivel(self, nome):
+        if not os.path.exists(self._caminho_manifesto(nome)):
+            return nome
+        i = 1
+        while os.path.exists(self._caminho_manifesto(f"{nome}_{i}")):
+            i += 1
+        return f"{nome}_{i}"
+
+    def _ultimo_manifesto(self):
+        for nome in reversed(self.listar()):
+            try:
+                return {a["caminho"]: a for a in self.ler_manifesto(nome).get("arquivos", [])}
+            except Exception:
+                continue
+        return {}
+
+    def _arquivos(self):
+        backups_abs = os.path.abspath(self.backups_dir)
+        arquivos = []
+        for dirpath, dirnames, filenames in os.walk(self.base_dir):
+            if os.path.abspath(dirpath) == backups_abs or os.path.basename(dirpath).lower() == "backups":
+                dirnames[:] = []
+                continue
+            for fn in filenames:
+                absf = os.path.join(dirpath, fn)
+                arquivos.append((absf, os.path.relpath(absf, self.base_dir).replace("\\", "/")))
+        return arquivos
+
+    def criar(self, nome, versao=None, ao_progresso=None, trabalho=None):
+        """Cria o backup `nome`; retorna o nome efetivamente usado.
+
+        `ao_progresso(arquivos_feitos, arquivos_total, bytes_feitos, bytes_total)`
+        é chamado a cada arquivo. Com `trabalho` cancelado, levanta
+        `BackupCancelado` sem gravar o manifesto.
+        """
+        trabalho = trabalho or TrabalhoBackup()
+        nome = self.nome_disponivel(nome)
+        anterior = self._ultimo_manifesto()
+        arquivos = []
+        for absf, relf in self._arquivos():
+            try:
+                arquivos.append((absf, relf, os.stat(absf)))
+            except OSError:
+                continue
+        trabalho.arquivos_total = len(arquivos)
+        trabalho.bytes_total = sum(st.st_size for _, _, st in arquivos)
+        entradas = []
+        novos = 0
+        for absf, relf, st in arquivos:
+            if trabalho.cancelado:
+                raise BackupCancelado(nome)
+            previa = anterior.get(relf)
+            if (previa and previa.get("tamanho") == st.st_size and previa.get("mtime_ns") == st.st_mtime_ns
+                    and self._objeto_existente(previa["sha256"])):
+                sha = previa["sha256"]
+            else:
+                try:
+                    sha, novo = self._guardar_objeto(absf)
+                except FileNotFoundError:
+                    continue  # apagado durante o backup
+                novos += int(novo)
+            entradas.append({"caminho": relf, "sha256": sha, "tamanho": st.st_size, "mtime_ns": st.st_mtime_ns})
+            trabalho.arquivos_feitos += 1
+            trabalho.bytes_feitos += st.st_size
+            if ao_progresso is not None:
+                ao_progresso(trabalho.arquivos_feitos, trabalho.arquivos_total, trabalho.bytes_feitos, trabalho.bytes_total)
+
+        manifesto = {
+            "nome": nome,
+            "versao": versao,
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "arquivos": entradas,
+        }
+        os.makedirs(self.manifestos_dir, exist_ok=True)
+        tmp_path = self._caminho_manifesto(nome) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, ensure_ascii=False)
+        os.replace(tmp_path, self._caminho_manifesto(nome))
+        logging.info(f"Backup {nome}: {len(entradas)} arquivos, {novos} novos objetos")
+        return nome
+
+    def restaurar(self, nome, destino=None, limpar=("dados",)):
+        """Recria em `destino` (padrão: a pasta de dados) os arquivos do backup `nome`.
+
+        Todos os objetos são extraídos e conferidos pelo hash em arquivos
+        `.restaurando` antes de qualquer arquivo ser substituído: um objeto
+        ausente ou corrompido deixa o destino como estava. Só então os
+        arquivos são trocados e, nas pastas de `limpar`, os que não existiam
+        no backup (ex.: um diário posterior) são apagados. Retorna a
+        quantidade de arquivos restaurados.
+        """
+        destino = destino or self.base_dir
+        manifesto = self.ler_manifesto(nome)
+        entradas = manifesto.get("arquivos", [])
+        extraidos = []
+        try:
+            for entrada in entradas:
+                alvo = os.path.join(destino, *entrada["caminho"].split("/"))
+                tmp_path = os.path.join(os.path.dirname(alvo), f".{os.path.basename(alvo)}.restaurando")
+                self._extrair_objeto(entrada, tmp_path)
+                extraidos.append((tmp_path, alvo))
+        except BaseException:
+            for tmp_path, _ in extraidos:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            raise
+        for tmp_path, alvo in extraidos:
+            os.replace(tmp_path, alvo)
+        caminhos = {a["caminho"] for a in entradas}
+        for pasta in limpar:
+            for dirpath, dirnames, filenames in os.walk(os.path.join(destino, pasta)):
+                for fn in filenames:
+                    absf = os.path.join(dirpath, fn)
+                    if os.path.relpath(absf, destino).replace("\\", "/") not in caminhos:
+                        os.remove(absf)
+        return len(entradas)
+
+    def _extrair_objeto(self, entrada, tmp_path):
+        """Grava em `tmp_path` o conteúdo do objeto de `entrada`, conferindo o hash."""
+        objeto = self._objeto_existente(entrada["sha256"])
+        if objeto is None:
+            raise FileNotFoundError(f"Objeto ausente no backup: {entrada['caminho']}")
+        os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+        h = hashlib.sha256()
+        descompressor = zlib.decompressobj() if objeto.endswith(".z") else None
+        with open(objeto, "rb") as src, open(tmp_path, "wb") as dst:
+            for bloco in iter(lambda: src.read(1024 * 1024), b""):
+                if descompressor:
+                    bloco = descompressor.decompress(bloco)
+                h.update(bloco)
+                dst.write(bloco)
+            if descompressor:
+                resto = descompressor.flush()
+                h.update(resto)
+                dst.write(resto)
+        if h.hexdigest() != entrada["sha256"]:
+            os.remove(tmp_path)
+            raise ValueError(f"Objeto corrompido no backup: {entrada['caminho']}")
+
+    def remover(self, nome):
+        os.remove(self._caminho_manifesto(nome))
+
+    def coletar_lixo(self):
+        """Apaga objetos que nenhum manifesto referencia; retorna quantos."""
+        usados = set()
+        for nome in self.listar():
+            usados.update(a["sha256"] for a in self.ler_manifesto(nome).get("arquivos", []))
+        removidos = 0
+        if not os.path.isdir(self.objetos_dir):
+            return 0
+        for dirpath, dirnames, filenames in os.walk(self.objetos_dir):
+            for fn in filenames:
+                sha = fn[:-2] if fn.endswith(".z") else fn
+                if sha not in usados:
+                    os.remove(os.path.join(dirpath, fn))
+                    removidos += 1
+        return removidos
@@ -0,0 +1,133 @@
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QPixmap
+
+from src.imagens import decodificar_para
+
+# Orçamento padrão de memória do cache de QPixmaps
+ORCAMENTO_PADRAO = 128 * 1024 * 1024
+
+
+def _custo(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class CachePixmaps:
+    """Cache LRU de QPixmaps compartilhado pelas telas de imagem.
+
+    A chave é (caminho, mtime, tamanho alvo, device pixel ratio): a mesma foto
+    no mesmo tamanho e na mesma densidade de tela é decodificada uma única
+    vez, e uma foto alterada no disco nunca é servida desatualizada. O total de pixels guardados respeita `orcamento_bytes`;
+    ao passar dele, saem os menos usados. Só deve ser usado no thread da
+    interface (QPixmap).
+    """
+
+    _compartilhado = None
+
+    @classmethod
+    def compartilhado(cls):
+        """Instância única usada por todas as telas."""
+        if cls._compartilhado is None:
+            cls._compartilhado = cls()
+        return cls._compartilhado
+
+    def __init__(self, orcamento_bytes=ORCAMENTO_PADRAO):
+        self.orcamento_bytes = orcamento_bytes
+        self._itens = OrderedDict()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    def _chave(self, path, tamanho, mtime_ns, dpr=1.0):
+        tamanho = QSize(tamanho) if tamanho is not None else QSize(0, 0)
+        return (os.path.abspath(path), mtime_ns, tamanho.width(), tamanho.height(), float(dpr))
+
+    def obter(self, path, tamanho=None, dpr=1.0):
+        """QPixmap de `path` reduzido para caber em `tamanho` (pixels lógicos), ou None.
+
+        A foto é decodificada em `tamanho * dpr` pixels físicos e o QPixmap
+        sai com `devicePixelRatio` igual a `dpr`. Sem `tamanho`, a imagem é
+        carregada inteira.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except (OSError, TypeError, ValueError):
+            return None
+        fisico = None
+        if tamanho is not None:
+            tamanho = QSize(tamanho)
+            fisico = QSize(max(1, int(tamanho.width() * dpr)), max(1, int(tamanho.height() * dpr)))
+        chave = self._chave(path, tamanho, mtime_ns, dpr)
+        pixmap = self._itens.get(chave)
+        if pixmap is not None:
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return pixmap
+        self.falhas += 1
+        if fisico is None:
+            pixmap = QPixmap(path)
+            if pixmap.isNull():
+                return None
+        else:
+            img = decodificar_para(path, fisico)
+            if img is None:
+                return None
+            pixmap = QPixmap.fromImage(img)
+        pixmap.setDevicePixelRatio(dpr)
+        self._guardar(chave, pixmap)
+        return pixmap
+
+    def inserir(self, path, tamanho, pixmap, mtime_ns=None):
+        """Guarda um pixmap já pronto (ex.: decodificado em segundo plano).
+
+        `tamanho` é o tamanho lógico pedido; a densidade é a do próprio pixmap.
+        """
+        if pixmap is None or pixmap.isNull():
+            return
+        try:
+            mtime_ns = mtime_ns if mtime_ns is not None else os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        self._guardar(self._chave(path, tamanho, mtime_ns, pixmap.devicePixelRatio()), pixmap)
+
+    def contem(self, path, tamanho=None, dpr=1.0):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+        return self._chave(path, tamanho, mtime_ns, dpr) in self._itens
+
+    def _guardar(self, chave, pixmap):
+        anterior = self._itens.pop(chave, None)
+        if anterior is not None:
+            self.bytes_usados -= _custo(anterior)
+        custo = _custo(pixmap)
+        if custo > self.orcamento_bytes:
+            return
+        self._itens[chave] = pixmap
+        self.bytes_usados += custo
+        self._despejar()
+
+    def _despejar(self):
+        while self.bytes_usados > self.orcamento_bytes and self._itens:
+            _, pixmap = self._itens.popitem(last=False)
+            self.bytes_usados -= _custo(pixmap)
+
+    def definir_orcamento(self, orcamento_bytes):
+        self.orcamento_bytes = orcamento_bytes
+        self._despejar()
+
+    def limpar(self):
+        self._itens.clear()
+        self.bytes_usados = 0
+
+    def estatisticas(self):
+        return {
+            "itens": len(self._itens),
+            "bytes": self.bytes_usados,
+            "orcamento": self.orcamento_bytes,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+        }
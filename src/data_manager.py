@@ -1,14 +1,26 @@
 import json
 import os
 import shutil
-import random
+import secrets
 import sys
 import logging
 import re
-from uuid import uuid4
-from zipfile import ZipFile, ZIP_DEFLATED
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+from src.backup import BackupCancelado, RepositorioBackup
+from src.estatisticas_sorteio import EstatisticasSorteio
+from src.familia_store import AlteracaoFamilias, FamiliaStore, diferenca_familias
+from src.filtro_familias import IndiceBusca
+from src.historico_sorteios import HistoricoSorteios, data_iso
+from src.motor_sorteio import MotorSorteio
+from src.imagens import (
+    ManifestoThumbs, caminho_thumb, gerar_thumbs, hash_arquivo, lado_necessario, processar_foto,
+    variantes_que_cobrem,
+)
+from src.persistencia import SEM_ALTERACAO, assinatura_arquivo, criar_backend
+
 # Configuração de logging (pode ser adaptado para exibir na interface se quiser)
 logging.basicConfig(level=logging.INFO)
 
@@ -16,33 +28,151 @@ logging.basicConfig(level=logging.INFO)
 # dados persistentes do usuário devem usar _data_path.
 
 class DataManager:
-    _instance = None
+    # Uma instância por pasta de dados (`instancias_abertas`) e a pasta ativa,
+    # devolvida por `DataManager()` sem argumentos
+    _instancias = {}
+    _ativa = None
+    _registro_lock = threading.RLock()
+    _iniciado = False
     _familias_cache = None
     _ultimo_sorteio_cache = None
+    _store = None
+    _backend = None
+    _assinatura = None
+    _hash_conteudo = None
+    _generation = 0
+    # Alterações pendentes de `transaction()`; None fora de uma transação
+    _transacao = None
+    _manifesto = None
+    _thread_thumbs = None
+    _ouvintes = None
+    _indice_busca = None
+    _motor = None
+    _historico = None
+    _estatisticas = None
+    _indice_busca_geracao = None
+    _assinatura_sorteio = None
+    # A validação inicial refaz miniaturas desatualizadas em uma thread de fundo
+    thumbs_em_segundo_plano = True
+    # Modo diário: cada gravação acrescenta só as alterações em familias.journal;
+    # o familias.json completo é regravado apenas na compactação.
+    usar_journal = True
+    # "json", "sqlite" ou None (SQLite quando dados/familias.db existir)
+    backend_padrao = None
+    # Além de inode/tamanho/mtime, confere o hash do conteúdo antes de reler
+    verificar_hash_conteudo = False
+
+    def __new__(cls, base_path_override=None, backend=None, ativar=True):
+        """Devolve o DataManager da pasta de dados, criando-o na primeira vez.
+
+        Sem `base_path_override`, devolve a instância ativa (ou a da pasta
+        padrão em AppData). Cada pasta tem o próprio cache, índices e
+        backend; abrir outra pasta não invalida as já carregadas. Com
+        `ativar=False` a instância não passa a ser a ativa.
+        """
+        with cls._registro_lock:
+            if not base_path_override and cls._ativa is not None:
+                return cls._ativa
+            base_path_data = base_path_override or cls._get_appdata_dir()
+            chave = cls._chave_pasta(base_path_data)
+            instancia = cls._instancias.get(chave)
+            if instancia is None:
+                instancia = super(DataManager, cls).__new__(cls)
+                instancia.base_path_data = base_path_data
+                cls._instancias[chave] = instancia
+            if ativar or cls._ativa is None:
+                cls._ativa = instancia
+            return instancia
+
+    def __init__(self, base_path_override=None, backend=None, ativar=True):
+        # __init__ roda a cada DataManager(); a instância já aberta só troca de backend se pedido
+        with self._registro_lock:
+            if self._iniciado and (not backend or backend == self._backend.nome):
+                return
+            self._iniciado = True
+            self._abrir_pasta(backend)
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(DataManager, cls).__new__(cls)
-        return cls._instance
-
-    def __init__(self, base_path_override=None):
-        if base_path_override:
-            self.base_path_data = base_path_override
-        else:
-            self.base_path_data = self._get_appdata_dir()
+    def _abrir_pasta(self, backend=None):
         # Recursos estáticos (bundle)
         self.base_path_res = getattr(sys, '_MEIPASS', os.path.abspath('.'))
 
         self.familias_file = os.path.join(self.base_path_data, "dados", "familias.json")
         self.sorteio_file = os.path.join(self.base_path_data, "dados", "sorteio.json")
+        self.journal_file = os.path.join(self.base_path_data, "dados", "familias.journal")
+        self.db_file = os.path.join(self.base_path_data, "dados", "familias.db")
+        antigas = self._trocar_backend(backend or self.backend_padrao)
 
         os.makedirs(os.path.join(self.base_path_data, "dados"), exist_ok=True)
         os.makedirs(os.path.join(self.base_path_data, "imagens", "familias"), exist_ok=True)
         os.makedirs(os.path.join(self.base_path_data, "imagens", "thumbs"), exist_ok=True)
 
         self._initialize_persistent_store()
+        self._reler_apos_troca(antigas)
+
+    def _trocar_backend(self, tipo=None):
+        """Fecha o backend atual e abre o de `tipo`; descarta tudo o que foi lido pelo anterior.
+
+        Retorna a lista de famílias que estava em cache (ou None).
+        """
+        antigas = self._familias_cache
+        if self._backend is not None and hasattr(self._backend, "fechar"):
+            self._backend.fechar()
+        self._backend = criar_backend(self.base_path_data, tipo)
+        self._familias_cache = None
+        self._store = None
+        self._ultimo_sorteio_cache = None
+        self._manifesto = None
+        self._assinatura = None
+        self._hash_conteudo = None
+        self._descartar_derivados()
+        return antigas
+
+    def _reler_apos_troca(self, antigas):
+        # Instância que já tinha famílias em cache: relê pelo backend novo e avisa a diferença
+        if antigas is not None:
+            self._notificar_alteracao(antigas, self.carregar_familias())
+
+    @staticmethod
+    def _chave_pasta(caminho):
+        return os.path.normcase(os.path.realpath(caminho))
+
+    @classmethod
+    def para(cls, caminho, backend=None):
+        """DataManager de `caminho` sem torná-lo o ativo (ex.: manter outro conjunto de dados carregado)."""
+        return cls(caminho, backend, ativar=False)
+
+    @classmethod
+    def instancias_abertas(cls):
+        with cls._registro_lock:
+            return list(cls._instancias.values())
+
+    @classmethod
+    def descartar(cls, caminho=None):
+        """Fecha e tira do registro o DataManager de `caminho` (o ativo, sem argumento)."""
+        with cls._registro_lock:
+            if caminho is None:
+                instancia = cls._ativa
+            else:
+                instancia = cls._instancias.get(cls._chave_pasta(caminho))
+            if instancia is None:
+                return False
+            cls._instancias.pop(cls._chave_pasta(instancia.base_path_data), None)
+            if cls._ativa is instancia:
+                cls._ativa = None
+        try:
+            if instancia._backend is not None and hasattr(instancia._backend, "fechar"):
+                instancia._backend.fechar()
+        except Exception as e:
+            logging.error(f"Erro ao fechar dados de {instancia.base_path_data}: {str(e)}")
+        return True
 
-    def _get_appdata_dir(self):
+    @classmethod
+    def descartar_todas(cls):
+        for instancia in cls.instancias_abertas():
+            cls.descartar(instancia.base_path_data)
+
+    @staticmethod
+    def _get_appdata_dir():
         try:
             appdata = os.environ.get('APPDATA')
             if appdata and os.path.isdir(appdata):
@@ -72,10 +202,7 @@ class DataManager:
             os.makedirs(os.path.join(self.base_path_data, "imagens", "familias"), exist_ok=True)
             os.makedirs(os.path.join(self.base_path_data, "imagens", "thumbs"), exist_ok=True)
             # Criar arquivos vazios na primeira execução
-            if not os.path.exists(self.familias_file):
-                self._atomic_write(self.familias_file, [])
-            if not os.path.exists(self.sorteio_file):
-                self._atomic_write(self.sorteio_file, {"ultimo_sorteado": None})
+            self._backend.inicializar()
         except Exception:
             pass
 
@@ -113,29 +240,266 @@ class DataManager:
                 f["foto"] = foto.replace("\\", "/")
         return f
 
-    def _atomic_write(self, path, data):
-        dir_path = os.path.dirname(path)
-        os.makedirs(dir_path, exist_ok=True)
-        tmp_path = os.path.join(dir_path, f".{os.path.basename(path)}.tmp")
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.replace(tmp_path, path)
+    @property
+    def generation(self):
+        """Contador incrementado sempre que o conteúdo do cache muda."""
+        return self._generation
+
+    def _definir_cache(self, familias):
+        antigas = self._familias_cache
+        self._familias_cache = familias
+        self._store = FamiliaStore(familias)
+        self._generation += 1
+        # Dentro de uma transação a notificação sai uma vez, no commit
+        if self._transacao is None and antigas is not None:
+            self._notificar_alteracao(antigas, familias)
+
+    def adicionar_ouvinte(self, callback):
+        """Registra `callback(alteracao)` para cada mudança no cache de famílias.
+
+        `alteracao` é um `AlteracaoFamilias` com os registros inseridos,
+        atualizados, removidos e renumerados. É chamado no thread que alterou
+        os dados.
+        """
+        if self._ouvintes is None:
+            self._ouvintes = []
+        if callback not in self._ouvintes:
+            self._ouvintes.append(callback)
+
+    def remover_ouvinte(self, callback):
+        if self._ouvintes and callback in self._ouvintes:
+            self._ouvintes.remove(callback)
+
+    def _notificar_alteracao(self, antigas, novas):
+        if not self._ouvintes:
+            return
+        self._emitir_alteracao(diferenca_familias(antigas, novas))
+
+    def _emitir_alteracao(self, alteracao):
+        if not self._ouvintes or alteracao.vazia:
+            return
+        for callback in list(self._ouvintes):
+            try:
+                callback(alteracao)
+            except Exception as e:
+                logging.error(f"Erro ao notificar alteração de famílias: {str(e)}")
+
+    def _registrar_assinatura(self, assinatura=None):
+        self._assinatura_sorteio = assinatura_arquivo(self.sorteio_file)
+        try:
+            self._assinatura = assinatura if assinatura is not None else self._backend.assinatura()
+            self._hash_conteudo = self._backend.hash_conteudo() if self.verificar_hash_conteudo else None
+        except Exception:
+            self._assinatura = None
+            self._hash_conteudo = None
+
+    def _arquivos_alterados(self):
+        try:
+            atual = self._backend.assinatura()
+        except Exception:
+            return True
+        if self._assinatura is not None and atual == self._assinatura:
+            return False
+        if self.verificar_hash_conteudo and self._hash_conteudo is not None:
+            if self._backend.hash_conteudo() == self._hash_conteudo:
+                self._assinatura = atual
+                return False
+        return True
+
+    def arquivos_observados(self):
+        """Pasta `dados` e arquivos cuja alteração externa muda as famílias ou o último sorteio."""
+        return [
+            os.path.dirname(self.familias_file),
+            self.familias_file,
+            self.journal_file,
+            self.sorteio_file,
+            self.db_file,
+            self.db_file + "-wal",
+        ]
+
+    def recarregar_se_alterado(self):
+        """Relê os dados se outro processo os alterou desde a última leitura ou gravação.
+
+        Só compara assinaturas (e o hash, com `verificar_hash_conteudo`); o
+        arquivo só é reinterpretado quando mudou de fato, e os ouvintes de
+        `adicionar_ouvinte` recebem a diferença registro a registro. Retorna
+        True se algo foi relido.
+        """
+        if self._transacao is not None:
+            return False
+        relido = False
+        try:
+            assinatura_sorteio = assinatura_arquivo(self.sorteio_file)
+            if assinatura_sorteio != self._assinatura_sorteio:
+                self._assinatura_sorteio = assinatura_sorteio
+                self._ultimo_sorteio_cache = None
+                relido = True
+            if self._familias_cache is not None and self._arquivos_alterados():
+                geracao = self._generation
+                self.carregar_familias(force_reload=True)
+                relido = relido or self._generation != geracao
+        except Exception as e:
+            logging.error(f"Erro ao verificar alterações externas: {str(e)}")
+        return relido
+
+    def _descartar_derivados(self):
+        # Lista relida do disco (alteração externa, backup restaurado): ciclo,
+        # histórico e estatísticas voltam a ser lidos dos arquivos e conferidos
+        # com ela; o índice de busca é refeito, reaproveitando só as normalizações.
+        self._motor = None
+        self._historico = None
+        self._estatisticas = None
+        self._indice_busca_geracao = None
+
+    def _garantir_store(self):
+        if self._familias_cache is None:
+            self.carregar_familias()
+        if self._store is None or self._store.familias is not self._familias_cache:
+            self._store = FamiliaStore(self._familias_cache if self._familias_cache is not None else [])
+        return self._store
+
+    def indice_busca(self):
+        """`IndiceBusca` das famílias atuais; só é refeito quando a geração muda."""
+        familias = self.carregar_familias()
+        if self._indice_busca is None or self._indice_busca_geracao != self._generation:
+            self._indice_busca = IndiceBusca(familias or [], anterior=self._indice_busca)
+            self._indice_busca_geracao = self._generation
+        return self._indice_busca
+
+    def get_by_numero(self, numero):
+        return self._garantir_store().get_by_numero(numero)
+
+    def get_by_id(self, id_familia):
+        return self._garantir_store().get_by_id(id_familia)
+
+    def familias_sorteadas(self):
+        return self._garantir_store().sorteadas()
+
+    def familias_pendentes(self):
+        return self._garantir_store().pendentes()
+
+    def pendentes_com_prefixo(self, prefixo):
+        """Pendentes cujo número começa com `prefixo` (ver `FamiliaStore.pendentes_com_prefixo`)."""
+        return self._garantir_store().pendentes_com_prefixo(prefixo)
+
+    def _status_do_filtro(self, filtro):
+        return {"sorteadas": True, "nao_sorteadas": False}.get(filtro)
+
+    def listar_familias(self, filtro="todas"):
+        """Famílias do filtro ("todas", "sorteadas", "nao_sorteadas").
+
+        Sem cache carregado, a consulta é delegada ao backend quando ele tem
+        índice próprio (SQLite); caso contrário usa a partição em memória.
+        """
+        status = self._status_do_filtro(filtro)
+        if self._familias_cache is None:
+            res = self._backend.listar(status)
+            if res is not None:
+                return [self._normalize_familia(f) for f in res]
+        if status is None:
+            return list(self.carregar_familias())
+        return self.familias_sorteadas() if status else self.familias_pendentes()
+
+    def contar_familias(self, filtro="todas"):
+        status = self._status_do_filtro(filtro)
+        if self._familias_cache is None:
+            res = self._backend.contar(status)
+            if res is not None:
+                return res
+        if status is None:
+            return self.total_familias
+        return self.total_sorteadas if status else self.total_pendentes
+
+    @property
+    def total_familias(self):
+        return len(self._garantir_store())
+
+    @property
+    def total_sorteadas(self):
+        return self._garantir_store().total_sorteadas
+
+    @property
+    def total_pendentes(self):
+        return self._garantir_store().total_pendentes
+
+    @property
+    def todas_sorteadas(self):
+        """True quando não resta família pendente (mostra o botão de reiniciar)."""
+        return self._garantir_store().todas_sorteadas
+
+    @property
+    def ultima_sorteada(self):
+        """Família sorteada mais recente pela data do sorteio, mantida pelo `FamiliaStore`."""
+        return self._garantir_store().ultima_sorteada()
+
+    @property
+    def em_transacao(self):
+        return self._transacao is not None
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa as alterações do bloco em uma única gravação durável.
+
+        Dentro do bloco `salvar_familias`/`salvar_sorteio` só atualizam o
+        cache; a gravação acontece uma vez, na saída. Se o bloco ou a gravação
+        falharem, o cache volta ao estado anterior e a exceção é propagada.
+        Transações aninhadas fazem parte da externa.
+        """
+        if self._transacao is not None:
+            yield self
+            return
+        copia = [dict(f) for f in self.carregar_familias()]
+        ultimo_antes = self._ultimo_sorteio_cache
+        self._transacao = {"familias": None, "ultimo": SEM_ALTERACAO}
+        alterou_familias = relido = False
+        try:
+            yield self
+            pendente = self._transacao
+            if pendente["familias"] is not None or pendente["ultimo"] is not SEM_ALTERACAO:
+                relido = self._backend.commit(pendente["familias"], pendente["ultimo"], diario=self.usar_journal)
+                self._registrar_assinatura()
+            alterou_familias = pendente["familias"] is not None
+        except BaseException:
+            self._definir_cache(copia)
+            self._ultimo_sorteio_cache = ultimo_antes
+            raise
+        finally:
+            self._transacao = None
+        if alterou_familias:
+            self._notificar_alteracao(copia, self._familias_cache)
+        if relido:
+            self._reler_familias()
+
+    def _reler_familias(self):
+        # A gravação foi feita sobre um snapshot reescrito por outro processo:
+        # a lista em disco tem também as alterações dele e é relida
+        self._assinatura = None
+        self._hash_conteudo = None
+        self.carregar_familias(force_reload=True)
 
     def carregar_familias(self, force_reload=False):
-        if self._familias_cache is not None and not force_reload:
-            return self._familias_cache
+        # force_reload só relê o disco se inode/tamanho/mtime mudaram desde a
+        # última leitura ou gravação feita por este processo. Durante uma
+        # transação o cache (com as alterações pendentes) é sempre o vigente.
+        if self._familias_cache is not None:
+            if not force_reload or self._transacao is not None or not self._arquivos_alterados():
+                return self._familias_cache
 
         try:
-            if not os.path.exists(self.familias_file):
-                self._familias_cache = []
-                return []
-
-            with open(self.familias_file, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-                familias = [f for f in dados if "nome" in f and "numero" in f]
-                familias = [self._normalize_familia(dict(f)) for f in familias]
-                self._familias_cache = familias
-                return familias
+            assinatura = self._backend.assinatura()
+            if not self._backend.existe():
+                self._definir_cache([])
+                self._registrar_assinatura(assinatura)
+                return self._familias_cache
+
+            dados = self._backend.carregar_familias()
+            familias = [f for f in dados if "nome" in f and "numero" in f]
+            familias = [self._normalize_familia(dict(f)) for f in familias]
+            self._descartar_derivados()
+            self._definir_cache(familias)
+            self._registrar_assinatura(assinatura)
+            self._ultimo_sorteio_cache = None
+            return familias
         except json.JSONDecodeError:
             logging.error(f"Erro ao decodificar {self.familias_file}")
             return []
@@ -146,30 +510,78 @@ class DataManager:
     def salvar_familias(self, familias):
         try:
             familias_norm = [self._normalize_familia(dict(f)) for f in familias]
-            self._atomic_write(self.familias_file, familias_norm)
-            self._familias_cache = familias_norm
+            if self._transacao is not None:
+                self._definir_cache(familias_norm)
+                self._transacao["familias"] = familias_norm
+                return True
+            relido = self._backend.salvar_familias(familias_norm, diario=self.usar_journal)
+            self._definir_cache(familias_norm)
+            self._registrar_assinatura()
+            if relido:
+                self._reler_familias()
             return True
         except Exception as e:
             logging.error(f"Erro ao salvar famílias: {str(e)}")
             return False
 
+    def _gravar_registros(self, alteradas, alteracao, desfazer, ultimo=SEM_ALTERACAO):
+        """Grava só `alteradas`, registros do cache já alterados e reindexados no `FamiliaStore`.
+
+        Nem a lista nem o índice são refeitos; os ouvintes recebem `alteracao`.
+        Se a gravação falhar, `desfazer()` devolve o cache ao estado anterior
+        e a exceção é propagada. Dentro de uma transação, fica para o commit.
+        """
+        if self._transacao is not None:
+            self._transacao["familias"] = self._familias_cache
+            if ultimo is not SEM_ALTERACAO:
+                self._transacao["ultimo"] = ultimo
+            self._generation += 1
+            return
+        try:
+            relido = self._backend.commit(self._familias_cache, ultimo, diario=self.usar_journal, alteradas=alteradas)
+        except BaseException:
+            desfazer()
+            raise
+        self._registrar_assinatura()
+        self._generation += 1
+        self._emitir_alteracao(alteracao)
+        if relido:
+            self._reler_familias()
+
+    def _alterar_registro(self, familia, campos, remover=(), ultimo=SEM_ALTERACAO):
+        """Aplica `campos` (e retira as chaves de `remover`) na família em cache e grava só ela."""
+        store = self._garantir_store()
+        antiga = dict(familia)
+        familia.update(campos)
+        for chave in remover:
+            familia.pop(chave, None)
+        self._normalize_familia(familia)
+        store.atualizar(familia)
+
+        def _desfazer():
+            familia.clear()
+            familia.update(antiga)
+            store.atualizar(familia)
+
+        alteracao = diferenca_familias([antiga], [familia])
+        alteradas = [] if alteracao.vazia else [familia]
+        self._gravar_registros(alteradas, alteracao, _desfazer, ultimo)
+
     def carregar_ultimo_sorteio(self, force_reload=False):
         if self._ultimo_sorteio_cache is not None and not force_reload:
             return self._ultimo_sorteio_cache
 
         try:
-            if not os.path.exists(self.sorteio_file):
+            existe, num = self._backend.ler_ultimo()
+            if not existe:
                 return self._recalcular_ultimo_sorteado()
 
-            with open(self.sorteio_file, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-                num = dados.get("ultimo_sorteado")
-                familias = self.carregar_familias()
-                valido = any(str(f.get("numero")) == str(num) and f.get("sorteado") for f in familias)
-                if not valido:
-                    return self._recalcular_ultimo_sorteado()
-                self._ultimo_sorteio_cache = num
-                return num
+            familia = self.get_by_numero(num) if num is not None else None
+            valido = bool(familia and familia.get("sorteado"))
+            if not valido:
+                return self._recalcular_ultimo_sorteado()
+            self._ultimo_sorteio_cache = num
+            return num
         except json.JSONDecodeError:
             logging.error(f"Erro ao decodificar {self.sorteio_file}")
             return self._recalcular_ultimo_sorteado()
@@ -177,9 +589,21 @@ class DataManager:
             logging.error(f"Erro ao carregar último sorteio: {str(e)}")
             return self._recalcular_ultimo_sorteado()
 
+    def _alterar_ultimo_no_backend(self, operacao, *args):
+        # Em transação, fica pendente para o commit (apagar_ultimo -> None)
+        if self._transacao is not None:
+            self._transacao["ultimo"] = args[0] if args else None
+            return
+        # No SQLite o último sorteado mora no mesmo arquivo das famílias; sem
+        # reajustar a assinatura, a próxima checagem releria o cache à toa.
+        em_dia = self._familias_cache is not None and not self._arquivos_alterados()
+        operacao(*args)
+        if em_dia:
+            self._registrar_assinatura()
+
     def salvar_sorteio(self, numero):
         try:
-            self._atomic_write(self.sorteio_file, {"ultimo_sorteado": numero})
+            self._alterar_ultimo_no_backend(self._backend.gravar_ultimo, numero)
             self._ultimo_sorteio_cache = numero
             return True
         except Exception as e:
@@ -187,23 +611,194 @@ class DataManager:
             return False
 
     def resetar_sorteio(self):
-        familias = self.carregar_familias()
-        total_familias = len(familias)
+        try:
+            # A mesma semente embaralha os números e a ordem do novo ciclo
+            semente = secrets.randbits(64)
+            motor = self._garantir_ciclo()
+            # O ciclo que termina vai para o histórico, em uma gravação, antes de zerar as famílias
+            if not self.historico().arquivar(self._entradas_do_ciclo(motor.ciclo)):
+                return False
+            with self.transaction():
+                familias = self.carregar_familias()
+                total_familias = len(familias)
 
-        numeros_disponiveis = list(range(1, total_familias + 1))
-        random.shuffle(numeros_disponiveis)
+                numeros_disponiveis = list(range(1, total_familias + 1))
+                MotorSorteio.rng(semente, "numeros").shuffle(numeros_disponiveis)
 
-        for i, familia in enumerate(familias):
-            familia["sorteado"] = False
-            familia["numero"] = numeros_disponiveis[i]
-            familia.pop("data_sorteio", None)
+                for i, familia in enumerate(familias):
+                    familia["sorteado"] = False
+                    familia["numero"] = numeros_disponiveis[i]
+                    familia.pop("data_sorteio", None)
 
-        if self.salvar_familias(familias):
-            if os.path.exists(self.sorteio_file):
-                os.remove(self.sorteio_file)
-            self._ultimo_sorteio_cache = None
+                self.salvar_familias(familias)
+                self._alterar_ultimo_no_backend(self._backend.apagar_ultimo)
+                self._ultimo_sorteio_cache = None
+            motor.novo_ciclo(self._ids_pendentes(), semente)
+            self._garantir_estatisticas().iniciar_ciclo(motor.ciclo, motor.criado_em, encerrando=True)
             return True
-        return False
+        except Exception as e:
+            logging.error(f"Erro ao resetar sorteio: {str(e)}")
+            return False
+
+    def historico(self):
+        """`HistoricoSorteios` com os ciclos já encerrados."""
+        if self._historico is None:
+            self._historico = HistoricoSorteios(os.path.join(self.base_path_data, "dados"))
+        return self._historico
+
+    def _entrada_historico(self, familia, ciclo, horarios=None):
+        data = data_iso(familia.get("data_sorteio")) or ""
+        # O sorteio automático tem horário na auditoria; o manual, só a data
+        horario = (horarios or {}).get(familia.get("id"), "")
+        if data and horario.startswith(data):
+            data = horario
+        return {
+            "id": familia.get("id"),
+            "numero": familia.get("numero"),
+            "nome": familia.get("nome"),
+            "ciclo": ciclo,
+            "inicio_ciclo": self._garantir_motor().criado_em,
+            "data": data,
+        }
+
+    def _entradas_do_ciclo(self, ciclo):
+        horarios = {
+            e.get("id"): e.get("data", "")
+            for e in self._garantir_motor().eventos(ciclo) if e.get("tipo") == "sorteio"
+        }
+        return [self._entrada_historico(f, ciclo, horarios) for f in self.familias_sorteadas()]
+
+    def ultimo_sorteio_da_familia(self, id_familia):
+        """Entrada do sorteio mais recente da família (ciclo atual ou histórico), ou None."""
+        familia = self.get_by_id(id_familia)
+        if familia is not None and familia.get("sorteado"):
+            return self._entrada_historico(familia, self._garantir_motor().ciclo)
+        return self.historico().ultimo_da_familia(id_familia)
+
+    def sorteios_por_mes(self):
+        """{"aaaa-mm": quantidade} somando o histórico e o ciclo atual."""
+        meses = dict(self.historico().por_mes())
+        for mes, quantidade in self._garantir_store().sorteadas_por_mes().items():
+            meses[mes] = meses.get(mes, 0) + quantidade
+        return dict(sorted(meses.items()))
+
+    def _garantir_estatisticas(self):
+        if self._estatisticas is None:
+            estatisticas = EstatisticasSorteio(os.path.join(self.base_path_data, "dados"))
+            # Sem ciclo no motor (nenhum sorteio desde a instalação) a espera fica sem início
+            motor = self._garantir_motor()
+            if (
+                not estatisticas.carregar()
+                or estatisticas.ciclo != motor.ciclo
+                or not self._estatisticas_em_dia(estatisticas)
+            ):
+                # Primeira vez, arquivo de outro ciclo ou famílias alteradas fora
+                # do app (scripts, outra estação, backup): parte do histórico bruto
+                estatisticas = self.reconstruir_estatisticas()
+                estatisticas.salvar()
+            self._estatisticas = estatisticas
+        return self._estatisticas
+
+    def _estatisticas_em_dia(self, estatisticas):
+        """True se os sorteios do ciclo nos agregados são os das famílias sorteadas agora."""
+        sorteadas = {}
+        for familia in self.familias_sorteadas():
+            data = data_iso(familia.get("data_sorteio"))
+            if data:
+                sorteadas[str(familia.get("id"))] = data
+        return {chave: registro.get("data") for chave, registro in estatisticas.atual.items()} == sorteadas
+
+    def reconstruir_estatisticas(self):
+        """`EstatisticasSorteio` refeitas do histórico e do ciclo atual, sem gravar."""
+        motor = self._garantir_motor()
+        atuais = [self._entrada_historico(f, motor.ciclo) for f in self.familias_sorteadas()]
+        atuais.sort(key=lambda e: (e["data"], str(e["id"])))
+        estatisticas = EstatisticasSorteio(os.path.join(self.base_path_data, "dados"))
+        return estatisticas.reconstruir(self.historico().entradas(), atuais, motor.ciclo, motor.criado_em)
+
+    def conferir_estatisticas(self):
+        """True se os agregados mantidos a cada sorteio batem com os refeitos do histórico."""
+        return self._garantir_estatisticas().estado() == self.reconstruir_estatisticas().estado()
+
+    def estatisticas(self, limite_espera=5):
+        """Resumo para o painel de estatísticas, lido dos agregados (sem varrer o histórico)."""
+        agregados = self._garantir_estatisticas()
+        total = self.total_familias
+        return {
+            "por_mes": dict(sorted(agregados.por_mes.items())),
+            "espera_media": agregados.espera_media,
+            "taxa_conclusao": self.total_sorteadas / total if total else 0.0,
+            "sorteadas": self.total_sorteadas,
+            "total": total,
+            "ciclos_encerrados": agregados.ciclos_encerrados,
+            "mais_esperando": [
+                (f, agregados.ultimo_da_familia(f.get("id")))
+                for f in agregados.mais_esperando(self.familias_pendentes(), limite_espera)
+            ],
+        }
+
+    def _garantir_motor(self):
+        if self._motor is None:
+            self._motor = MotorSorteio(os.path.join(self.base_path_data, "dados"))
+            self._motor.carregar()
+        return self._motor
+
+    def _garantir_ciclo(self):
+        """Motor com o ciclo atual iniciado.
+
+        Sem ciclo gravado (instalação nova ou só sorteios manuais até aqui),
+        o ciclo começa agora ou, se já houver famílias sorteadas, na data do
+        sorteio mais antigo: a espera nunca fica depois do próprio sorteio.
+        """
+        motor = self._garantir_motor()
+        if motor.ciclo is None:
+            datas = [data_iso(f.get("data_sorteio")) for f in self.familias_sorteadas()]
+            motor.novo_ciclo(self._ids_pendentes(), inicio=min(filter(None, datas), default=None))
+            # Agregados montados sem início de ciclo são refeitos com ele
+            self._estatisticas = None
+        return motor
+
+    def _ids_pendentes(self):
+        return [f["id"] for f in self.familias_pendentes() if f.get("id") is not None]
+
+    def _pendente(self, id_familia):
+        familia = self.get_by_id(id_familia)
+        return familia is not None and not familia.get("sorteado", False)
+
+    def sortear_proxima(self):
+        """Sorteio automático: marca e retorna a próxima família do ciclo, ou None.
+
+        Cada sorteio avança o cursor do `MotorSorteio` (O(1) amortizado) e
+        fica registrado na auditoria com ciclo, posição e semente, podendo ser
+        conferido depois com `verificar_sorteio`.
+        """
+        try:
+            store = self._garantir_store()
+            motor = self._garantir_ciclo()
+            # Cadastradas depois do início do ciclo têm id maior que os conhecidos
+            maior_id = store.proximo_id() - 1
+            if maior_id > motor.max_id:
+                motor.acrescentar([i for i in range(motor.max_id + 1, maior_id + 1) if self._pendente(i)])
+            escolha = motor.proxima(self._pendente)
+            if escolha is None and store.total_pendentes:
+                # Pendentes fora da ordem (restauradas, ids reaproveitados)
+                motor.acrescentar(self._ids_pendentes())
+                escolha = motor.proxima(self._pendente)
+            if escolha is None:
+                return None
+            posicao, id_familia = escolha
+            numero = self.get_by_id(id_familia).get("numero")
+            if not self.alterar_status_familia(numero, True):
+                return None
+            motor.registrar(posicao, id_familia, numero)
+            return self.get_by_id(id_familia)
+        except Exception as e:
+            logging.error(f"Erro no sorteio automático: {str(e)}")
+            return None
+
+    def verificar_sorteio(self, registro):
+        """True se o `registro` de sorteio da auditoria confere com a semente do ciclo."""
+        return self._garantir_motor().verificar(registro)
 
     def _valid_image_ext(self, path):
         ext = os.path.splitext(path)[-1].lower()
@@ -243,42 +838,54 @@ class DataManager:
 
     def _make_backup_name(self, version):
         ts = datetime.now().strftime("%Y-%m-%d_%H-%M")
-        return f"{ts}_v{version}.zip"
+        return f"{ts}_v{version}"
 
-    def _unique_backup_path(self, name):
-        base = os.path.join(self._backups_dir(), name)
-        if not os.path.exists(base):
-            return base
-        i = 1
-        while True:
-            alt = os.path.join(self._backups_dir(), f"{os.path.splitext(name)[0]}_{i}.zip")
-            if not os.path.exists(alt):
-                return alt
-            i += 1
-
-    def _zip_dir(self, root_dir, zip_path):
+    def _repositorio_backup(self):
+        return RepositorioBackup(self.base_path_data, self._backups_dir())
+
+    def criar_backup_manual(self, version, ao_progresso=None, trabalho=None):
+        """Cria um backup incremental; pode rodar fora do thread da interface.
+
+        `trabalho` (`TrabalhoBackup`) permite cancelar e acompanhar o progresso.
+        """
         try:
-            with ZipFile(zip_path, "w", ZIP_DEFLATED) as z:
-                for dirpath, dirnames, filenames in os.walk(root_dir):
-                    if os.path.basename(dirpath).lower() == "backups":
-                        continue
-                    for fn in filenames:
-                        absf = os.path.join(dirpath, fn)
-                        relf = os.path.relpath(absf, root_dir)
-                        z.write(absf, relf)
+            self._repositorio_backup().criar(self._make_backup_name(version), version, ao_progresso, trabalho)
             return True
-        except Exception:
+        except BackupCancelado:
+            logging.info("Backup cancelado")
             return False
+        except Exception as e:
+            logging.error(f"Erro ao criar backup: {str(e)}")
+            return False
+
+    def listar_backups(self):
+        return self._repositorio_backup().listar()
+
+    def restaurar_backup(self, nome):
+        """Restaura o backup `nome` sobre a pasta de dados e recarrega o cache.
 
-    def criar_backup_manual(self, version):
-        name = self._make_backup_name(version)
-        target = self._unique_backup_path(name)
-        return self._zip_dir(self.base_path_data, target)
+        O estado atual é guardado antes em um backup `antes_de_restaurar_*`.
+        Com ou sem sucesso, o backend é reaberto e o cache relido do disco.
+        """
+        try:
+            repositorio = self._repositorio_backup()
+            repositorio.ler_manifesto(nome)
+            repositorio.criar(f"antes_de_restaurar_{datetime.now().strftime('%Y-%m-%d_%H-%M')}")
+            if hasattr(self._backend, "fechar"):
+                self._backend.fechar()
+            try:
+                repositorio.restaurar(nome)
+            finally:
+                self._reler_apos_troca(self._trocar_backend(self.backend_padrao))
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao restaurar backup {nome}: {str(e)}")
+            return False
 
-    def backup_auto_se_versao_mudou(self, version):
+    def backup_auto_se_versao_mudou(self, version, ao_progresso=None):
         saved = self._read_saved_version()
         if str(saved) != str(version):
-            ok = self.criar_backup_manual(version)
+            ok = self.criar_backup_manual(version, ao_progresso)
             self._write_saved_version(version)
             return ok
         return False
@@ -290,66 +897,96 @@ class DataManager:
         if not caminho_foto or not os.path.exists(caminho_foto) or not self._valid_image_ext(caminho_foto):
             return False
 
-        familias = self.carregar_familias()
-        novo_id = max([f.get("id", 0) for f in familias], default=0) + 1
-        numero = max([f.get("numero", 0) for f in familias], default=0) + 1
+        return self.adicionar_familias([(nome, self._armazenar_foto(caminho_foto))])
 
-        extensao = os.path.splitext(caminho_foto)[-1]
-        nome_arquivo = f"{uuid4().hex[:8]}{extensao}"
-        destino = self._data_path("imagens", "familias", nome_arquivo)
-        os.makedirs(os.path.dirname(destino), exist_ok=True)
-        self._optimize_image(caminho_foto, destino)
-        self._generate_thumb(destino)
-
-        nova_familia = {
-            "id": novo_id,
-            "numero": numero,
-            "nome": nome,
-            "foto": os.path.join("imagens", "familias", nome_arquivo).replace("\\", "/"),
-            "sorteado": False
-        }
+    def adicionar_familias(self, itens):
+        """Cadastra [(nome, foto_rel)] com fotos já processadas, em uma única gravação."""
+        try:
+            store = self._garantir_store()
+            novas = []
+            for nome, foto_rel in itens:
+                familia = self._normalize_familia({
+                    "id": store.proximo_id(),
+                    "numero": store.proximo_numero(),
+                    "nome": nome,
+                    "foto": foto_rel,
+                    "sorteado": False
+                })
+                store.adicionar(familia)
+                novas.append(familia)
+
+            def _desfazer():
+                for familia in novas:
+                    store.remover(familia)
+
+            self._gravar_registros(novas, AlteracaoFamilias(inseridas=list(novas)), _desfazer)
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao adicionar famílias: {str(e)}")
+            return False
+
+    def importar_familias(self, itens, ingestao, ao_concluir=None):
+        """Importa [(nome, caminho_foto)] processando as fotos no pool de `ingestao`.
+
+        Retorna logo a quantidade de itens aceitos; fotos já armazenadas não
+        são reprocessadas. Os cadastros são gravados
+        juntos quando o lote termina e `ao_concluir(ok, quantidade)` é chamado
+        no thread da interface.
+        """
+        tarefas = []
+        indices = {}
+        registros = []
+        for nome, caminho_foto in itens:
+            nome = (nome or "").strip()
+            if not nome or not caminho_foto or not os.path.exists(caminho_foto) or not self._valid_image_ext(caminho_foto):
+                continue
+            destino, foto_rel = self._destino_foto(caminho_foto)
+            # Fotos já armazenadas (ou repetidas no lote) não são processadas de novo
+            if os.path.exists(destino):
+                indice = None
+            elif destino in indices:
+                indice = indices[destino]
+            else:
+                indice = indices[destino] = len(tarefas)
+                tarefas.append((caminho_foto, destino))
+            registros.append((nome, foto_rel, indice))
 
-        familias.append(nova_familia)
-        return self.salvar_familias(familias)
+        def _finalizar(resultados):
+            self._manifesto_thumbs().salvar()
+            aceitos = [(n, rel) for n, rel, i in registros if i is None or resultados[i]]
+            ok = self.adicionar_familias(aceitos) if aceitos else not registros
+            if ao_concluir is not None:
+                ao_concluir(ok, len(aceitos) if ok else 0)
+
+        ingestao.processar(tarefas, _finalizar, self._manifesto_thumbs())
+        return len(registros)
 
     def editar_familia(self, numero, novo_nome=None, nova_foto_path=None):
-        familias = self.carregar_familias()
-        familia = next((f for f in familias if str(f.get("numero")) == str(numero)), None)
-        if not familia:
+        atual = self.get_by_numero(numero)
+        if not atual:
+            return False
+        # Tudo validado antes de mexer no registro: o cache não pode divergir do disco
+        if novo_nome is not None and not novo_nome.strip():
             return False
+        if nova_foto_path and (not os.path.exists(nova_foto_path) or not self._valid_image_ext(nova_foto_path)):
+            return False
+        campos = {}
         if novo_nome is not None:
-            nn = novo_nome.strip()
-            if not nn:
-                return False
-            familia["nome"] = nn
+            campos["nome"] = novo_nome.strip()
+        old_rel = atual.get("foto")
+        novo_rel = None
         if nova_foto_path:
-            if not os.path.exists(nova_foto_path) or not self._valid_image_ext(nova_foto_path):
-                return False
-            extensao = os.path.splitext(nova_foto_path)[-1]
-            nome_arquivo = f"{uuid4().hex[:8]}{extensao}"
-            destino = self._data_path("imagens", "familias", nome_arquivo)
-            os.makedirs(os.path.dirname(destino), exist_ok=True)
-            self._optimize_image(nova_foto_path, destino)
-            self._generate_thumb(destino)
-            novo_rel = os.path.join("imagens", "familias", nome_arquivo).replace("\\", "/")
-            old_rel = familia.get("foto")
-            familia["foto"] = novo_rel
-            if old_rel and old_rel != novo_rel:
-                old_abs = self._resolve_photo_abs(old_rel)
-                outros = [f for f in familias if f is not familia and f.get("foto") == old_rel]
-                if not outros and os.path.exists(old_abs):
-                    try:
-                        os.remove(old_abs)
-                    except Exception:
-                        pass
-                # remover thumb antiga
-                try:
-                    old_thumb = os.path.join(self.base_path_data, self._thumb_path(old_rel))
-                    if os.path.exists(old_thumb):
-                        os.remove(old_thumb)
-                except Exception:
-                    pass
-        return self.salvar_familias(familias)
+            novo_rel = self._armazenar_foto(nova_foto_path)
+            campos["foto"] = novo_rel
+        try:
+            # Os ouvintes recebem a diferença entre o registro antigo e o editado
+            self._alterar_registro(atual, campos)
+        except Exception as e:
+            logging.error(f"Erro ao editar família {numero}: {str(e)}")
+            return False
+        if novo_rel and old_rel and old_rel != novo_rel:
+            self._liberar_foto(old_rel)
+        return True
 
     def _ordenar_familias_por_numero(self, familias):
         try:
@@ -387,79 +1024,136 @@ class DataManager:
             except Exception:
                 return False
 
-            alvo_index = next(
-                (i for i, familia in enumerate(familias) if int(familia.get("numero", 0)) == numero_excluido),
-                None,
-            )
-            if alvo_index is None:
+            alvo = self.get_by_numero(numero_excluido)
+            if alvo is None:
                 return False
 
-            alvo = familias[alvo_index]
             foto_rel = alvo.get("foto")
-            familias.pop(alvo_index)
-            familias = self._renumerar_familias_sem_lacunas(familias)
-
-            ok = self.salvar_familias(familias)
-            if not ok:
-                return False
-
-            self._recalcular_ultimo_sorteado()
+            with self.transaction():
+                familias = [f for f in familias if f is not alvo]
+                familias = self._renumerar_familias_sem_lacunas(familias)
+                self.salvar_familias(familias)
+                self._recalcular_ultimo_sorteado()
 
+            if alvo.get("sorteado") and alvo.get("id") is not None:
+                # Sai também dos agregados, como sairá do histórico do ciclo
+                self._garantir_estatisticas().desfazer(alvo["id"])
             if foto_rel:
-                foto_abs = self._resolve_photo_abs(foto_rel)
-                if os.path.exists(foto_abs):
-                    try:
-                        os.remove(foto_abs)
-                    except Exception:
-                        pass
-                try:
-                    old_thumb = os.path.join(self.base_path_data, self._thumb_path(foto_rel))
-                    if os.path.exists(old_thumb):
-                        os.remove(old_thumb)
-                except Exception:
-                    pass
+                self._liberar_foto(foto_rel)
             return True
         except Exception as e:
             logging.error(f"Erro ao excluir família {numero}: {str(e)}")
             return False
 
-    def _optimize_image(self, src_path, dst_path):
-        try:
-            from PySide6.QtGui import QImage
-            img = QImage(src_path)
-            if img.isNull():
-                shutil.copy2(src_path, dst_path)
-                return
-            max_w, max_h = 1600, 1600
-            w, h = img.width(), img.height()
-            scale = min(max_w / max(w, 1), max_h / max(h, 1), 1.0)
-            if scale < 1.0:
-                img = img.scaled(int(w * scale), int(h * scale))
-            fmt = "JPG" if dst_path.lower().endswith(('.jpg', '.jpeg')) else "PNG"
-            quality = 85 if fmt == "JPG" else -1
-            img.save(dst_path, fmt, quality)
-        except Exception:
+    def _destino_foto(self, caminho_foto):
+        # Endereçado pelo conteúdo: a mesma foto de origem sempre vai para o mesmo arquivo
+        extensao = os.path.splitext(caminho_foto)[-1].lower()
+        nome_arquivo = f"{hash_arquivo(caminho_foto)[:16]}{extensao}"
+        destino = self._data_path("imagens", "familias", nome_arquivo)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        return destino, os.path.join("imagens", "familias", nome_arquivo).replace("\\", "/")
+
+    def _armazenar_foto(self, caminho_foto):
+        """Guarda a foto no repositório e retorna o caminho relativo; se já existir, reaproveita."""
+        destino, foto_rel = self._destino_foto(caminho_foto)
+        if not os.path.exists(destino):
+            self._processar_foto(caminho_foto, destino)
+        return foto_rel
+
+    def _liberar_foto(self, foto_rel):
+        """Apaga foto e miniaturas quando nenhuma família a referencia mais."""
+        if self._garantir_store().referencias_foto(foto_rel) > 0:
+            return
+        foto_abs = self._resolve_photo_abs(foto_rel)
+        if os.path.exists(foto_abs):
             try:
-                shutil.copy2(src_path, dst_path)
+                os.remove(foto_abs)
             except Exception:
                 pass
+        self._remover_thumbs(foto_rel)
+
+    def _thumbs_dir(self):
+        return self._data_path("imagens", "thumbs")
+
+    def _processar_foto(self, src_path, dst_path):
+        # Foto otimizada e miniaturas saem da mesma decodificação
+        manifesto = self._manifesto_thumbs()
+        ok = processar_foto(src_path, dst_path, self._thumbs_dir(), manifesto=manifesto)
+        manifesto.salvar()
+        return ok
 
     def _thumb_path(self, foto_rel):
-        base = os.path.basename(foto_rel)
-        name, ext = os.path.splitext(base)
-        return os.path.join("imagens", "thumbs", f"{name}_thumb.jpg").replace("\\", "/")
+        return caminho_thumb(foto_rel)
+
+    def photo_for(self, familia, target_size, dpr=1.0):
+        """Caminho absoluto da menor variante da foto que cobre `target_size`.
+
+        `familia` é o registro (ou o caminho relativo da foto); `target_size` é
+        o lado máximo ou a área (largura, altura) em pixels lógicos e `dpr` a
+        densidade da tela. Sem variante adequada, retorna a foto otimizada.
+        """
+        foto_rel = familia.get("foto", "") if isinstance(familia, dict) else (familia or "")
+        if not foto_rel:
+            return ""
+        foto_abs = self._resolve_photo_abs(foto_rel)
+        lado = lado_necessario(foto_abs, target_size, dpr)
+        for variante in variantes_que_cobrem(lado, self._manifesto_thumbs().variantes):
+            thumb_abs = os.path.join(self.base_path_data, caminho_thumb(foto_rel, variante))
+            if os.path.exists(thumb_abs):
+                return thumb_abs
+        return foto_abs
 
     def _generate_thumb(self, foto_abs):
-        try:
-            from PySide6.QtGui import QImage
-            img = QImage(foto_abs)
-            if img.isNull():
-                return
-            img = img.scaled(240, 240, aspectRatioMode=1)
-            thumb_abs = os.path.join(self.base_path_data, "imagens", "thumbs", f"{os.path.splitext(os.path.basename(foto_abs))[0]}_thumb.jpg")
-            img.save(thumb_abs, "JPG", 80)
-        except Exception:
-            pass
+        gerar_thumbs(foto_abs, self._thumbs_dir())
+
+    def _manifesto_thumbs(self):
+        if self._manifesto is None:
+            self._manifesto = ManifestoThumbs(self.base_path_data, self._thumbs_dir())
+        return self._manifesto
+
+    def _remover_thumbs(self, foto_rel):
+        manifesto = self._manifesto_thumbs()
+        for variante in manifesto.variantes:
+            try:
+                thumb_abs = os.path.join(self.base_path_data, caminho_thumb(foto_rel, variante))
+                if os.path.exists(thumb_abs):
+                    os.remove(thumb_abs)
+            except Exception:
+                pass
+        manifesto.remover(foto_rel)
+        manifesto.salvar()
+
+    def atualizar_thumbs(self, fotos_rel, podar=False):
+        """Refaz só as miniaturas ausentes ou desatualizadas; retorna quantas foram geradas."""
+        manifesto = self._manifesto_thumbs()
+        fotos_rel = list(fotos_rel)
+        if podar:
+            manifesto.podar(fotos_rel)
+        geradas = 0
+        for foto_rel in fotos_rel:
+            try:
+                if manifesto.atualizado(foto_rel):
+                    continue
+                if gerar_thumbs(self._resolve_photo_abs(foto_rel), self._thumbs_dir(), manifesto.variantes):
+                    manifesto.registrar(foto_rel)
+                    geradas += 1
+            except Exception as e:
+                logging.warning(f"Falha ao atualizar miniatura de {foto_rel}: {str(e)}")
+        manifesto.salvar()
+        if geradas:
+            logging.info(f"Miniaturas: {geradas} regeneradas")
+        return geradas
+
+    def atualizar_thumbs_em_segundo_plano(self, fotos_rel, podar=False):
+        def _executar():
+            try:
+                self.atualizar_thumbs(fotos_rel, podar)
+            except Exception as e:
+                logging.error(f"Erro ao atualizar miniaturas: {str(e)}")
+
+        self._thread_thumbs = threading.Thread(target=_executar, name="atualizar-thumbs", daemon=True)
+        self._thread_thumbs.start()
+        return self._thread_thumbs
 
     def _is_valid_nome(self, nome):
         return isinstance(nome, str) and nome.strip() != ""
@@ -476,28 +1170,7 @@ class DataManager:
             return False
         return re.fullmatch(r"\d{2}/\d{2}/\d{4}", data_str) is not None
 
-    def verificar_integridade_dados(self):
-        try:
-            familias = []
-            if os.path.exists(self.familias_file):
-                with open(self.familias_file, "r", encoding="utf-8") as f:
-                    familias = json.load(f)
-            else:
-                self._atomic_write(self.familias_file, [])
-                self._familias_cache = []
-                return True
-        except Exception as e:
-            try:
-                bak = self.familias_file + ".bak"
-                if os.path.exists(self.familias_file):
-                    shutil.copy2(self.familias_file, bak)
-                self._atomic_write(self.familias_file, [])
-                self._familias_cache = []
-            except Exception:
-                pass
-            logging.error(f"Falha ao ler famílias, fallback para lista vazia: {str(e)}")
-            return False
-
+    def _corrigir_familias(self, familias):
         corrigidas = []
         for f in familias:
             nome = f.get("nome")
@@ -534,35 +1207,105 @@ class DataManager:
             if data_s:
                 nf["data_sorteio"] = data_s
             corrigidas.append(self._normalize_familia(nf))
+        return corrigidas
 
+    def _agendar_thumbs(self, familias):
+        # Só miniaturas ausentes ou desatualizadas (manifesto), fora da inicialização
+        fotos = [nf["foto"] for nf in familias if nf.get("foto")]
+        if self.thumbs_em_segundo_plano:
+            self.atualizar_thumbs_em_segundo_plano(fotos, podar=True)
+        else:
+            self.atualizar_thumbs(fotos, podar=True)
+
+    def verificar_integridade_dados(self):
         try:
-            self._atomic_write(self.familias_file, corrigidas)
-            self._familias_cache = corrigidas
-            for nf in corrigidas:
-                rel = nf.get("foto")
-                if rel:
-                    absf = self._resolve_photo_abs(rel)
-                    if os.path.exists(absf):
-                        self._generate_thumb(absf)
+            familias = []
+            if self._backend.existe():
+                familias = self._backend.carregar_familias()
+            else:
+                self._backend.substituir_familias([])
+                self._definir_cache([])
+                self._registrar_assinatura()
+                return True
+        except Exception as e:
+            try:
+                self._backend.descartar_corrompido()
+                self._definir_cache([])
+                self._registrar_assinatura()
+            except Exception:
+                pass
+            logging.error(f"Falha ao ler famílias, fallback para lista vazia: {str(e)}")
+            return False
+
+        corrigidas = self._corrigir_familias(familias)
+        try:
+            self._backend.substituir_familias(corrigidas)
+            self._definir_cache(corrigidas)
+            self._registrar_assinatura()
+            self._agendar_thumbs(corrigidas)
             logging.info(f"Validação: {len(corrigidas)} famílias válidas salvas")
             return True
         except Exception as e:
             logging.error(f"Erro ao salvar famílias após validação: {str(e)}")
             return False
 
+    def validar_em_leitura(self):
+        """Lê e valida as famílias sem tocar no cache nem nos arquivos.
+
+        Pode rodar fora do thread da interface; o resultado deve ser aplicado
+        com `aplicar_validacao` no thread da interface. Levanta exceção se os
+        dados não puderem ser lidos.
+        """
+        assinatura = self._backend.assinatura()
+        leitor = criar_backend(self.base_path_data, self._backend.nome, somente_leitura=True)
+        try:
+            if not leitor.existe():
+                return {"assinatura": assinatura, "corrigidas": [], "alterado": True}
+            familias = leitor.carregar_familias()
+        finally:
+            if hasattr(leitor, "fechar"):
+                leitor.fechar()
+        corrigidas = self._corrigir_familias(familias)
+        return {"assinatura": assinatura, "corrigidas": corrigidas, "alterado": corrigidas != familias}
+
+    def aplicar_validacao(self, resultado):
+        """Aplica o resultado de `validar_em_leitura`; retorna (ok, alterado).
+
+        Se os dados mudaram no disco desde a leitura (ou ela falhou), a
+        validação é refeita aqui de forma síncrona.
+        """
+        try:
+            valido = resultado is not None and self._backend.assinatura() == resultado["assinatura"]
+        except Exception:
+            valido = False
+        if not valido:
+            geracao = self.generation
+            ok = self.verificar_integridade_dados()
+            return ok, self.generation != geracao
+        corrigidas = resultado["corrigidas"]
+        try:
+            if resultado["alterado"]:
+                self._backend.substituir_familias(corrigidas)
+                self._definir_cache(corrigidas)
+                self._registrar_assinatura()
+                logging.info(f"Validação: {len(corrigidas)} famílias válidas salvas")
+            self._agendar_thumbs(corrigidas)
+            return True, resultado["alterado"]
+        except Exception as e:
+            logging.error(f"Erro ao salvar famílias após validação: {str(e)}")
+            return False, False
+
     def verificar_integridade_sorteio(self):
         try:
-            if not os.path.exists(self.sorteio_file):
+            existe, num = self._backend.ler_ultimo()
+            if not existe:
                 return True
-            with open(self.sorteio_file, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-            num = dados.get("ultimo_sorteado")
             try:
                 num = int(num)
             except Exception:
                 num = None
-            familias = self.carregar_familias()
-            ok = num is not None and any(int(f.get("numero")) == num and f.get("sorteado") for f in familias)
+            familia = self.get_by_numero(num) if num is not None else None
+            ok = bool(familia and familia.get("sorteado"))
             if not ok:
                 self._recalcular_ultimo_sorteado()
             return True
@@ -577,24 +1320,35 @@ class DataManager:
 
     def alterar_status_familia(self, numero, novo_status: bool):
         try:
-            familias = self.carregar_familias()
-            familia = next((f for f in familias if str(f.get("numero")) == str(numero)), None)
+            store = self._garantir_store()
+            familia = self.get_by_numero(numero)
             if not familia:
                 return False
-            familia["sorteado"] = bool(novo_status)
-            if familia["sorteado"]:
-                from datetime import datetime
-                familia["data_sorteio"] = datetime.now().strftime("%d/%m/%Y")
-                self.salvar_sorteio(numero)
+            devolvida = bool(familia.get("sorteado")) and not novo_status
+            nova = not familia.get("sorteado") and bool(novo_status)
+            # Só o registro da família e o último sorteado vão para o disco, na mesma gravação
+            if novo_status:
+                if nova:
+                    # A primeira família sorteada marca o início do ciclo
+                    self._garantir_ciclo()
+                ultimo = numero
+                self._alterar_registro(
+                    familia, {"sorteado": True, "data_sorteio": datetime.now().strftime("%d/%m/%Y")}, ultimo=ultimo
+                )
             else:
-                familia.pop("data_sorteio", None)
-            ok = self.salvar_familias(familias)
-            if ok:
-                logging.info(f"Status da família {familia.get('nome')} ({numero}) alterado para {familia['sorteado']}")
-                if not familia["sorteado"]:
-                    # Se a família que estava como última for revertida, recalcula a última válida
-                    self._recalcular_ultimo_sorteado()
-            return ok
+                # Revertida: a última passa a ser a mais recente entre as outras sorteadas
+                ultima = store.ultima_sorteada(exceto=familia)
+                ultimo = ultima.get("numero") if ultima is not None else None
+                self._alterar_registro(familia, {"sorteado": False}, remover=("data_sorteio",), ultimo=ultimo)
+            self._ultimo_sorteio_cache = ultimo
+            if devolvida and familia.get("id") is not None:
+                # Devolvida ao sorteio: volta para a parte não sorteada do ciclo
+                self._garantir_motor().acrescentar([familia["id"]])
+                self._garantir_estatisticas().desfazer(familia["id"])
+            elif nova and familia.get("id") is not None:
+                self._garantir_estatisticas().registrar(familia["id"], data_iso(familia["data_sorteio"]))
+            logging.info(f"Status da família {familia.get('nome')} ({numero}) alterado para {familia['sorteado']}")
+            return True
         except Exception as e:
             logging.error(f"Erro ao alterar status da família {numero}: {str(e)}")
             return False
@@ -602,29 +1356,17 @@ class DataManager:
     def _recalcular_ultimo_sorteado(self):
         """Determina e persiste a última família sorteada válida baseada na data_sorteio."""
         try:
-            familias = self.carregar_familias(force_reload=True)
-            # Filtra apenas sorteadas; usa data_sorteio como prioridade; em fallback usa número maior
-            def key_fn(f):
-                ds = f.get("data_sorteio")
-                if ds:
-                    try:
-                        # dd/mm/yyyy -> tuple (yyyy, mm, dd) para ordenar corretamente
-                        d, m, y = ds.split("/")
-                        return (int(y), int(m), int(d), int(f.get("numero", 0)))
-                    except Exception:
-                        pass
-                return (0, 0, 0, int(f.get("numero", 0)))
-            sorteadas = [f for f in familias if f.get("sorteado")]
-            if not sorteadas:
+            self.carregar_familias(force_reload=True)
+            # Usa data_sorteio como prioridade; em fallback, o número maior
+            ultima = self.ultima_sorteada
+            if ultima is None:
                 # limpa arquivo e cache
-                if os.path.exists(self.sorteio_file):
-                    try:
-                        os.remove(self.sorteio_file)
-                    except Exception:
-                        pass
+                try:
+                    self._alterar_ultimo_no_backend(self._backend.apagar_ultimo)
+                except Exception:
+                    pass
                 self._ultimo_sorteio_cache = None
                 return None
-            ultima = sorted(sorteadas, key=key_fn, reverse=True)[0]
             num = ultima.get("numero")
             self.salvar_sorteio(num)
             return num
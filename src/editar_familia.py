@@ -1,9 +1,10 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFileDialog, QHBoxLayout, QMessageBox, QFrame
 )
-from PySide6.QtGui import QPixmap, QFont
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QSize
 import os
+from src.cache_imagens import CachePixmaps
 from src.data_manager import DataManager
 from PySide6.QtGui import QIcon
 from src.icon import get_icon_path
@@ -110,10 +111,9 @@ class JanelaEditarFamilia(QWidget):
         root.addLayout(form, 1)
 
     def carregar_foto(self):
-        caminho = self.familia.get("foto", "")
-        abs_path = self.data_manager._resolve_photo_abs(caminho) if caminho else ""
-        if abs_path and os.path.exists(abs_path):
-            pixmap = QPixmap(abs_path).scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        abs_path = self.data_manager.photo_for(self.familia, 150, self.devicePixelRatioF())
+        pixmap = CachePixmaps.compartilhado().obter(abs_path, QSize(150, 150), self.devicePixelRatioF()) if abs_path else None
+        if pixmap is not None:
             self.foto_label.setPixmap(pixmap)
         else:
             self.foto_label.setText("📷")
@@ -127,8 +127,9 @@ class JanelaEditarFamilia(QWidget):
         if caminho:
             self.caminho_foto = caminho
             QMessageBox.information(self, "Foto Selecionada", "Foto selecionada com sucesso!")
-            pixmap = QPixmap(caminho).scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.foto_label.setPixmap(pixmap)
+            pixmap = CachePixmaps.compartilhado().obter(caminho, QSize(300, 300), self.devicePixelRatioF())
+            if pixmap is not None:
+                self.foto_label.setPixmap(pixmap)
 
     def _foto_absoluta(self, rel_ou_abs):
         if os.path.isabs(rel_ou_abs):
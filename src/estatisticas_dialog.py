@@ -0,0 +1,120 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDialog, QFrame, QGridLayout, QHBoxLayout, QLabel, QProgressBar, QPushButton, QVBoxLayout
+)
+
+from src.icon import get_app_icon
+
+MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+
+
+def _formatar_mes(mes):
+    try:
+        ano, m = mes.split("-")
+        return f"{MESES[int(m) - 1]}/{ano}"
+    except Exception:
+        return mes or "-"
+
+
+def _formatar_data(data_iso):
+    try:
+        ano, mes, dia = data_iso[:10].split("-")
+        return f"{dia}/{mes}/{ano}"
+    except Exception:
+        return data_iso
+
+
+class JanelaEstatisticas(QDialog):
+    """Painel de estatísticas do sorteio, montado a partir de `DataManager.estatisticas()`.
+
+    Só exibe o resumo recebido: os números já vêm dos agregados mantidos a
+    cada sorteio, então abrir a janela não lê o histórico.
+    """
+
+    def __init__(self, resumo, parent=None, meses=12):
+        super().__init__(parent)
+        self.resumo = resumo
+        self.setWindowTitle("Estatísticas do sorteio")
+        self.setModal(True)
+        self.resize(640, 560)
+        try:
+            icon = get_app_icon()
+            if not icon.isNull():
+                self.setWindowIcon(icon)
+        except Exception:
+            pass
+        self.setStyleSheet("""
+            QDialog { background-color: #F5F7F6; }
+            QFrame#card { background-color: white; border: 1px solid #E5E7EB; border-radius: 12px; }
+            QLabel#valor { font-size: 22px; font-weight: 800; color: #2c4b23; }
+            QLabel#legenda { font-size: 12px; color: #6B7280; }
+            QLabel#secao { font-size: 15px; font-weight: 700; color: #1F2937; }
+            QProgressBar { border: none; background-color: #EEF2EE; border-radius: 4px; height: 14px; text-align: right; }
+            QProgressBar::chunk { background-color: #2c4b23; border-radius: 4px; }
+            QPushButton { padding: 8px 16px; background-color: #2c4b23; color: white; border: none; border-radius: 8px; font-weight: 600; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(16)
+
+        cards = QHBoxLayout()
+        cards.setSpacing(12)
+        taxa = resumo.get("taxa_conclusao") or 0.0
+        cards.addWidget(self._card(
+            f"{taxa * 100:.0f}%", f"do ciclo atual ({resumo.get('sorteadas', 0)} de {resumo.get('total', 0)})"
+        ))
+        espera = resumo.get("espera_media")
+        cards.addWidget(self._card("-" if espera is None else f"{espera:.1f} dias", "espera média até o sorteio"))
+        cards.addWidget(self._card(str(resumo.get("ciclos_encerrados", 0)), "ciclos encerrados"))
+        layout.addLayout(cards)
+
+        layout.addWidget(self._titulo("Sorteios por mês"))
+        por_mes = list(resumo.get("por_mes", {}).items())[-meses:]
+        self.grade_meses = QGridLayout()
+        self.grade_meses.setHorizontalSpacing(12)
+        maior = max((q for _, q in por_mes), default=0)
+        for linha, (mes, quantidade) in enumerate(por_mes):
+            barra = QProgressBar()
+            barra.setRange(0, max(1, maior))
+            barra.setValue(quantidade)
+            barra.setFormat(str(quantidade))
+            self.grade_meses.addWidget(QLabel(_formatar_mes(mes)), linha, 0)
+            self.grade_meses.addWidget(barra, linha, 1)
+        if not por_mes:
+            self.grade_meses.addWidget(QLabel("Nenhum sorteio registrado ainda."), 0, 0)
+        layout.addLayout(self.grade_meses)
+
+        layout.addWidget(self._titulo("Aguardando há mais tempo"))
+        self.lista_espera = QVBoxLayout()
+        self.lista_espera.setSpacing(4)
+        for familia, ultimo in resumo.get("mais_esperando", []):
+            quando = f"último sorteio em {_formatar_data(ultimo)}" if ultimo else "nunca sorteada"
+            self.lista_espera.addWidget(QLabel(f"Nº {familia.get('numero')} — {familia.get('nome', '')} ({quando})"))
+        if not resumo.get("mais_esperando"):
+            self.lista_espera.addWidget(QLabel("Todas as famílias já foram sorteadas neste ciclo."))
+        layout.addLayout(self.lista_espera)
+        layout.addStretch()
+
+        fechar = QPushButton("Fechar")
+        fechar.clicked.connect(self.accept)
+        layout.addWidget(fechar, alignment=Qt.AlignRight)
+
+    def _card(self, valor, legenda):
+        card = QFrame()
+        card.setObjectName("card")
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(14, 12, 14, 12)
+        rotulo_valor = QLabel(valor)
+        rotulo_valor.setObjectName("valor")
+        rotulo_legenda = QLabel(legenda)
+        rotulo_legenda.setObjectName("legenda")
+        rotulo_legenda.setWordWrap(True)
+        card_layout.addWidget(rotulo_valor)
+        card_layout.addWidget(rotulo_legenda)
+        return card
+
+    def _titulo(self, texto):
+        rotulo = QLabel(texto)
+        rotulo.setObjectName("secao")
+        return rotulo
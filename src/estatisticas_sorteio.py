@@ -0,0 +1,173 @@
+import heapq
+import json
+import logging
+import os
+from datetime import date
+
+
+def _dias_entre(inicio, fim):
+    try:
+        return max(0, (date.fromisoformat(fim[:10]) - date.fromisoformat(inicio[:10])).days)
+    except Exception:
+        return None
+
+
+class EstatisticasSorteio:
+    """Agregados do painel de estatísticas, atualizados a cada sorteio.
+
+    Guarda sorteios por mês, a soma das esperas (dias do início do ciclo até
+    o sorteio), a data do último sorteio de cada família e os sorteios do
+    ciclo atual, que podem ser desfeitos. Fica em
+    `dados/estatisticas_sorteio.json`; `reconstruir(entradas)` refaz tudo a
+    partir das entradas brutas do histórico para conferência.
+    """
+
+    def __init__(self, dados_dir):
+        self.arquivo = os.path.join(dados_dir, "estatisticas_sorteio.json")
+        self._limpar()
+
+    def _limpar(self):
+        self.por_mes = {}
+        self.espera_total = 0
+        self.esperas = 0
+        self.ultimo = {}
+        self.atual = {}
+        self.ciclos_encerrados = 0
+        self.ciclo = None
+        self.inicio_ciclo = None
+
+    def estado(self):
+        return {
+            "por_mes": dict(sorted(self.por_mes.items())),
+            "espera_total": self.espera_total,
+            "esperas": self.esperas,
+            "ultimo": self.ultimo,
+            "atual": self.atual,
+            "ciclos_encerrados": self.ciclos_encerrados,
+            "ciclo": self.ciclo,
+            "inicio_ciclo": self.inicio_ciclo,
+        }
+
+    def carregar(self):
+        self._limpar()
+        try:
+            if not os.path.exists(self.arquivo):
+                return False
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            self.por_mes = dict(dados.get("por_mes", {}))
+            self.espera_total = dados.get("espera_total", 0)
+            self.esperas = dados.get("esperas", 0)
+            self.ultimo = dict(dados.get("ultimo", {}))
+            self.atual = dict(dados.get("atual", {}))
+            self.ciclos_encerrados = dados.get("ciclos_encerrados", 0)
+            self.ciclo = dados.get("ciclo")
+            self.inicio_ciclo = dados.get("inicio_ciclo")
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao carregar estatísticas de sorteio: {str(e)}")
+            self._limpar()
+            return False
+
+    def salvar(self):
+        try:
+            tmp_path = os.path.join(os.path.dirname(self.arquivo), ".estatisticas_sorteio.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.estado(), f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.arquivo)
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao salvar estatísticas de sorteio: {str(e)}")
+            return False
+
+    # Atualização incremental
+
+    def _somar(self, id_familia, data, inicio_ciclo):
+        chave = str(id_familia)
+        data = data[:10]
+        if chave in self.atual or not data:
+            return False
+        espera = _dias_entre(inicio_ciclo, data) if inicio_ciclo else None
+        mes = data[:7]
+        self.por_mes[mes] = self.por_mes.get(mes, 0) + 1
+        if espera is not None:
+            self.espera_total += espera
+            self.esperas += 1
+        self.atual[chave] = {"data": data, "espera": espera, "anterior": self.ultimo.get(chave)}
+        if data >= self.ultimo.get(chave, ""):
+            self.ultimo[chave] = data
+        return True
+
+    def registrar(self, id_familia, data):
+        """Soma o sorteio da família em `data` (ISO) ao ciclo atual."""
+        if self._somar(id_familia, data, self.inicio_ciclo):
+            self.salvar()
+
+    def desfazer(self, id_familia):
+        """Retira o sorteio da família no ciclo atual (status revertido ou família excluída)."""
+        registro = self.atual.pop(str(id_familia), None)
+        if registro is None:
+            return
+        mes = registro["data"][:7]
+        restantes = self.por_mes.get(mes, 0) - 1
+        if restantes > 0:
+            self.por_mes[mes] = restantes
+        else:
+            self.por_mes.pop(mes, None)
+        if registro["espera"] is not None:
+            self.espera_total -= registro["espera"]
+            self.esperas -= 1
+        if registro["anterior"]:
+            self.ultimo[str(id_familia)] = registro["anterior"]
+        else:
+            self.ultimo.pop(str(id_familia), None)
+        self.salvar()
+
+    def iniciar_ciclo(self, ciclo, inicio, encerrando=False):
+        # Como no histórico, só conta ciclo que teve sorteio
+        if encerrando and self.atual:
+            self.ciclos_encerrados += 1
+        self.ciclo = ciclo
+        self.inicio_ciclo = inicio
+        self.atual = {}
+        self.salvar()
+
+    # Consultas
+
+    @property
+    def espera_media(self):
+        """Média de dias entre o início do ciclo e o sorteio, ou None sem dados."""
+        return self.espera_total / self.esperas if self.esperas else None
+
+    def mais_esperando(self, pendentes, limite=5):
+        """As `limite` famílias pendentes há mais tempo sem sorteio (nunca sorteadas primeiro)."""
+        return heapq.nsmallest(
+            limite, pendentes,
+            key=lambda f: (self.ultimo.get(str(f.get("id")), ""), str(f.get("numero", "")).zfill(6)),
+        )
+
+    def ultimo_da_familia(self, id_familia):
+        return self.ultimo.get(str(id_familia))
+
+    # Reconstrução
+
+    def reconstruir(self, arquivadas, atuais, ciclo, inicio_ciclo):
+        """Refaz os agregados a partir das entradas brutas.
+
+        `arquivadas` são as entradas do histórico (com `inicio_ciclo` de cada
+        ciclo); `atuais`, as do ciclo em andamento. Não grava nada.
+        """
+        self._limpar()
+        ciclos = []
+        for entrada in arquivadas:
+            if entrada.get("ciclo") not in ciclos:
+                ciclos.append(entrada.get("ciclo"))
+            self.atual = {}
+            self._somar(entrada.get("id"), entrada.get("data") or "", entrada.get("inicio_ciclo"))
+        self.atual = {}
+        self.ciclos_encerrados = len(ciclos)
+        self.ciclo = ciclo
+        self.inicio_ciclo = inicio_ciclo
+        for entrada in atuais:
+            self._somar(entrada.get("id"), entrada.get("data") or "", inicio_ciclo)
+        return self
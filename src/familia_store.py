@@ -0,0 +1,308 @@
+import bisect
+
+
+def chave_numero(valor):
+    """Normaliza número/id para uso como chave de índice (int quando possível)."""
+    if isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, int):
+        return valor
+    texto = str(valor if valor is not None else "").strip()
+    try:
+        return int(texto)
+    except Exception:
+        return texto
+
+
+def chave_ultima_sorteada(familia):
+    """Ordem de "mais recente" entre sorteadas: data_sorteio (dd/mm/aaaa), depois o número."""
+    try:
+        numero = int(familia.get("numero", 0))
+    except Exception:
+        numero = 0
+    ds = familia.get("data_sorteio")
+    if ds:
+        try:
+            d, m, y = ds.split("/")
+            return (int(y), int(m), int(d), numero)
+        except Exception:
+            pass
+    return (0, 0, 0, numero)
+
+
+def mes_sorteio(familia):
+    """"aaaa-mm" da `data_sorteio` (dd/mm/aaaa), ou "" se ausente/inválida."""
+    try:
+        _, m, y = str(familia.get("data_sorteio") or "").split("/")
+        return f"{int(y):04d}-{int(m):02d}"
+    except Exception:
+        return ""
+
+
+class FamiliaStore:
+    """Lista de famílias em memória com índices por número, id e status,
+    além da contagem de referências de cada foto.
+
+    Os contadores por status, a última família sorteada e a lista ordenada
+    dos números pendentes são mantidos a cada mutação; lê-los não percorre
+    a lista.
+
+    A lista exposta em `familias` é a mesma usada pelo cache do DataManager;
+    toda mutação deve passar por `adicionar`, `remover` ou `atualizar` para
+    manter os índices coerentes.
+    """
+
+    def __init__(self, familias=None):
+        self.carregar(familias if familias is not None else [])
+
+    def carregar(self, familias):
+        self._familias = familias
+        self._por_numero = {}
+        self._por_id = {}
+        self._sorteadas = {}
+        self._pendentes = {}
+        self._chaves = {}
+        self._refs_foto = {}
+        self._por_mes = {}
+        self._max_id = 0
+        self._max_numero = 0
+        self._ultima = None
+        self._ultima_valida = True
+        self._numeros_pendentes = []
+        for familia in familias:
+            self._indexar(familia, em_lote=True)
+        self._numeros_pendentes.sort()
+
+    @property
+    def familias(self):
+        return self._familias
+
+    def __len__(self):
+        return len(self._familias)
+
+    def _indexar(self, familia, em_lote=False):
+        k_num = chave_numero(familia.get("numero"))
+        k_id = chave_numero(familia.get("id"))
+        sorteado = bool(familia.get("sorteado", False))
+        foto = familia.get("foto") or ""
+        self._por_numero[k_num] = familia
+        if familia.get("id") is not None:
+            self._por_id[k_id] = familia
+        (self._sorteadas if sorteado else self._pendentes)[id(familia)] = familia
+        if not sorteado and isinstance(k_num, int):
+            if em_lote:
+                self._numeros_pendentes.append(k_num)
+            else:
+                bisect.insort(self._numeros_pendentes, k_num)
+        if sorteado and self._ultima_valida and (
+            self._ultima is None or chave_ultima_sorteada(familia) > chave_ultima_sorteada(self._ultima)
+        ):
+            self._ultima = familia
+        if foto:
+            self._refs_foto[foto] = self._refs_foto.get(foto, 0) + 1
+        mes = mes_sorteio(familia) if sorteado else ""
+        if mes:
+            self._por_mes[mes] = self._por_mes.get(mes, 0) + 1
+        self._chaves[id(familia)] = (k_num, k_id, sorteado, foto, mes)
+        if isinstance(k_id, int):
+            self._max_id = max(self._max_id, k_id)
+        if isinstance(k_num, int):
+            self._max_numero = max(self._max_numero, k_num)
+
+    def _desindexar(self, familia):
+        chaves = self._chaves.pop(id(familia), None)
+        if chaves is None:
+            return
+        k_num, k_id, sorteado, foto, mes = chaves
+        if mes:
+            restantes = self._por_mes.get(mes, 0) - 1
+            if restantes > 0:
+                self._por_mes[mes] = restantes
+            else:
+                self._por_mes.pop(mes, None)
+        if self._por_numero.get(k_num) is familia:
+            del self._por_numero[k_num]
+        if self._por_id.get(k_id) is familia:
+            del self._por_id[k_id]
+        (self._sorteadas if sorteado else self._pendentes).pop(id(familia), None)
+        if not sorteado and isinstance(k_num, int):
+            i = bisect.bisect_left(self._numeros_pendentes, k_num)
+            if i < len(self._numeros_pendentes) and self._numeros_pendentes[i] == k_num:
+                del self._numeros_pendentes[i]
+        if self._ultima is familia:
+            # Recalculada só na próxima leitura
+            self._ultima = None
+            self._ultima_valida = False
+        if foto:
+            restantes = self._refs_foto.get(foto, 0) - 1
+            if restantes > 0:
+                self._refs_foto[foto] = restantes
+            else:
+                self._refs_foto.pop(foto, None)
+
+    def _recalcular_maximos(self):
+        ids = [k for k in self._por_id if isinstance(k, int)]
+        numeros = [k for k in self._por_numero if isinstance(k, int)]
+        self._max_id = max(ids, default=0)
+        self._max_numero = max(numeros, default=0)
+
+    def get_by_numero(self, numero):
+        return self._por_numero.get(chave_numero(numero))
+
+    def get_by_id(self, id_familia):
+        return self._por_id.get(chave_numero(id_familia))
+
+    def sorteadas(self):
+        return list(self._sorteadas.values())
+
+    def pendentes(self):
+        return list(self._pendentes.values())
+
+    def pendentes_com_prefixo(self, prefixo):
+        """Gera as pendentes cujo número começa com `prefixo`: menos dígitos
+        primeiro e, entre os de mesmo tamanho, em ordem crescente.
+
+        Para cada quantidade de dígitos os números com o prefixo formam um
+        intervalo ("1": 1, 10-19, 100-199...), localizado por bisect nos
+        números pendentes; quem consome só o começo não percorre o resto.
+        """
+        prefixo = str(prefixo or "").strip()
+        numeros = self._numeros_pendentes
+        if not prefixo.isdigit() or not numeros or str(int(prefixo)) != prefixo:
+            return
+        inicio = int(prefixo)
+        fim = inicio + 1
+        while inicio <= numeros[-1]:
+            i = bisect.bisect_left(numeros, inicio)
+            j = bisect.bisect_left(numeros, fim, i)
+            for numero in numeros[i:j]:
+                familia = self._por_numero.get(numero)
+                if familia is not None and id(familia) in self._pendentes:
+                    yield familia
+            if inicio == 0:
+                break
+            inicio, fim = inicio * 10, fim * 10
+
+    @property
+    def total_sorteadas(self):
+        return len(self._sorteadas)
+
+    @property
+    def total_pendentes(self):
+        return len(self._pendentes)
+
+    @property
+    def todas_sorteadas(self):
+        """True quando não há família pendente."""
+        return not self._pendentes
+
+    def sorteadas_por_mes(self):
+        """{"aaaa-mm": quantidade} das famílias sorteadas com `data_sorteio` válida."""
+        return dict(self._por_mes)
+
+    def ultima_sorteada(self, exceto=None):
+        """Família sorteada mais recente (ver `chave_ultima_sorteada`), ou None.
+
+        Com `exceto`, a mais recente sem contar essa família (só percorre as
+        sorteadas quando `exceto` é a própria última).
+        """
+        if not self._ultima_valida:
+            self._ultima = max(self._sorteadas.values(), key=chave_ultima_sorteada, default=None)
+            self._ultima_valida = True
+        if exceto is not None and self._ultima is exceto:
+            return max(
+                (f for f in self._sorteadas.values() if f is not exceto), key=chave_ultima_sorteada, default=None
+            )
+        return self._ultima
+
+    def referencias_foto(self, foto_rel):
+        return self._refs_foto.get(foto_rel, 0)
+
+    def proximo_id(self):
+        return self._max_id + 1
+
+    def proximo_numero(self):
+        return self._max_numero + 1
+
+    def adicionar(self, familia):
+        self._familias.append(familia)
+        self._indexar(familia)
+
+    def remover(self, familia):
+        self._desindexar(familia)
+        for i, f in enumerate(self._familias):
+            if f is familia:
+                del self._familias[i]
+                break
+        self._recalcular_maximos()
+
+    def atualizar(self, familia):
+        """Reindexa uma família já presente após alteração de número, id, status ou foto."""
+        self._desindexar(familia)
+        self._indexar(familia)
+
+
+def chave_familia(familia):
+    """Identidade estável de uma família entre gravações: o id, ou o número sem id."""
+    if familia.get("id") is not None:
+        return ("id", chave_numero(familia.get("id")))
+    return ("numero", chave_numero(familia.get("numero")))
+
+
+class AlteracaoFamilias:
+    """Diferença entre dois estados da lista de famílias.
+
+    `inseridas` e `atualizadas` trazem os registros novos, `removidas` os
+    antigos e `renumeradas` pares (antigo, novo). `recarregada` indica que
+    não foi possível comparar registro a registro (chaves repetidas) e
+    quem observa deve recarregar tudo.
+    """
+
+    def __init__(self, inseridas=None, atualizadas=None, removidas=None, renumeradas=None, recarregada=False):
+        self.inseridas = inseridas or []
+        self.atualizadas = atualizadas or []
+        self.removidas = removidas or []
+        self.renumeradas = renumeradas or []
+        self.recarregada = recarregada
+
+    @property
+    def vazia(self):
+        return not (self.inseridas or self.atualizadas or self.removidas or self.renumeradas or self.recarregada)
+
+    def numeros(self):
+        """Números afetados (antigos e novos)."""
+        numeros = {f.get("numero") for f in self.inseridas + self.atualizadas + self.removidas}
+        for antiga, nova in self.renumeradas:
+            numeros.update((antiga.get("numero"), nova.get("numero")))
+        return numeros
+
+    def __repr__(self):
+        return (
+            f"AlteracaoFamilias(inseridas={len(self.inseridas)}, atualizadas={len(self.atualizadas)}, "
+            f"removidas={len(self.removidas)}, renumeradas={len(self.renumeradas)}, recarregada={self.recarregada})"
+        )
+
+
+def diferenca_familias(antigas, novas):
+    """Compara duas listas de famílias pela `chave_familia`; retorna `AlteracaoFamilias`."""
+    por_chave = {}
+    for familia in antigas:
+        por_chave[chave_familia(familia)] = familia
+    novas_por_chave = {}
+    for familia in novas:
+        novas_por_chave[chave_familia(familia)] = familia
+    if len(por_chave) != len(antigas) or len(novas_por_chave) != len(novas):
+        return AlteracaoFamilias(recarregada=True)
+    alteracao = AlteracaoFamilias()
+    for chave, nova in novas_por_chave.items():
+        antiga = por_chave.get(chave)
+        if antiga is None:
+            alteracao.inseridas.append(nova)
+        elif chave_numero(antiga.get("numero")) != chave_numero(nova.get("numero")):
+            alteracao.renumeradas.append((antiga, nova))
+        elif antiga != nova:
+            alteracao.atualizadas.append(nova)
+    for chave, antiga in por_chave.items():
+        if chave not in novas_por_chave:
+            alteracao.removidas.append(antiga)
+    return alteracao
@@ -1,6 +1,11 @@
+import bisect
+import heapq
+import itertools
 import unicodedata
 import re
 
+from src.familia_store import chave_familia
+
 def _normalize(text: str) -> str:
     if not isinstance(text, str):
         text = str(text or "")
@@ -19,18 +24,173 @@ def nao_sorteadas(familias):
 def sorteadas(familias):
     return [f for f in familias if f.get("sorteado", False)]
 
-def buscar(familias, termo):
+def tokens_busca(termo):
     t = _normalize(termo)
-    if not t:
+    return t.split(" ") if t else []
+
+def trigramas(palavra):
+    """Trigramas da palavra com bordas (\"  ab\", \" ab\", ...), como no pg_trgm."""
+    p = f"  {palavra} "
+    return {p[i:i + 3] for i in range(len(p) - 2)}
+
+def refina(tokens, anteriores):
+    """True se todo resultado de `tokens` também é resultado de `anteriores`:
+    cada token anterior está contido em algum dos novos."""
+    return all(any(a in t for t in tokens) for a in anteriores)
+
+def corresponde(familia, tokens):
+    if not tokens:
+        return True
+    nome = _normalize(familia.get("nome", ""))
+    numero = _normalize(familia.get("numero", ""))
+    base = f"{nome} {numero}".strip()
+    # todos os tokens devem estar presentes (busca por semelhança, sem acentos)
+    return all(tok in base for tok in tokens)
+
+def buscar(familias, termo, indice=None):
+    if indice is not None:
+        return indice.buscar(termo, familias)
+    tokens = tokens_busca(termo)
+    if not tokens:
         return familias
+    return [f for f in familias if corresponde(f, tokens)]
+
+
+class IndiceBusca:
+    """Índice de busca das famílias, montado uma vez por geração dos dados.
+
+    Guarda, por família, nome e número já normalizados e as palavras de
+    cada um. As palavras distintas ficam em um array ordenado de sufixos:
+    um token da busca casa com uma palavra quando é prefixo de um de seus
+    sufixos, o que mantém a busca por trecho de `corresponde` sem percorrer
+    o acervo. `chaves(termo)` devolve as chaves (`chave_familia`) das
+    famílias que contêm todos os tokens, qualquer que seja o filtro de status.
+    """
+
+    def __init__(self, familias, anterior=None):
+        self.familias = list(familias)
+        # Normalizações e sufixos do índice anterior são reaproveitados:
+        # mudar o status de uma família não renormaliza nada
+        self._normalizados = {}
+        cache = anterior._normalizados if anterior is not None else {}
+        self.textos = {}
+        palavras = {}
+        for familia in self.familias:
+            chave = chave_familia(familia)
+            bruto = (str(familia.get("nome", "")), str(familia.get("numero", "")))
+            texto = cache.get(bruto)
+            if texto is None:
+                texto = f"{_normalize(bruto[0])} {_normalize(bruto[1])}".strip()
+            self._normalizados[bruto] = texto
+            self.textos[chave] = texto
+            for palavra in set(texto.split()):
+                palavras.setdefault(palavra, []).append(chave)
+        self._palavras = palavras
+        if anterior is not None and anterior._palavras.keys() == palavras.keys():
+            self._sufixos, self._origem = anterior._sufixos, anterior._origem
+        else:
+            pares = sorted((p[i:], p) for p in palavras for i in range(len(p)))
+            self._sufixos = [s for s, _ in pares]
+            self._origem = [p for _, p in pares]
+        self._por_token = {}
+        # Índice invertido trigrama -> palavras, montado na primeira busca aproximada
+        self._trigramas = None
+        # Última busca (tokens, chaves), base para refinar a seguinte
+        self._ultima = None
+
+    def __len__(self):
+        return len(self.familias)
+
+    def palavras_com(self, token):
+        """Palavras do índice que contêm `token`."""
+        inicio = bisect.bisect_left(self._sufixos, token)
+        fim = bisect.bisect_left(self._sufixos, token + "\uffff", inicio)
+        return set(self._origem[inicio:fim])
+
+    def _chaves_do_token(self, token):
+        chaves = self._por_token.get(token)
+        if chaves is None:
+            chaves = set()
+            for palavra in self.palavras_com(token):
+                chaves.update(self._palavras[palavra])
+            self._por_token[token] = chaves
+        return chaves
+
+    def chaves(self, termo):
+        """Chaves das famílias que contêm todos os tokens de `termo`, ou None sem busca.
+
+        Se `termo` refina a busca anterior ("mar" -> "mari"), só o resultado
+        anterior é filtrado.
+        """
+        tokens = tokens_busca(termo)
+        if not tokens:
+            return None
+        if self._ultima is not None and refina(tokens, self._ultima[0]):
+            chaves = {c for c in self._ultima[1] if all(t in self.textos[c] for t in tokens)}
+        else:
+            conjuntos = sorted((self._chaves_do_token(t) for t in set(tokens)), key=len)
+            chaves = set(conjuntos[0]).intersection(*conjuntos[1:])
+        self._ultima = (tokens, chaves)
+        return chaves
+
+    def _indice_trigramas(self):
+        if self._trigramas is None:
+            self._trigramas_palavra = {p: trigramas(p) for p in self._palavras if not p.isdigit()}
+            invertido = {}
+            for palavra, tri in self._trigramas_palavra.items():
+                for t in tri:
+                    invertido.setdefault(t, []).append(palavra)
+            self._trigramas = invertido
+        return self._trigramas
+
+    def _semelhanca_palavras(self, token):
+        """{palavra: semelhança} das palavras parecidas com `token` (0 a 1)."""
+        invertido = self._indice_trigramas()
+        tri = trigramas(token)
+        comuns = {}
+        for t in tri:
+            for palavra in invertido.get(t, ()):
+                comuns[palavra] = comuns.get(palavra, 0) + 1
+        notas = {}
+        for palavra, n in comuns.items():
+            # Jaccard dos trigramas
+            notas[palavra] = n / (len(tri) + len(self._trigramas_palavra[palavra]) - n)
+        # Quem contém o token casa na busca exata: semelhança máxima
+        for palavra in self.palavras_com(token):
+            notas[palavra] = 1.0
+        return notas
+
+    def semelhantes(self, termo, limite=20, minimo=0.3):
+        """Busca tolerante a erros de digitação: [(chave, nota)] das `limite`
+        famílias mais parecidas, da maior nota para a menor.
+
+        Cada token de texto recebe a maior semelhança entre ele e as palavras
+        da família; a nota é a média entre os tokens. Tokens numéricos seguem
+        a busca exata e só restringem as candidatas.
+        """
+        tokens = tokens_busca(termo)
+        numeros = [t for t in tokens if t.isdigit()]
+        textos = [t for t in tokens if not t.isdigit()]
+        permitidas = self.chaves(" ".join(numeros)) if numeros else None
+        if not textos:
+            # Só números: resultado da busca exata, na ordem das famílias
+            return list(itertools.islice(((c, 1.0) for c in self.textos if c in permitidas), limite))
+        soma = {}
+        for token in textos:
+            melhor = {}
+            for palavra, nota in self._semelhanca_palavras(token).items():
+                for chave in self._palavras[palavra]:
+                    if nota > melhor.get(chave, 0):
+                        melhor[chave] = nota
+            for chave, nota in melhor.items():
+                soma[chave] = soma.get(chave, 0) + nota
+        notas = ((c, s / len(textos)) for c, s in soma.items() if permitidas is None or c in permitidas)
+        return heapq.nlargest(limite, (cn for cn in notas if cn[1] >= minimo), key=lambda cn: cn[1])
 
-    tokens = t.split(" ")
-    resultado = []
-    for f in familias:
-        nome = _normalize(f.get("nome", ""))
-        numero = _normalize(f.get("numero", ""))
-        base = f"{nome} {numero}".strip()
-        # todos os tokens devem estar presentes (busca por semelhança, sem acentos)
-        if all(tok in base for tok in tokens):
-            resultado.append(f)
-    return resultado
+    def buscar(self, termo, familias=None):
+        """Como `buscar`, mantendo a ordem de `familias` (todas do índice, por padrão)."""
+        familias = self.familias if familias is None else familias
+        chaves = self.chaves(termo)
+        if chaves is None:
+            return familias
+        return [f for f in familias if chave_familia(f) in chaves]
@@ -0,0 +1,331 @@
+import bisect
+
+from PySide6.QtCore import QAbstractListModel, QEvent, QModelIndex, QRect, QSize, QSortFilterProxyModel, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen
+from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate, QToolTip
+
+from src.familia_store import chave_familia
+from src.filtro_familias import corresponde, tokens_busca
+
+# Papel com o registro completo da família
+PapelFamilia = Qt.UserRole + 1
+
+ALTURA_LINHA = 56
+ESPACO_LINHAS = 8
+LARGURA_MINIMA = 360
+
+
+def _chave_ordenacao(familia):
+    numero = familia.get("numero", 0)
+    try:
+        return (0, int(numero), "")
+    except Exception:
+        return (1, 0, str(numero))
+
+
+class ModeloFamilias(QAbstractListModel):
+    """Lista de famílias ordenada por número, usada pela galeria do painel."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._familias = []
+
+    def definir_familias(self, familias):
+        self.beginResetModel()
+        self._familias = sorted(familias, key=_chave_ordenacao)
+        self.endResetModel()
+
+    def familia(self, linha):
+        return self._familias[linha]
+
+    def aplicar_alteracao(self, alteracao, familias):
+        """Aplica só as linhas afetadas por `alteracao` (`AlteracaoFamilias`).
+
+        `familias` é a lista vigente; as linhas não afetadas passam a apontar
+        para os registros novos sem emitir nada, e uma mudança de status vira
+        um único `dataChanged`. Sem diferença por registro, recarrega tudo.
+        """
+        if alteracao.recarregada:
+            self.definir_familias(familias)
+            return
+        novas = {chave_familia(f): f for f in familias}
+        for linha in range(len(self._familias) - 1, -1, -1):
+            if chave_familia(self._familias[linha]) not in novas:
+                self.beginRemoveRows(QModelIndex(), linha, linha)
+                del self._familias[linha]
+                self.endRemoveRows()
+        self._familias = [novas[chave_familia(f)] for f in self._familias]
+        for familia in sorted(alteracao.inseridas, key=_chave_ordenacao):
+            familia = novas.get(chave_familia(familia), familia)
+            linha = bisect.bisect_right(self._familias, _chave_ordenacao(familia), key=_chave_ordenacao)
+            self.beginInsertRows(QModelIndex(), linha, linha)
+            self._familias.insert(linha, familia)
+            self.endInsertRows()
+        if alteracao.renumeradas:
+            chaves = [_chave_ordenacao(f) for f in self._familias]
+            if any(a > b for a, b in zip(chaves, chaves[1:])):
+                self._reordenar()
+        linhas = {chave_familia(f): i for i, f in enumerate(self._familias)}
+        for familia in alteracao.atualizadas:
+            linha = linhas.get(chave_familia(familia))
+            if linha is not None:
+                self.dataChanged.emit(self.index(linha), self.index(linha))
+        renumeradas = [linhas[c] for c in (chave_familia(n) for _, n in alteracao.renumeradas) if c in linhas]
+        if renumeradas:
+            self.dataChanged.emit(self.index(min(renumeradas)), self.index(max(renumeradas)))
+
+    def _reordenar(self):
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        chaves = [chave_familia(self._familias[i.row()]) for i in persistentes]
+        self._familias.sort(key=_chave_ordenacao)
+        linhas = {chave_familia(f): i for i, f in enumerate(self._familias)}
+        self.changePersistentIndexList(persistentes, [self.index(linhas[c]) for c in chaves])
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._familias)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._familias):
+            return None
+        familia = self._familias[index.row()]
+        if role == Qt.DisplayRole:
+            return familia.get("nome", "")
+        if role == PapelFamilia:
+            return familia
+        if role == Qt.ToolTipRole:
+            return "Família sorteada" if familia.get("sorteado") else "Família aguardando sorteio"
+        return None
+
+
+class FiltroFamilias(QSortFilterProxyModel):
+    """Filtro por status e busca sobre o `ModeloFamilias`, sem recriar linhas.
+
+    O critério é avaliado por linha, então linhas inseridas ou alteradas no
+    modelo entram e saem do filtro sozinhas. A busca consulta o `IndiceBusca`
+    devolvido por `fonte_indice` (ver `usar_indice`): cada linha só verifica
+    se a sua chave está entre as encontradas, sem normalizar textos. O
+    índice só é pedido enquanto há termo de busca. Se a busca exata não
+    encontra nada, mostra as famílias de nome parecido
+    (`IndiceBusca.semelhantes`), da mais parecida para a menos.
+    """
+
+    # Cai na busca tolerante a erros de digitação quando a exata não acha nada
+    busca_aproximada = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._status = None
+        self._termo = ""
+        self._tokens = []
+        self._fonte_indice = None
+        self._aceitas = None
+        self._ranking = None
+
+    @property
+    def aproximada(self):
+        """True se as linhas atuais vêm da busca aproximada."""
+        return self._ranking is not None
+
+    def usar_indice(self, fonte_indice):
+        """`fonte_indice()` devolve o `IndiceBusca` dos dados atuais."""
+        self._fonte_indice = fonte_indice
+        self.atualizar_indice()
+
+    def atualizar_indice(self):
+        """Refaz a busca no índice atual; chamar antes de aplicar alterações no modelo."""
+        self._consultar_indice()
+        self._aplicar_ordem()
+
+    def _consultar_indice(self):
+        self._aceitas = None
+        self._ranking = None
+        if self._tokens and self._fonte_indice is not None:
+            indice = self._fonte_indice()
+            self._aceitas = indice.chaves(self._termo)
+            if not self._aceitas and self.busca_aproximada:
+                semelhantes = indice.semelhantes(self._termo)
+                if semelhantes:
+                    self._ranking = {chave: i for i, (chave, _) in enumerate(semelhantes)}
+                    self._aceitas = set(self._ranking)
+
+    def _aplicar_ordem(self):
+        # Busca aproximada: ordem por semelhança; caso contrário, a do modelo
+        if self._ranking is not None:
+            if self.sortColumn() == 0:
+                self.invalidate()
+            else:
+                self.sort(0)
+        elif self.sortColumn() != -1:
+            self.sort(-1)
+
+    def lessThan(self, esquerda, direita):
+        if self._ranking is None:
+            return esquerda.row() < direita.row()
+        modelo = self.sourceModel()
+        a = self._ranking.get(chave_familia(modelo.familia(esquerda.row())), len(self._ranking))
+        b = self._ranking.get(chave_familia(modelo.familia(direita.row())), len(self._ranking))
+        return a < b
+
+    def definir_filtro(self, filtro, termo):
+        """`filtro` é "todas", "sorteadas" ou "nao_sorteadas"; `termo` é o texto da busca."""
+        status = {"sorteadas": True, "nao_sorteadas": False}.get(filtro)
+        termo = termo or ""
+        if (status, termo) == (self._status, self._termo):
+            return
+        if hasattr(self, "beginFilterChange"):
+            # Qt >= 6.9; invalidateFilter() está obsoleto
+            self.beginFilterChange()
+            self._definir_criterio(status, termo)
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+        else:
+            self._definir_criterio(status, termo)
+            self.invalidateFilter()
+        self._aplicar_ordem()
+
+    def _definir_criterio(self, status, termo):
+        self._status = status
+        self._termo = termo
+        self._tokens = tokens_busca(termo)
+        self._consultar_indice()
+
+    def filterAcceptsRow(self, linha, parent):
+        familia = self.sourceModel().familia(linha)
+        if self._status is not None and bool(familia.get("sorteado", False)) != self._status:
+            return False
+        if self._aceitas is not None:
+            return chave_familia(familia) in self._aceitas
+        # Sem índice: compara o texto da própria linha
+        return corresponde(familia, self._tokens)
+
+
+class DelegateFamilia(QStyledItemDelegate):
+    """Desenha cada linha da galeria (número, nome, status, Editar/Excluir).
+
+    Os botões são só pintura: os cliques são resolvidos em `editorEvent`
+    pelas mesmas áreas usadas para desenhar, então a galeria tem um número
+    constante de widgets, qualquer que seja a quantidade de famílias.
+    """
+
+    editar = Signal(dict)
+    excluir = Signal(dict)
+    abrir_foto = Signal(dict)
+
+    def sizeHint(self, option, index):
+        # Largura mínima; no modo lista a linha ocupa a largura toda da área visível
+        return QSize(LARGURA_MINIMA, ALTURA_LINHA + ESPACO_LINHAS)
+
+    def _areas(self, rect):
+        cartao = QRect(rect.left(), rect.top(), rect.width(), ALTURA_LINHA).adjusted(0, 0, -1, -1)
+        interno = cartao.adjusted(12, 8, -12, -8)
+        excluir = QRect(interno.right() - 76, interno.top(), 76, interno.height())
+        editar = QRect(excluir.left() - 12 - 70, interno.top(), 70, interno.height())
+        status = QRect(editar.left() - 12 - 28, interno.top(), 28, interno.height())
+        numero = QRect(interno.left(), interno.top(), 48, interno.height())
+        nome = QRect(numero.right() + 12, interno.top(), max(0, status.left() - 12 - numero.right() - 12), interno.height())
+        return {"cartao": cartao, "numero": numero, "nome": nome, "status": status, "editar": editar, "excluir": excluir}
+
+    def _botao(self, painter, rect, texto, cor):
+        caminho = QPainterPath()
+        caminho.addRoundedRect(rect, 6, 6)
+        painter.fillPath(caminho, QColor(cor))
+        painter.setPen(QColor("#FFFFFF"))
+        painter.drawText(rect, Qt.AlignCenter, texto)
+
+    def paint(self, painter, option, index):
+        familia = index.data(PapelFamilia)
+        if familia is None:
+            return
+        areas = self._areas(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        caminho = QPainterPath()
+        caminho.addRoundedRect(areas["cartao"], 8, 8)
+        fundo = "#F3F4F6" if option.state & QStyle.State_MouseOver else "#FFFFFF"
+        painter.fillPath(caminho, QColor(fundo))
+        painter.setPen(QPen(QColor("#E0E0E0"), 1))
+        painter.drawPath(caminho)
+
+        fonte = QFont(option.font)
+        fonte.setPixelSize(16)
+        fonte.setWeight(QFont.Bold)
+        painter.setFont(fonte)
+        painter.setPen(QColor("#212121"))
+        painter.drawText(areas["numero"], Qt.AlignVCenter | Qt.AlignLeft, str(familia.get("numero", "-")))
+
+        fonte.setWeight(QFont.DemiBold)
+        painter.setFont(fonte)
+        painter.setPen(QColor("#1F2937"))
+        nome = painter.fontMetrics().elidedText(str(familia.get("nome", "")), Qt.ElideRight, areas["nome"].width())
+        painter.drawText(areas["nome"], Qt.AlignVCenter | Qt.AlignLeft, nome)
+
+        sorteada = familia.get("sorteado")
+        fonte.setPixelSize(20)
+        fonte.setWeight(QFont.Bold)
+        painter.setFont(fonte)
+        painter.setPen(QColor("#2c4b23" if sorteada else "#757575"))
+        painter.drawText(areas["status"], Qt.AlignCenter, "✓" if sorteada else "⌛")
+
+        fonte = QFont(option.font)
+        fonte.setPixelSize(13)
+        painter.setFont(fonte)
+        self._botao(painter, areas["editar"], "Editar", "#2c4b23")
+        self._botao(painter, areas["excluir"], "Excluir", "#EF5350")
+        painter.restore()
+
+    def area_em(self, rect, pos):
+        """Nome da área da linha sob `pos` ("editar", "excluir", "nome", ...), ou None."""
+        for nome, area in self._areas(rect).items():
+            if nome != "cartao" and area.contains(pos):
+                return nome
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            familia = index.data(PapelFamilia)
+            area = self.area_em(option.rect, event.position().toPoint())
+            if familia is not None and area == "editar":
+                self.editar.emit(familia)
+                return True
+            if familia is not None and area == "excluir":
+                self.excluir.emit(familia)
+                return True
+            if familia is not None and area == "nome":
+                self.abrir_foto.emit(familia)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip and self.area_em(option.rect, event.pos()) == "status":
+            QToolTip.showText(event.globalPos(), index.data(Qt.ToolTipRole), view)
+            return True
+        QToolTip.hideText()
+        return True
+
+
+class GaleriaFamilias(QListView):
+    """Galeria virtualizada: só as linhas visíveis são pintadas."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.modelo = ModeloFamilias(self)
+        self.filtro = FiltroFamilias(self)
+        self.filtro.setSourceModel(self.modelo)
+        self.delegate = DelegateFamilia(self)
+        self.setModel(self.filtro)
+        self.setItemDelegate(self.delegate)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setStyleSheet("QListView { background-color: transparent; border: none; }")
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        area = self.delegate.area_em(self.visualRect(index), pos) if index.isValid() else None
+        self.viewport().setCursor(Qt.PointingHandCursor if area in ("editar", "excluir", "nome") else Qt.ArrowCursor)
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+
+
+def data_iso(data_sorteio):
+    """"dd/mm/aaaa" -> "aaaa-mm-dd"; None se não estiver nesse formato."""
+    try:
+        d, m, y = str(data_sorteio).split("/")
+        return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+    except Exception:
+        return None
+
+
+class HistoricoSorteios:
+    """Histórico de sorteios de todos os ciclos, só com acréscimos.
+
+    Cada sorteio é uma linha de `dados/historico_sorteios.jsonl` (id da
+    família, número e nome na época, ciclo e data ISO). O índice em
+    `historico_sorteios.idx.json` guarda, por família e por mês, a posição
+    em bytes de cada linha: as consultas leem só as linhas pedidas. Se o
+    índice não corresponder ao tamanho do arquivo (gravação interrompida),
+    ele é refeito a partir das linhas.
+    """
+
+    def __init__(self, dados_dir):
+        self.arquivo = os.path.join(dados_dir, "historico_sorteios.jsonl")
+        self.indice_file = os.path.join(dados_dir, "historico_sorteios.idx.json")
+        self._indice = None
+
+    def _indice_vazio(self):
+        return {"tamanho": 0, "ciclos": [], "familias": {}, "meses": {}}
+
+    def _indexar(self, indice, posicao, entrada):
+        indice["familias"].setdefault(str(entrada.get("id")), []).append(posicao)
+        mes = str(entrada.get("data") or "")[:7]
+        if mes:
+            indice["meses"].setdefault(mes, []).append(posicao)
+        if entrada.get("ciclo") not in indice["ciclos"]:
+            indice["ciclos"].append(entrada.get("ciclo"))
+
+    def _reconstruir(self):
+        indice = self._indice_vazio()
+        if not os.path.exists(self.arquivo):
+            return indice
+        posicao = 0
+        with open(self.arquivo, "r+b") as f:
+            for linha in f:
+                try:
+                    self._indexar(indice, posicao, json.loads(linha))
+                except json.JSONDecodeError:
+                    # Linha final incompleta (queda durante a escrita): descartada
+                    logging.warning(f"Histórico de sorteios truncado em {posicao} bytes")
+                    f.truncate(posicao)
+                    break
+                posicao += len(linha)
+        indice["tamanho"] = posicao
+        return indice
+
+    def _carregar_indice(self):
+        if self._indice is not None:
+            return self._indice
+        tamanho = os.path.getsize(self.arquivo) if os.path.exists(self.arquivo) else 0
+        indice = None
+        try:
+            with open(self.indice_file, "r", encoding="utf-8") as f:
+                indice = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+        if indice is None or indice.get("tamanho") != tamanho:
+            indice = self._reconstruir()
+            self._gravar_indice(indice)
+        self._indice = indice
+        return indice
+
+    def _gravar_indice(self, indice):
+        tmp_path = self.indice_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(indice, f, separators=(",", ":"))
+        os.replace(tmp_path, self.indice_file)
+
+    def _ler(self, posicoes):
+        entradas = []
+        if not posicoes:
+            return entradas
+        with open(self.arquivo, "rb") as f:
+            for posicao in posicoes:
+                f.seek(posicao)
+                entradas.append(json.loads(f.readline()))
+        return entradas
+
+    def __len__(self):
+        return sum(len(p) for p in self._carregar_indice()["familias"].values())
+
+    def arquivado(self, ciclo):
+        return ciclo in self._carregar_indice()["ciclos"]
+
+    @staticmethod
+    def _chave(entrada):
+        return (entrada.get("ciclo"), str(entrada.get("id")), str(entrada.get("data") or "")[:10])
+
+    def _ja_arquivadas(self, entradas):
+        """Chaves (ciclo, família, dia) de `entradas` que já estão no histórico."""
+        indice = self._carregar_indice()
+        ids = {str(e.get("id")) for e in entradas if e.get("ciclo") in indice["ciclos"]}
+        chaves = set()
+        for id_familia in ids:
+            chaves.update(self._chave(e) for e in self.da_familia(id_familia))
+        return chaves
+
+    def arquivar(self, entradas):
+        """Acrescenta as entradas de um ciclo em uma única gravação.
+
+        Entradas já arquivadas (mesmo ciclo, família e dia) são ignoradas: um
+        reinício interrompido depois do arquivamento pode arquivar de novo o
+        ciclo, com os sorteios feitos desde então.
+        """
+        entradas = sorted(entradas, key=lambda e: (str(e.get("data", "")), str(e.get("id"))))
+        if not entradas:
+            return True
+        try:
+            indice = self._carregar_indice()
+            arquivadas = self._ja_arquivadas(entradas)
+            entradas = [e for e in entradas if self._chave(e) not in arquivadas]
+            if not entradas:
+                return True
+            linhas = [(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8") for e in entradas]
+            with open(self.arquivo, "ab") as f:
+                f.write(b"".join(linhas))
+                f.flush()
+                os.fsync(f.fileno())
+            posicao = indice["tamanho"]
+            for entrada, linha in zip(entradas, linhas):
+                self._indexar(indice, posicao, entrada)
+                posicao += len(linha)
+            indice["tamanho"] = posicao
+            self._gravar_indice(indice)
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao arquivar histórico de sorteios: {str(e)}")
+            self._indice = None
+            return False
+
+    def entradas(self):
+        """Todas as entradas, na ordem de gravação (lê o arquivo inteiro)."""
+        if not os.path.exists(self.arquivo):
+            return []
+        tamanho = self._carregar_indice()["tamanho"]
+        with open(self.arquivo, "rb") as f:
+            return [json.loads(linha) for linha in f.read(tamanho).splitlines() if linha.strip()]
+
+    def da_familia(self, id_familia):
+        """Sorteios arquivados da família, do mais antigo ao mais recente."""
+        return self._ler(self._carregar_indice()["familias"].get(str(id_familia), []))
+
+    def ultimo_da_familia(self, id_familia):
+        posicoes = self._carregar_indice()["familias"].get(str(id_familia), [])
+        return self._ler(posicoes[-1:])[0] if posicoes else None
+
+    def por_mes(self):
+        """{"aaaa-mm": quantidade} dos sorteios arquivados."""
+        return {mes: len(p) for mes, p in sorted(self._carregar_indice()["meses"].items())}
+
+    def do_mes(self, mes):
+        return self._ler(self._carregar_indice()["meses"].get(mes, []))
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Qt, Signal
+from PySide6.QtGui import QImage, QImageReader
+
+# Lado máximo da foto otimizada guardada em imagens/familias
+FOTO_LADO_MAX = 1600
+# Pirâmide de variantes geradas a partir da mesma decodificação: sufixo -> lado
+# máximo. "card" e "thumb" são o card da galeria (120px) em 1x e 2x; "tela"
+# cobre a tela de sorteio em 1080p. Acima disso (4K) a própria foto otimizada,
+# limitada a FOTO_LADO_MAX, é a maior variante.
+VARIANTES_THUMB = {"mini": 64, "card": 120, "thumb": 240, "tela": 1080}
+
+
+def caminho_thumb(foto_rel, variante="thumb"):
+    name = os.path.splitext(os.path.basename(foto_rel))[0]
+    return os.path.join("imagens", "thumbs", f"{name}_{variante}.jpg").replace("\\", "/")
+
+
+def _salvar_thumbs(img, foto_abs, thumbs_dir, variantes):
+    os.makedirs(thumbs_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(foto_abs))[0]
+    # Da maior para a menor, cada variante reduz a anterior: menos pixels a
+    # filtrar e sem ampliar fotos menores que a variante
+    for variante, lado in sorted(variantes.items(), key=lambda kv: -kv[1]):
+        if max(img.width(), img.height()) > lado:
+            img = img.scaled(lado, lado, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        img.save(os.path.join(thumbs_dir, f"{name}_{variante}.jpg"), "JPG", 80)
+
+
+def lado_necessario(foto_abs, target_size, dpr=1.0):
+    """Lado maior, em pixels físicos, que a foto ocupa ao caber em `target_size`.
+
+    `target_size` é um lado máximo (int) ou uma área (largura, altura)/QSize em
+    pixels lógicos. Só o cabeçalho da foto é lido.
+    """
+    if isinstance(target_size, (int, float)):
+        return int(round(target_size * dpr))
+    if hasattr(target_size, "width"):
+        largura, altura = target_size.width(), target_size.height()
+    else:
+        largura, altura = target_size
+    tamanho = QImageReader(foto_abs).size() if foto_abs else None
+    if tamanho is None or not tamanho.isValid() or tamanho.isEmpty():
+        return int(round(max(largura, altura) * dpr))
+    escala = min(largura / tamanho.width(), altura / tamanho.height())
+    return int(round(max(tamanho.width(), tamanho.height()) * escala * dpr))
+
+
+def decodificar_para(path, tamanho):
+    """Decodifica `path` já no tamanho em que cabe em `tamanho` (QSize), sem ampliar.
+
+    Usa `QImageReader.setScaledSize`, que em JPEG reduz durante a própria
+    decodificação. Pode rodar em qualquer thread.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid() and (original.width() > tamanho.width() or original.height() > tamanho.height()):
+        reader.setScaledSize(original.scaled(tamanho, Qt.KeepAspectRatio))
+    img = reader.read()
+    return None if img.isNull() else img
+
+
+def variantes_que_cobrem(lado, variantes=None):
+    """Variantes com lado >= `lado`, da menor para a maior."""
+    variantes = variantes or VARIANTES_THUMB
+    return [v for v, l in sorted(variantes.items(), key=lambda kv: kv[1]) if l >= lado]
+
+
+def gerar_thumbs(foto_abs, thumbs_dir, variantes=None):
+    """Gera todas as miniaturas de uma foto já otimizada com uma só leitura."""
+    try:
+        img = QImage(foto_abs)
+        if img.isNull():
+            return False
+        _salvar_thumbs(img, foto_abs, thumbs_dir, variantes or VARIANTES_THUMB)
+        return True
+    except Exception:
+        return False
+
+
+def processar_foto(origem, destino, thumbs_dir, variantes=None, manifesto=None):
+    """Otimiza `origem` em `destino` e gera as miniaturas a partir da mesma imagem decodificada.
+
+    Não usa nada da interface; pode rodar em qualquer thread. Com `manifesto`,
+    as miniaturas geradas são registradas nele.
+    """
+    try:
+        img = QImage(origem)
+        if img.isNull():
+            shutil.copy2(origem, destino)
+            return True
+        w, h = img.width(), img.height()
+        scale = min(FOTO_LADO_MAX / max(w, 1), FOTO_LADO_MAX / max(h, 1), 1.0)
+        if scale < 1.0:
+            img = img.scaled(int(w * scale), int(h * scale))
+        fmt = "JPG" if destino.lower().endswith(('.jpg', '.jpeg')) else "PNG"
+        quality = 85 if fmt == "JPG" else -1
+        # Arquivo temporário + rename: o destino nunca fica pela metade
+        tmp_path = os.path.join(os.path.dirname(destino), f".{os.path.basename(destino)}.tmp")
+        if img.save(tmp_path, fmt, quality):
+            os.replace(tmp_path, destino)
+        else:
+            shutil.copy2(origem, destino)
+        _salvar_thumbs(img, destino, thumbs_dir, variantes or VARIANTES_THUMB)
+        if manifesto is not None:
+            manifesto.registrar(os.path.relpath(destino, manifesto.base_dir).replace("\\", "/"))
+        return True
+    except Exception as e:
+        logging.error(f"Erro ao processar foto {origem}: {str(e)}")
+        try:
+            shutil.copy2(origem, destino)
+            return True
+        except Exception:
+            return False
+
+
+class _Lote:
+    def __init__(self, total, ao_concluir):
+        self.total = total
+        self.feitos = 0
+        self.resultados = [False] * total
+        self.ao_concluir = ao_concluir
+        self.lock = threading.Lock()
+
+
+class IngestaoImagens(QObject):
+    """Pool de threads para importar fotos sem travar a interface.
+
+    `processar` agenda as fotos e retorna na hora; `progresso(feitos, total)`
+    e `concluido(resultados)` chegam no thread da interface.
+    """
+
+    progresso = Signal(int, int)
+    concluido = Signal(list)
+    _lote_finalizado = Signal(object)
+
+    def __init__(self, thumbs_dir, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.thumbs_dir = thumbs_dir
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="ingestao-imagens",
+        )
+        self._lote_finalizado.connect(self._entregar)
+
+    def processar(self, tarefas, ao_concluir=None, manifesto=None):
+        """Agenda [(origem, destino)]; `ao_concluir(resultados)` roda no thread da interface."""
+        lote = _Lote(len(tarefas), ao_concluir)
+        if not tarefas:
+            self._lote_finalizado.emit(lote)
+            return lote
+        for i, (origem, destino) in enumerate(tarefas):
+            futuro = self._executor.submit(processar_foto, origem, destino, self.thumbs_dir, None, manifesto)
+            futuro.add_done_callback(lambda f, i=i: self._registrar(lote, i, f))
+        return lote
+
+    def _registrar(self, lote, indice, futuro):
+        try:
+            ok = bool(futuro.result())
+        except Exception:
+            ok = False
+        with lote.lock:
+            lote.resultados[indice] = ok
+            lote.feitos += 1
+            feitos = lote.feitos
+        self.progresso.emit(feitos, lote.total)
+        if feitos == lote.total:
+            self._lote_finalizado.emit(lote)
+
+    def _entregar(self, lote):
+        if lote.ao_concluir is not None:
+            try:
+                lote.ao_concluir(list(lote.resultados))
+            except Exception as e:
+                logging.error(f"Erro ao concluir importação de fotos: {str(e)}")
+        self.concluido.emit(list(lote.resultados))
+
+    def encerrar(self, aguardar=True):
+        self._executor.shutdown(wait=aguardar)
+
+
+def hash_arquivo(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class ManifestoThumbs:
+    """Registro das miniaturas já geradas (`imagens/thumbs/manifest.json`).
+
+    Para cada foto guarda tamanho, mtime e hash da origem e as variantes
+    geradas, de modo que a inicialização só refaça miniaturas ausentes ou
+    desatualizadas. Tamanho e mtime iguais bastam; se só o mtime mudou, o
+    hash decide. Pode ser usado a partir de uma thread de fundo.
+    """
+
+    def __init__(self, base_dir, thumbs_dir, variantes=None):
+        self.base_dir = base_dir
+        self.thumbs_dir = thumbs_dir
+        self.path = os.path.join(thumbs_dir, "manifest.json")
+        self.variantes = dict(variantes or VARIANTES_THUMB)
+        self._entradas = None
+        self._alterado = False
+        self._lock = threading.RLock()
+
+    def _carregar(self):
+        if self._entradas is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    dados = json.load(f)
+                self._entradas = dados.get("fotos", {}) if isinstance(dados, dict) else {}
+            except Exception:
+                self._entradas = {}
+        return self._entradas
+
+    def salvar(self):
+        with self._lock:
+            if not self._alterado:
+                return
+            os.makedirs(self.thumbs_dir, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fotos": self._carregar()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._alterado = False
+
+    def _thumbs_presentes(self, foto_rel):
+        return all(
+            os.path.exists(os.path.join(self.base_dir, caminho_thumb(foto_rel, v)))
+            for v in self.variantes
+        )
+
+    def registrar(self, foto_rel, sha1=None):
+        foto_abs = os.path.join(self.base_dir, foto_rel)
+        try:
+            st = os.stat(foto_abs)
+            sha1 = sha1 or hash_arquivo(foto_abs)
+        except OSError:
+            return
+        with self._lock:
+            self._carregar()[foto_rel] = {
+                "tamanho": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha1": sha1,
+                "variantes": self.variantes,
+            }
+            self._alterado = True
+
+    def remover(self, foto_rel):
+        with self._lock:
+            if self._carregar().pop(foto_rel, None) is not None:
+                self._alterado = True
+
+    def atualizado(self, foto_rel):
+        """True se as miniaturas de `foto_rel` existem e correspondem à origem atual."""
+        foto_abs = os.path.join(self.base_dir, foto_rel)
+        try:
+            st = os.stat(foto_abs)
+        except OSError:
+            return True  # sem origem não há o que gerar
+        if not self._thumbs_presentes(foto_rel):
+            return False
+        with self._lock:
+            entrada = self._carregar().get(foto_rel)
+        if entrada is None:
+            # Miniatura anterior ao manifesto: aproveitada se não for mais velha que a origem
+            thumb_abs = os.path.join(self.base_dir, caminho_thumb(foto_rel))
+            if os.path.getmtime(thumb_abs) >= st.st_mtime:
+                self.registrar(foto_rel)
+                return True
+            return False
+        if entrada.get("variantes") != self.variantes or entrada.get("tamanho") != st.st_size:
+            return False
+        if entrada.get("mtime_ns") == st.st_mtime_ns:
+            return True
+        sha1 = hash_arquivo(foto_abs)
+        if sha1 != entrada.get("sha1"):
+            return False
+        self.registrar(foto_rel, sha1)
+        return True
+
+    def podar(self, fotos_rel):
+        """Remove entradas de fotos que não estão mais em uso."""
+        em_uso = set(fotos_rel)
+        with self._lock:
+            entradas = self._carregar()
+            for foto_rel in [k for k in entradas if k not in em_uso]:
+                del entradas[foto_rel]
+                self._alterado = True
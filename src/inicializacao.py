@@ -0,0 +1,81 @@
+import logging
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+
+class TarefasIniciais(QObject):
+    """Validação e backup automático da inicialização, fora do thread da interface.
+
+    A leitura/validação e o backup rodam em uma thread de fundo; as correções
+    são aplicadas no thread da interface e anunciadas por `dados_corrigidos`,
+    para que a janela possa abrir antes com os dados em cache.
+    """
+
+    progresso = Signal(str, str, int)  # título, subtítulo, percentual
+    dados_corrigidos = Signal()
+    concluido = Signal(bool)
+    _validacao_lida = Signal(object)
+    _backup_finalizado = Signal(bool)
+
+    def __init__(self, data_manager, versao, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.versao = versao
+        self.ativo = False
+        self._ok = True
+        self._thread = None
+        self._validacao_lida.connect(self._aplicar_validacao)
+        self._backup_finalizado.connect(self._finalizar)
+
+    def iniciar(self):
+        if self.ativo:
+            return
+        self.ativo = True
+        self._ok = True
+        self.progresso.emit("Verificando dados", "Conferindo o cadastro de famílias em segundo plano.", 0)
+        self._thread = threading.Thread(target=self._validar, name="tarefas-iniciais", daemon=True)
+        self._thread.start()
+
+    # Thread de fundo
+
+    def _validar(self):
+        try:
+            resultado = self.data_manager.validar_em_leitura()
+        except Exception as e:
+            logging.error(f"Falha na validação em segundo plano: {str(e)}")
+            resultado = None
+        self._validacao_lida.emit(resultado)
+
+    def _backup(self):
+        def _progresso(feitos, total, bytes_feitos, bytes_total):
+            percentual = 50 + (bytes_feitos * 50 // bytes_total if bytes_total else 50)
+            self.progresso.emit("Gerando backup automático", f"{feitos} de {total} arquivos verificados.", percentual)
+
+        try:
+            self.data_manager.backup_auto_se_versao_mudou(self.versao, _progresso)
+            ok = True
+        except Exception as e:
+            logging.error(f"Falha no backup automático: {str(e)}")
+            ok = False
+        self._backup_finalizado.emit(ok)
+
+    # Thread da interface
+
+    def _aplicar_validacao(self, resultado):
+        ok, alterado = self.data_manager.aplicar_validacao(resultado)
+        try:
+            self.data_manager.verificar_integridade_sorteio()
+        except Exception:
+            pass
+        self._ok = ok
+        if alterado:
+            self.dados_corrigidos.emit()
+        self.progresso.emit("Verificando backup", "Conferindo se há backup automático a gerar.", 50)
+        self._thread = threading.Thread(target=self._backup, name="backup-inicial", daemon=True)
+        self._thread.start()
+
+    def _finalizar(self, ok_backup):
+        self.ativo = False
+        self.progresso.emit("Inicialização concluída", "Dados verificados.", 100)
+        self.concluido.emit(self._ok and ok_backup)
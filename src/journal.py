@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+
+
+# Sentinela: nenhum registro de "último sorteado" no diário desde o snapshot
+SEM_REGISTRO = object()
+
+
+def _chave_familia(familia):
+    return familia.get("id")
+
+
+def _serializar(familia):
+    return json.dumps(familia, ensure_ascii=False, sort_keys=True)
+
+
+class FamiliasJournal:
+    """Diário append-only das alterações em `familias.json`.
+
+    O snapshot continua sendo o `familias.json` completo; cada gravação
+    acrescenta ao diário uma única linha com as operações do commit
+    (`upsert`/`remove` por id, e `ultimo` para o último sorteado, que assim
+    é gravado na mesma linha das famílias). Na carga o snapshot é lido e o diário é
+    reaplicado; uma linha final truncada (queda no meio da escrita) é
+    descartada. A primeira linha do diário guarda o hash do snapshot a que
+    ele se refere, de modo que um `familias.json` reescrito por fora
+    (scripts, outra estação) invalida o diário antigo em vez de ser
+    sobrescrito por ele. Pelo mesmo motivo, antes de acrescentar uma linha
+    o snapshot em disco é conferido com o hash carregado (ver `registrar`).
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, limite_bytes=64 * 1024, somente_leitura=False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.limite_bytes = limite_bytes
+        # Leitor paralelo (ex.: validação em segundo plano): não trunca nem descarta o diário
+        self.somente_leitura = somente_leitura
+        self._persistido = {}
+        self._base = None
+        # Assinatura (inode, tamanho, mtime) do snapshot com hash `_base`
+        self._assinatura_base = None
+        self.ultimo = SEM_REGISTRO
+
+    # Leitura
+
+    def _assinatura_snapshot(self):
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _ler_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return [], None
+        with open(self.snapshot_path, "rb") as f:
+            conteudo = f.read()
+        dados = json.loads(conteudo.decode("utf-8"))
+        if not isinstance(dados, list):
+            raise ValueError("Snapshot de famílias não é uma lista.")
+        return dados, hashlib.sha1(conteudo).hexdigest()
+
+    def _descartar_diario(self, motivo):
+        if self.somente_leitura:
+            return
+        logging.warning(f"Diário de famílias descartado: {motivo}")
+        try:
+            os.replace(self.journal_path, f"{self.journal_path}.descartado")
+        except Exception:
+            pass
+
+    def _ler_commits(self, base):
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, "rb") as f:
+            conteudo = f.read()
+        if not conteudo:
+            return []
+        linhas = conteudo.split(b"\n")
+        try:
+            cabecalho = json.loads(linhas[0].decode("utf-8"))
+        except Exception:
+            self._descartar_diario("cabeçalho inválido")
+            return []
+        if cabecalho.get("base") != base:
+            self._descartar_diario("não corresponde ao snapshot atual")
+            return []
+        commits = []
+        valido_ate = len(linhas[0]) + 1
+        for linha in linhas[1:]:
+            if not linha.strip():
+                valido_ate += len(linha) + 1
+                continue
+            try:
+                commits.append(json.loads(linha.decode("utf-8")))
+            except Exception:
+                # Commit incompleto (queda durante a escrita): descartado
+                if not self.somente_leitura:
+                    logging.warning("Registro incompleto no diário de famílias descartado")
+                    with open(self.journal_path, "r+b") as f:
+                        f.truncate(valido_ate)
+                break
+            valido_ate += len(linha) + 1
+        return commits
+
+    @staticmethod
+    def aplicar(familias, ops):
+        por_id = {_chave_familia(f): i for i, f in enumerate(familias)}
+        removidos = set()
+        for op in ops:
+            tipo = op.get("op")
+            if tipo == "upsert":
+                familia = op.get("familia") or {}
+                i = por_id.get(_chave_familia(familia))
+                if i is None or i in removidos:
+                    por_id[_chave_familia(familia)] = len(familias)
+                    familias.append(familia)
+                else:
+                    familias[i] = familia
+            elif tipo == "remove":
+                i = por_id.pop(op.get("id"), None)
+                if i is not None:
+                    removidos.add(i)
+        if removidos:
+            familias[:] = [f for i, f in enumerate(familias) if i not in removidos]
+        return familias
+
+    def carregar(self):
+        """Retorna a lista de famílias do snapshot com o diário reaplicado."""
+        assinatura = self._assinatura_snapshot()
+        familias, base = self._ler_snapshot()
+        self.ultimo = SEM_REGISTRO
+        for commit in self._ler_commits(base):
+            ops = commit.get("ops", [])
+            self.aplicar(familias, ops)
+            self._registrar_ultimo(ops)
+        self._base = base
+        self._assinatura_base = assinatura
+        self.marcar_persistido(familias)
+        return familias
+
+    def _registrar_ultimo(self, ops):
+        for op in ops:
+            if op.get("op") == "ultimo":
+                self.ultimo = op.get("numero")
+
+    @property
+    def carregado(self):
+        return self._base is not None
+
+    def snapshot_alterado(self):
+        """True se `familias.json` não é mais o snapshot a que o diário se refere."""
+        assinatura = self._assinatura_snapshot()
+        if assinatura == self._assinatura_base:
+            return False
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                base = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            base = None
+        if base == self._base:
+            self._assinatura_base = assinatura
+            return False
+        return True
+
+    # Escrita
+
+    def marcar_persistido(self, familias):
+        self._persistido = {_chave_familia(f): _serializar(f) for f in familias}
+
+    def marcar_persistidas(self, familias):
+        """Marca como gravados só estes registros; os demais não mudaram."""
+        for f in familias:
+            self._persistido[_chave_familia(f)] = _serializar(f)
+
+    def diferencas(self, familias):
+        """Operações necessárias para levar o estado persistido até `familias`.
+
+        Retorna None quando os ids não permitem diff (ausentes ou repetidos);
+        nesse caso o chamador deve compactar.
+        """
+        atuais = {}
+        for f in familias:
+            chave = _chave_familia(f)
+            if chave is None or chave in atuais:
+                return None
+            atuais[chave] = f
+        ops = []
+        for chave, f in atuais.items():
+            serial = _serializar(f)
+            if self._persistido.get(chave) != serial:
+                ops.append({"op": "upsert", "familia": f})
+        for chave in self._persistido:
+            if chave not in atuais:
+                ops.append({"op": "remove", "id": chave})
+        return ops
+
+    def registrar(self, ops):
+        """Acrescenta `ops` ao diário; retorna True se o snapshot precisou ser relido.
+
+        Se outro processo reescreveu `familias.json` (compactação, scripts),
+        snapshot e diário em disco são relidos e as operações, que são por
+        registro, vão sobre eles: o cabeçalho nunca aponta para um snapshot
+        que não existe mais. Cabe ao chamador reler a lista.
+        """
+        if not ops:
+            return False
+        relido = self.snapshot_alterado()
+        if relido:
+            logging.warning("Snapshot de famílias reescrito por outro processo; gravação refeita sobre ele")
+            self.carregar()
+        novo = not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0
+        partes = []
+        if novo:
+            partes.append(json.dumps({"base": self._base}))
+        partes.append(json.dumps({"ops": ops}, ensure_ascii=False, separators=(",", ":")))
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(partes) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._registrar_ultimo(ops)
+        return relido
+
+    def precisa_compactar(self):
+        try:
+            tamanho = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        try:
+            snapshot = os.path.getsize(self.snapshot_path)
+        except OSError:
+            snapshot = 0
+        return tamanho > max(self.limite_bytes, snapshot)
+
+    def compactar(self, familias):
+        """Grava o snapshot completo e zera o diário."""
+        dir_path = os.path.dirname(self.snapshot_path)
+        os.makedirs(dir_path, exist_ok=True)
+        tmp_path = os.path.join(dir_path, f".{os.path.basename(self.snapshot_path)}.tmp")
+        conteudo = json.dumps(familias, ensure_ascii=False, indent=2).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(conteudo)
+        os.replace(tmp_path, self.snapshot_path)
+        self._base = hashlib.sha1(conteudo).hexdigest()
+        self._assinatura_base = self._assinatura_snapshot()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.ultimo = SEM_REGISTRO
+        self.marcar_persistido(familias)
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import random
+import secrets
+import uuid
+from datetime import datetime
+
+
+class MotorSorteio:
+    """Sorteio automático em O(1) sobre uma permutação gravada.
+
+    Cada ciclo (de um reinício do sorteio ao próximo) tem um id e uma
+    semente. A ordem de sorteio é a permutação dos ids pendentes no início
+    do ciclo, embaralhada com `random.Random` a partir da semente, e fica em
+    `dados/ciclo_sorteio.json`. Sortear é avançar um cursor nessa ordem,
+    pulando famílias já sorteadas à mão ou excluídas. Famílias que entram no
+    meio do ciclo (cadastradas ou devolvidas) trocam de lugar com uma posição
+    ainda não sorteada, escolhida pela mesma semente.
+
+    Os eventos do ciclo (início, entradas e sorteios) são acrescentados em
+    `dados/sorteio_auditoria.jsonl`, uma linha por evento; o estado é
+    reconstruído a partir deles e `verificar(registro)` confere um sorteio
+    refazendo a permutação.
+    """
+
+    def __init__(self, dados_dir):
+        self.dados_dir = dados_dir
+        self.ciclo_file = os.path.join(dados_dir, "ciclo_sorteio.json")
+        self.auditoria_file = os.path.join(dados_dir, "sorteio_auditoria.jsonl")
+        self._limpar()
+
+    def _limpar(self):
+        self.ciclo = None
+        self.semente = None
+        self.criado_em = None
+        self.ordem = []
+        self.cursor = 0
+        self.max_id = 0
+        self._acrescimos = 0
+
+    # Permutação
+
+    @staticmethod
+    def rng(semente, *partes):
+        """Gerador derivado da semente; o mesmo (semente, partes) dá sempre a mesma sequência."""
+        return random.Random(":".join(str(p) for p in (semente,) + partes))
+
+    @classmethod
+    def permutacao(cls, semente, ids):
+        ordem = sorted(ids)
+        cls.rng(semente, "ordem").shuffle(ordem)
+        return ordem
+
+    def _aplicar_acrescimo(self, ids, inicio):
+        # `inicio` é o cursor no momento da entrada, gravado no evento
+        self.cursor = max(self.cursor, inicio)
+        rng = self.rng(self.semente, "acrescimo", self._acrescimos)
+        for id_familia in ids:
+            # Passo do Fisher-Yates "de dentro para fora" sobre a parte não sorteada
+            self.ordem.append(id_familia)
+            j = rng.randrange(self.cursor, len(self.ordem))
+            self.ordem[j], self.ordem[-1] = self.ordem[-1], self.ordem[j]
+            if isinstance(id_familia, int):
+                self.max_id = max(self.max_id, id_familia)
+        self._acrescimos += 1
+
+    # Persistência
+
+    def _gravar_ciclo(self, dados):
+        tmp_path = os.path.join(self.dados_dir, ".ciclo_sorteio.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(tmp_path, self.ciclo_file)
+
+    def _registrar_evento(self, evento):
+        with open(self.auditoria_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def eventos(self, ciclo=None):
+        """Eventos gravados na auditoria (só os do `ciclo`, se informado)."""
+        if not os.path.exists(self.auditoria_file):
+            return []
+        eventos = []
+        with open(self.auditoria_file, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    evento = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Última linha incompleta (gravação interrompida)
+                    continue
+                if ciclo is None or evento.get("ciclo") == ciclo:
+                    eventos.append(evento)
+        return eventos
+
+    def carregar(self):
+        self._limpar()
+        try:
+            if not os.path.exists(self.ciclo_file):
+                return False
+            with open(self.ciclo_file, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            self.ciclo = dados["ciclo"]
+            self.semente = dados["semente"]
+            self.criado_em = dados.get("criado_em")
+            self.ordem = list(dados["ordem"])
+            self.max_id = max((i for i in self.ordem if isinstance(i, int)), default=0)
+            for evento in self.eventos(self.ciclo):
+                if evento.get("tipo") == "acrescimo":
+                    self._aplicar_acrescimo(evento["ids"], evento["cursor"])
+                elif evento.get("tipo") == "sorteio":
+                    self.cursor = max(self.cursor, evento["posicao"] + 1)
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao carregar ciclo de sorteio: {str(e)}")
+            self._limpar()
+            return False
+
+    # Ciclo
+
+    def novo_ciclo(self, ids, semente=None, inicio=None):
+        """Inicia um ciclo com os `ids` pendentes; retorna o id do ciclo.
+
+        `inicio` (ISO) é o início do ciclo quando ele começou antes de agora.
+        """
+        self._limpar()
+        self.semente = semente if semente is not None else secrets.randbits(64)
+        self.ciclo = uuid.uuid4().hex
+        self.criado_em = inicio or datetime.now().isoformat(timespec="seconds")
+        ids = sorted(ids)
+        self.ordem = self.permutacao(self.semente, ids)
+        self.max_id = max((i for i in ids if isinstance(i, int)), default=0)
+        self._gravar_ciclo({
+            "ciclo": self.ciclo,
+            "semente": self.semente,
+            "criado_em": self.criado_em,
+            "ids": ids,
+            "ordem": self.ordem,
+        })
+        self._registrar_evento({"tipo": "ciclo", "ciclo": self.ciclo, "semente": self.semente, "total": len(ids)})
+        return self.ciclo
+
+    def acrescentar(self, ids):
+        """Inclui famílias que entraram no meio do ciclo em posições aleatórias ainda não sorteadas."""
+        ids = list(ids)
+        if not ids or self.ciclo is None:
+            return
+        cursor = self.cursor
+        self._aplicar_acrescimo(ids, cursor)
+        self._registrar_evento({"tipo": "acrescimo", "ciclo": self.ciclo, "cursor": cursor, "ids": ids})
+
+    def proxima(self, pendente):
+        """(posição, id) da próxima família para a qual `pendente(id)` é True, ou None."""
+        while self.cursor < len(self.ordem):
+            id_familia = self.ordem[self.cursor]
+            if pendente(id_familia):
+                return self.cursor, id_familia
+            self.cursor += 1
+        return None
+
+    def registrar(self, posicao, id_familia, numero):
+        registro = {
+            "tipo": "sorteio",
+            "ciclo": self.ciclo,
+            "posicao": posicao,
+            "id": id_familia,
+            "numero": numero,
+            "data": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._registrar_evento(registro)
+        self.cursor = max(self.cursor, posicao + 1)
+        return registro
+
+    def verificar(self, registro):
+        """Confere um registro de sorteio do ciclo atual refazendo a permutação pela semente."""
+        try:
+            with open(self.ciclo_file, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados["ciclo"] != registro.get("ciclo"):
+                return False
+            if self.permutacao(dados["semente"], dados["ids"]) != dados["ordem"]:
+                return False
+            conferencia = MotorSorteio(self.dados_dir)
+            conferencia.semente = dados["semente"]
+            conferencia.ordem = list(dados["ordem"])
+            for evento in self.eventos(registro["ciclo"]):
+                if evento.get("tipo") == "acrescimo":
+                    conferencia._aplicar_acrescimo(evento["ids"], evento["cursor"])
+                elif evento.get("tipo") == "sorteio":
+                    if evento["posicao"] == registro["posicao"] and evento.get("data") == registro.get("data"):
+                        break
+                    conferencia.cursor = max(conferencia.cursor, evento["posicao"] + 1)
+            posicao = registro["posicao"]
+            return conferencia.cursor <= posicao < len(conferencia.ordem) and conferencia.ordem[posicao] == registro["id"]
+        except Exception as e:
+            logging.error(f"Erro ao verificar sorteio: {str(e)}")
+            return False
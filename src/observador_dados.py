@@ -0,0 +1,78 @@
+import logging
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+
+class ObservadorDados(QObject):
+    """Recarrega as famílias quando os arquivos de dados mudam fora do app.
+
+    Vigia a pasta `dados` e os arquivos de `DataManager.arquivos_observados()`
+    com `QFileSystemWatcher`. Cada aviso reinicia um `QTimer` de
+    `atraso_ms`: uma rajada de gravações (compactação do diário, script que
+    regrava vários arquivos) vira uma única verificação. A verificação chama
+    `DataManager.recarregar_se_alterado()`, que compara assinaturas e só
+    relê o que mudou; as telas recebem a diferença pelos ouvintes do
+    DataManager e `alterado` é emitido quando algo foi relido.
+
+    Se a pasta não puder ser vigiada (ex.: compartilhamento de rede sem
+    notificações) ou com `polling=True`, a verificação roda a cada
+    `intervalo_polling_ms`.
+    """
+
+    alterado = Signal()
+
+    def __init__(self, data_manager, parent=None, atraso_ms=300, intervalo_polling_ms=2000, polling=False):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.polling = polling
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._agendar)
+        self._watcher.fileChanged.connect(self._agendar)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(atraso_ms)
+        self._timer.timeout.connect(self.verificar)
+        self._timer_polling = QTimer(self)
+        self._timer_polling.setInterval(intervalo_polling_ms)
+        self._timer_polling.timeout.connect(self.verificar)
+
+    @property
+    def ativo(self):
+        return bool(self._watcher.directories() or self._watcher.files() or self._timer_polling.isActive())
+
+    def iniciar(self):
+        if not self._vigiar() or self.polling:
+            logging.info(f"Observando {self.data_manager.base_path_data} por polling")
+            self._timer_polling.start()
+
+    def parar(self):
+        self._timer.stop()
+        self._timer_polling.stop()
+        vigiados = self._watcher.directories() + self._watcher.files()
+        if vigiados:
+            self._watcher.removePaths(vigiados)
+
+    def _vigiar(self):
+        # Arquivos substituídos (os.replace) saem do watcher; são incluídos de novo a cada verificação
+        existentes = [p for p in self.data_manager.arquivos_observados() if os.path.exists(p)]
+        novos = [p for p in existentes if p not in self._watcher.directories() and p not in self._watcher.files()]
+        falhas = self._watcher.addPaths(novos) if novos else []
+        if falhas:
+            logging.warning(f"Não foi possível observar: {', '.join(falhas)}")
+        return bool(self._watcher.directories())
+
+    def _agendar(self, _caminho=None):
+        self._timer.start()
+
+    def verificar(self):
+        """Relê os dados se mudaram; retorna True quando algo foi relido."""
+        if self.data_manager.em_transacao:
+            # Transação em andamento neste processo: confere de novo depois
+            self._timer.start()
+            return False
+        self._vigiar()
+        relido = self.data_manager.recarregar_se_alterado()
+        if relido:
+            self.alterado.emit()
+        return relido
@@ -1,20 +1,24 @@
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QGridLayout, QHBoxLayout,
-    QPushButton, QLabel, QScrollArea, QGroupBox, QFrame,
+    QPushButton, QLabel, QGroupBox, QFrame,
     QSpacerItem, QSizePolicy, QLineEdit, QGraphicsDropShadowEffect,
-    QToolButton, QButtonGroup, QProgressBar
+    QToolButton, QButtonGroup, QProgressBar, QFileDialog, QStackedWidget
 )
 from PySide6.QtGui import QPixmap, QFont, QColor, QPalette, QIcon, QMovie, QIntValidator
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QSize, Signal, Property
 import sys, os, random
-from datetime import datetime
 
 from src.adicionar_familia    import JanelaAdicionarFamilia
 from src.janela_confirmacao    import JanelaConfirmacao
 from src.delete_confirm_dialog import DeleteConfirmDialog
-from src.filtro_familias       import nao_sorteadas, sorteadas, buscar
 from src.data_manager import DataManager
+from src.imagens import IngestaoImagens
+from src.galeria import GaleriaFamilias
+from src.inicializacao import TarefasIniciais
+from src.observador_dados import ObservadorDados
+from src.tarefa_backup import TarefaBackup
 from src.numeros_impressao_dialog import NumerosImpressaoDialog
+from src.estatisticas_dialog import JanelaEstatisticas
 from src.widgets import (
     NotificationWidget, AutoSaveBanner, LoadingOverlay,
     SearchBar, FilterButton, TitleLabel, FullscreenImageViewer, PhotoViewer
@@ -125,6 +129,11 @@ class JanelaSalvamento(QFrame):
             self.move(x, y)
 
 class PainelPrincipal(QWidget):
+    # Alterações do DataManager chegam por sinal: se vierem de outra thread, são enfileiradas
+    _familias_alteradas = Signal(object)
+    # Espera após a última tecla antes de aplicar a busca na galeria
+    atraso_busca_ms = 150
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Família no Altar - Painel")
@@ -157,10 +166,6 @@ class PainelPrincipal(QWidget):
                 border-color: #4CAF50;
                 background: white;
             }
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
             QScrollBar:vertical {
                 border: none;
                 background: #F5F5F5;
@@ -190,6 +195,11 @@ class PainelPrincipal(QWidget):
         self.filtro_atual = "todas"
         self.termo_pesquisa = ""
         self.data_manager = DataManager()
+        # Teclas em sequência na busca viram uma única aplicação do filtro
+        self._timer_busca = QTimer(self)
+        self._timer_busca.setSingleShot(True)
+        self._timer_busca.setInterval(self.atraso_busca_ms)
+        self._timer_busca.timeout.connect(self._aplicar_filtro_galeria)
 
         self.janela_adicionar = JanelaAdicionarFamilia()
         self.janela_adicionar.familia_adicionada.connect(self._on_nova_familia)
@@ -199,16 +209,17 @@ class PainelPrincipal(QWidget):
         self.notification = NotificationWidget(self)
         self.auto_save_banner = AutoSaveBanner(self)
         self.loading_overlay = LoadingOverlay(self)
-        self._batch_size = 20
-        self._batch_index = 0
-        self._cards = []
-        self._familias_filtradas = []
-        self._batch_total = 0
-        self._batch_errors = 0
-        self._load_generation = 0
-        self._gallery_container = None
-        self._gallery_layout = None
-        self._gallery_placeholder = None
+        self._galeria_geracao = None
+        self._familias_alteradas.connect(self._on_familias_alteradas)
+        self._ouvinte_familias = self._familias_alteradas.emit
+        self.data_manager.adicionar_ouvinte(self._ouvinte_familias)
+        # Alterações feitas por scripts ou outra estação chegam pelo mesmo ouvinte
+        self.observador_dados = ObservadorDados(self.data_manager, self)
+        self.observador_dados.alterado.connect(self.verificar_reset_necessario)
+        self.observador_dados.iniciar()
+        self._ingestao = None
+        self._tarefas_iniciais = None
+        self._tarefa_backup = None
 
         self.init_ui()
         self.showMaximized()
@@ -216,9 +227,71 @@ class PainelPrincipal(QWidget):
     def _on_nova_familia(self):
         self.filtro_atual = "todas"
         self.search_input.clear()
-        self.data_manager.carregar_familias(force_reload=True)
+        # A linha nova já chegou pelo ouvinte do DataManager; só o filtro muda
+        self._aplicar_filtro_galeria()
         self.notification.show_message("Família adicionada com sucesso!", "success")
-        self.atualizar_galeria()    
+
+    def iniciar_tarefas_iniciais(self, versao):
+        """Valida os dados e faz o backup automático sem bloquear a janela."""
+        self._tarefas_iniciais = TarefasIniciais(self.data_manager, versao, parent=self)
+        self._tarefas_iniciais.progresso.connect(self._on_progresso_tarefas_iniciais)
+        self._tarefas_iniciais.dados_corrigidos.connect(self._on_dados_corrigidos)
+        self._tarefas_iniciais.concluido.connect(self._on_tarefas_iniciais_concluidas)
+        self._tarefas_iniciais.iniciar()
+
+    def _on_progresso_tarefas_iniciais(self, titulo, subtitulo, percentual):
+        self._set_progress_state(visible=True, title=titulo, subtitle=subtitulo, percent=percentual)
+
+    def _on_dados_corrigidos(self):
+        self.atualizar_galeria()
+        try:
+            if self.janela_sorteio and self.janela_sorteio.isVisible():
+                self.janela_sorteio.atualizar_ultimo_sorteado()
+        except Exception:
+            pass
+
+    def _on_tarefas_iniciais_concluidas(self, ok):
+        if not ok:
+            self.notification.show_message("Falha ao verificar os dados na inicialização", "error")
+        QTimer.singleShot(1500, self._hide_progress_if_idle)
+
+    def _importar_fotos(self):
+        caminhos, _ = QFileDialog.getOpenFileNames(self, "Importar Fotos", "", "Imagens (*.png *.jpg *.jpeg)")
+        if not caminhos:
+            return
+        if self._ingestao is None:
+            self._ingestao = IngestaoImagens(self.data_manager._thumbs_dir(), parent=self)
+            self._ingestao.progresso.connect(self._on_progresso_importacao)
+        # Nome da família sugerido pelo nome do arquivo; pode ser editado depois
+        itens = [
+            (os.path.splitext(os.path.basename(c))[0].replace("_", " "), c)
+            for c in caminhos
+        ]
+        total = self.data_manager.importar_familias(itens, self._ingestao, self._on_importacao_concluida)
+        if not total:
+            self.notification.show_message("Nenhuma foto válida selecionada", "error")
+            return
+        self._set_progress_state(
+            visible=True,
+            title="Importando fotos",
+            subtitle=f"Preparando {total} fotos. A interface continua disponível.",
+            percent=0,
+        )
+
+    def _on_progresso_importacao(self, feitos, total):
+        self._set_progress_state(
+            visible=True,
+            title="Importando fotos",
+            subtitle=f"{feitos} de {total} fotos processadas. A interface continua disponível.",
+            percent=100 if total == 0 else feitos * 100 / total,
+        )
+
+    def _on_importacao_concluida(self, ok, quantidade):
+        if ok:
+            self.notification.show_message(f"{quantidade} famílias importadas com sucesso!", "success")
+        else:
+            self.notification.show_message("Erro ao importar fotos", "error")
+        QTimer.singleShot(1500, self._hide_progress_if_idle)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -281,6 +354,9 @@ class PainelPrincipal(QWidget):
         btn_nav_cadastro.clicked.connect(self.janela_adicionar.show)
         sidebar_layout.addWidget(btn_nav_sorteio)
         sidebar_layout.addWidget(btn_nav_cadastro)
+        btn_nav_importar = QPushButton("Importar fotos")
+        btn_nav_importar.clicked.connect(self._importar_fotos)
+        sidebar_layout.addWidget(btn_nav_importar)
         # Controles do sorteio (visíveis apenas quando a tela de sorteio estiver ativa)
         controls_container = QFrame()
         controls_container.setStyleSheet("QFrame { background: transparent; }")
@@ -300,6 +376,7 @@ class PainelPrincipal(QWidget):
         self.numero_input_panel.setVisible(False)
         self.numero_input_panel.setEnabled(False)
         self.numero_input_panel.returnPressed.connect(self._on_enter_panel_numero)
+        self.numero_input_panel.textEdited.connect(self._on_numero_digitado)
         self.btn_confirmar_sidebar = QPushButton("Sortear")
         self.btn_confirmar_sidebar.setStyleSheet("QPushButton { background-color: #2c4b23; color: white; padding: 8px 12px; border-radius: 6px; } QPushButton:disabled { background-color: #9fb38f; }")
         self.btn_confirmar_sidebar.setEnabled(False)
@@ -323,6 +400,9 @@ class PainelPrincipal(QWidget):
 
         sidebar_layout.addWidget(controls_container)
         sidebar_layout.addStretch()
+        btn_estatisticas = QPushButton("Estatísticas")
+        btn_estatisticas.clicked.connect(self._abrir_estatisticas)
+        sidebar_layout.addWidget(btn_estatisticas)
         btn_imprimir_numeros = QPushButton("Imprimir números")
         btn_imprimir_numeros.clicked.connect(self._abrir_impressao_numeros)
         sidebar_layout.addWidget(btn_imprimir_numeros)
@@ -441,6 +521,11 @@ class PainelPrincipal(QWidget):
         self.progress_percent = QLabel("0%")
         self.progress_percent.setObjectName("progressPercent")
         progress_header.addWidget(self.progress_percent, 0, Qt.AlignRight | Qt.AlignVCenter)
+        self.progress_cancel = QPushButton("Cancelar")
+        self.progress_cancel.setCursor(Qt.PointingHandCursor)
+        self.progress_cancel.clicked.connect(self._on_cancelar_backup)
+        self.progress_cancel.hide()
+        progress_header.addWidget(self.progress_cancel, 0, Qt.AlignRight | Qt.AlignVCenter)
         progress_layout.addLayout(progress_header)
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 100)
@@ -449,24 +534,31 @@ class PainelPrincipal(QWidget):
         progress_layout.addWidget(self.progress_bar)
         right_layout.addWidget(self.progress_card)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
-                background-color: transparent;
-                border: none;
-            }
-            QScrollArea > QWidget > QWidget {
-                background-color: transparent;
-            }
-        """)
-        right_layout.addWidget(self.scroll_area)
-        self._build_empty_gallery("Aguardando dados...")
+        # Galeria virtualizada (modelo + delegate) e aviso para lista vazia
+        self.galeria = GaleriaFamilias()
+        self.galeria.delegate.editar.connect(self.abrir_edicao_familia)
+        self.galeria.delegate.excluir.connect(self.excluir_familia)
+        self.galeria.delegate.abrir_foto.connect(self._abrir_modal_foto)
+        self.galeria.filtro.usar_indice(self.data_manager.indice_busca)
+        self._gallery_placeholder = QLabel("Aguardando dados...")
+        self._gallery_placeholder.setAlignment(Qt.AlignCenter)
+        self._gallery_placeholder.setStyleSheet(
+            "QLabel { color: #6B7280; font-size: 14px; padding: 28px; "
+            "background-color: #F9FAFB; border: 1px dashed #D1D5DB; border-radius: 12px; }"
+        )
+        placeholder_page = QWidget()
+        placeholder_layout = QVBoxLayout(placeholder_page)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        placeholder_layout.addWidget(self._gallery_placeholder)
+        placeholder_layout.addStretch()
+        self.galeria_stack = QStackedWidget()
+        self.galeria_stack.addWidget(placeholder_page)
+        self.galeria_stack.addWidget(self.galeria)
+        right_layout.addWidget(self.galeria_stack, 1)
 
         page_layout.addWidget(sidebar)
         page_layout.addWidget(right_content)
         content_layout.addLayout(page_layout)
-        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
 
         main_layout.addWidget(content_widget)
 
@@ -523,7 +615,6 @@ class PainelPrincipal(QWidget):
         self.auto_save_banner.show_saving()
         
         if self.data_manager.resetar_sorteio():
-            self.atualizar_galeria()
             if hasattr(self, "btn_confirmar_sidebar") and self.btn_confirmar_sidebar:
                 self.btn_confirmar_sidebar.setEnabled(False)
                 self.btn_confirmar_sidebar.setText("Sortear")
@@ -539,25 +630,59 @@ class PainelPrincipal(QWidget):
         self.hideLoading()
 
     def _on_backup_manual(self):
-        self.showLoading()
-        QTimer.singleShot(100, self._on_backup_manual_impl)
+        if self._tarefa_backup is not None and self._tarefa_backup.ativo:
+            self.notification.show_message("Já existe um backup em andamento", "info")
+            return
+        self._tarefa_backup = TarefaBackup(self.data_manager, APP_VERSION, parent=self)
+        self._tarefa_backup.progresso.connect(self._on_progresso_backup)
+        self._tarefa_backup.concluido.connect(self._on_backup_concluido)
+        self._set_progress_state(
+            visible=True,
+            title="Gerando backup",
+            subtitle="Verificando arquivos. A interface continua disponível.",
+            percent=0,
+        )
+        self.progress_cancel.setEnabled(True)
+        self.progress_cancel.show()
+        self._tarefa_backup.iniciar()
+
+    def _on_progresso_backup(self, feitos, total, bytes_feitos, bytes_total):
+        percentual = bytes_feitos * 100 // bytes_total if bytes_total else 100
+        mb_feitos = bytes_feitos / (1024 * 1024)
+        mb_total = bytes_total / (1024 * 1024)
+        self._set_progress_state(
+            visible=True,
+            title="Gerando backup",
+            subtitle=f"{feitos} de {total} arquivos • {mb_feitos:.1f} de {mb_total:.1f} MB",
+            percent=percentual,
+        )
+        self.progress_cancel.show()
 
-    def _on_backup_manual_impl(self):
-        ok = False
-        try:
-            ok = self.data_manager.criar_backup_manual(APP_VERSION)
-        except Exception:
-            ok = False
-        self.hideLoading()
+    def _on_cancelar_backup(self):
+        if self._tarefa_backup is not None and self._tarefa_backup.ativo:
+            self._tarefa_backup.cancelar()
+            self.progress_cancel.setEnabled(False)
+            self.progress_subtitle.setText("Cancelando backup...")
+
+    def _on_backup_concluido(self, ok, cancelado):
+        self.progress_cancel.hide()
+        QTimer.singleShot(0, self._hide_progress_if_idle)
         if ok:
             msg = "Backup criado com sucesso em %APPDATA%/FamiliaNoAltar/backups"
             dlg = JanelaConfirmacao("", parent=self, info_text=msg)
             dlg.exec()
+        elif cancelado:
+            self.notification.show_message("Backup cancelado", "info")
         else:
             self.notification.show_message("Falha ao criar backup", "error")
 
+    def _abrir_estatisticas(self):
+        # Lido dos agregados mantidos a cada sorteio; não varre o histórico
+        dialog = JanelaEstatisticas(self.data_manager.estatisticas(), self)
+        dialog.exec()
+
     def _abrir_impressao_numeros(self):
-        familias = nao_sorteadas(self.data_manager.carregar_familias())
+        familias = self.data_manager.familias_pendentes()
         try:
             familias = sorted(familias, key=lambda f: int(f.get("numero", 0)))
         except Exception:
@@ -582,11 +707,17 @@ class PainelPrincipal(QWidget):
 
     def atualizar_filtro(self, filtro):
         self.filtro_atual = filtro
-        self.atualizar_galeria()
+        self._aplicar_filtro_galeria()
 
     def atualizar_busca(self, texto):
+        # Reiniciar o timer descarta a busca anterior ainda não aplicada;
+        # limpar a busca é aplicado na hora.
         self.termo_pesquisa = texto
-        self.atualizar_galeria()
+        if texto.strip():
+            self._timer_busca.start()
+        else:
+            self._timer_busca.stop()
+            self._aplicar_filtro_galeria()
 
     def _formatar_total_familias(self, total, filtro=None):
         filtro = filtro or self.filtro_atual
@@ -597,36 +728,15 @@ class PainelPrincipal(QWidget):
         return f"{total} famílias"
 
     def _total_por_filtro(self, familias):
-        if self.filtro_atual == "sorteadas":
-            return len(sorteadas(familias))
-        if self.filtro_atual == "nao_sorteadas":
-            return len(nao_sorteadas(familias))
-        return len(familias)
+        # Contadores mantidos pelo DataManager; não percorre a lista
+        return self.data_manager.contar_familias(self.filtro_atual)
 
     def atualizar_galeria(self):
-        self._load_generation += 1
-        generation = self._load_generation
-        self._batch_index = 0
-        self._batch_errors = 0
-        self._cards = []
-        self._familias_filtradas = []
-        self._batch_total = 0
-        self._set_progress_state(
-            visible=True,
-            title="Carregando famílias",
-            subtitle="A interface já está pronta. Os registros serão exibidos gradualmente.",
-            percent=0,
-        )
-        self.label_total.setText("Carregando famílias...")
-        self._build_empty_gallery("Preparando registros...")
-        QTimer.singleShot(0, lambda: self._preparar_carregamento_galeria(generation))
-
-    def _preparar_carregamento_galeria(self, generation):
-        if generation != self._load_generation:
-            return
-
+        # Carga completa do modelo (abertura, lista recarregada sem diferença
+        # por registro); o modelo só é refeito quando a geração do DataManager
+        # muda. As demais alterações chegam por `_on_familias_alteradas`.
         try:
-            familias_base = self.data_manager.carregar_familias()
+            familias = self.data_manager.carregar_familias()
         except Exception as exc:
             self._set_progress_state(
                 visible=True,
@@ -635,121 +745,48 @@ class PainelPrincipal(QWidget):
                 percent=0,
             )
             self.label_total.setText("Falha ao carregar famílias")
-            self._build_empty_gallery("Não foi possível carregar os registros.")
+            self._mostrar_galeria_vazia("Não foi possível carregar os registros.")
             self.notification.show_message(f"Falha ao carregar famílias: {exc}", "error")
             return
-
-        familias = list(familias_base)
-        if self.filtro_atual == "nao_sorteadas":
-            familias = nao_sorteadas(familias)
-        elif self.filtro_atual == "sorteadas":
-            familias = sorteadas(familias)
-
-        familias = buscar(familias, self.termo_pesquisa)
-        try:
-            familias = sorted(familias, key=lambda f: int(f.get("numero", 0)))
-        except Exception:
-            familias = sorted(familias, key=lambda f: str(f.get("numero", "")))
-
-        self._familias_filtradas = familias
-        self._batch_total = len(familias)
+        if self.data_manager.generation != self._galeria_geracao:
+            self.galeria.filtro.atualizar_indice()
+            self.galeria.modelo.definir_familias(familias)
+            self._galeria_geracao = self.data_manager.generation
+        self._aplicar_filtro_galeria()
         self.verificar_reset_necessario()
-        total_base = len(familias_base)
-        total_filtro = self._total_por_filtro(familias_base)
 
-        if not familias:
-            texto_vazio = "Nenhuma família encontrada para o filtro atual."
-            self._build_empty_gallery(texto_vazio)
-            self.label_total.setText(self._formatar_total_familias(total_filtro))
-            self._set_progress_state(
-                visible=bool(total_base),
-                title="Carregamento concluído",
-                subtitle="Nenhum registro corresponde ao filtro informado." if total_base else "Cadastre a primeira família para começar.",
-                percent=100,
-            )
-            if total_base:
-                QTimer.singleShot(1500, lambda: self._hide_progress_if_idle(generation))
+    def _on_familias_alteradas(self, alteracao):
+        # Aplica só as linhas afetadas; a posição de rolagem é mantida
+        if self._galeria_geracao is None:
             return
-
-        self.label_total.setText(self._formatar_total_familias(total_filtro))
-        self._build_empty_gallery("Carregando primeiros registros...")
-        self._processar_proximo_lote(generation)
-
-    def _processar_proximo_lote(self, generation):
-        if generation != self._load_generation:
-            return
-
-        inicio = self._batch_index
-        fim = min(inicio + self._batch_size, self._batch_total)
-        lote = self._familias_filtradas[inicio:fim]
-
-        for familia in lote:
-            try:
-                if self._gallery_placeholder is not None:
-                    self._gallery_layout.removeWidget(self._gallery_placeholder)
-                    self._gallery_placeholder.hide()
-                    self._gallery_placeholder.deleteLater()
-                    self._gallery_placeholder = None
-                item = self._criar_item_lista(familia)
-                self._gallery_layout.insertWidget(self._gallery_layout.count() - 1, item)
-                self._cards.append(item)
-            except Exception:
-                self._batch_errors += 1
-
-        self._batch_index = fim
-        percentual = 100 if self._batch_total == 0 else int((self._batch_index / self._batch_total) * 100)
-        restante = max(self._batch_total - self._batch_index, 0)
-        self._set_progress_state(
-            visible=True,
-            title="Carregando famílias",
-            subtitle=f"{self._batch_index} registros adicionados. Restam {restante}.",
-            percent=percentual,
-        )
-
-        if self._batch_index < self._batch_total:
-            QTimer.singleShot(12, lambda: self._processar_proximo_lote(generation))
+        if alteracao.recarregada:
+            self.atualizar_galeria()
             return
+        # O índice novo vem antes: o proxy reavalia as linhas alteradas com ele
+        self.galeria.filtro.atualizar_indice()
+        self.galeria.modelo.aplicar_alteracao(alteracao, self.data_manager.carregar_familias())
+        self._galeria_geracao = self.data_manager.generation
+        self._aplicar_filtro_galeria()
+        self.verificar_reset_necessario()
 
-        mensagem_final = f"{self._batch_total} famílias carregadas com sucesso."
-        if self._batch_errors:
-            mensagem_final = f"{self._batch_total - self._batch_errors} famílias carregadas. {self._batch_errors} itens apresentaram falha."
-            self.notification.show_message(
-                "Alguns registros não puderam ser exibidos, mas o sistema continua operacional.",
-                "error",
-            )
-
-        self._set_progress_state(
-            visible=True,
-            title="Carregamento concluído",
-            subtitle=mensagem_final,
-            percent=100,
-        )
-        QTimer.singleShot(1800, lambda: self._hide_progress_if_idle(generation))
-
-    def _build_empty_gallery(self, empty_message=""):
-        anterior = self.scroll_area.takeWidget()
-        if anterior is not None:
-            anterior.deleteLater()
-
-        self._gallery_container = QWidget()
-        self._gallery_container.setStyleSheet("background-color: transparent;")
-        self._gallery_layout = QVBoxLayout(self._gallery_container)
-        self._gallery_layout.setContentsMargins(0, 0, 0, 0)
-        self._gallery_layout.setSpacing(8)
-
-        if empty_message:
-            self._gallery_placeholder = QLabel(empty_message)
-            self._gallery_placeholder.setAlignment(Qt.AlignCenter)
-            self._gallery_placeholder.setStyleSheet(
-                "QLabel { color: #6B7280; font-size: 14px; padding: 28px; "
-                "background-color: #F9FAFB; border: 1px dashed #D1D5DB; border-radius: 12px; }"
-            )
-            self._gallery_layout.addWidget(self._gallery_placeholder)
+    def _aplicar_filtro_galeria(self):
+        self._timer_busca.stop()
+        self.galeria.filtro.definir_filtro(self.filtro_atual, self.termo_pesquisa)
+        total = self._formatar_total_familias(self._total_por_filtro(None))
+        if self.galeria.filtro.aproximada:
+            total += " · mostrando nomes parecidos com a busca"
+        self.label_total.setText(total)
+        if self.galeria.filtro.rowCount() == 0:
+            if self.galeria.modelo.rowCount():
+                self._mostrar_galeria_vazia("Nenhuma família encontrada para o filtro atual.")
+            else:
+                self._mostrar_galeria_vazia("Cadastre a primeira família para começar.")
         else:
-            self._gallery_placeholder = None
+            self.galeria_stack.setCurrentWidget(self.galeria)
 
-        self._gallery_layout.addStretch()
-        self.scroll_area.setWidget(self._gallery_container)
+    def _mostrar_galeria_vazia(self, empty_message):
+        self._gallery_placeholder.setText(empty_message)
+        self.galeria_stack.setCurrentIndex(0)
 
     def _set_progress_state(self, visible, title, subtitle, percent):
         self.progress_card.setVisible(visible)
@@ -758,63 +795,31 @@ class PainelPrincipal(QWidget):
         self.progress_bar.setValue(max(0, min(100, int(percent))))
         self.progress_percent.setText(f"{max(0, min(100, int(percent)))}%")
 
-    def _hide_progress_if_idle(self, generation):
-        if generation == self._load_generation and self._batch_index >= self._batch_total:
+    def _hide_progress_if_idle(self):
+        tarefas_ativas = any(t is not None and t.ativo for t in (self._tarefas_iniciais, self._tarefa_backup))
+        if not tarefas_ativas:
             self.progress_card.hide()
 
-    def on_scroll(self):
-        pass
-
     def exibir_imagem_fullscreen(self, imagem_url):
         if not imagem_url:
             return
-        abs_path = self.data_manager._resolve_photo_abs(imagem_url) if imagem_url else ""
-        if abs_path and os.path.exists(abs_path):
-            pix = QPixmap(abs_path)
+        abs_path = FullscreenImageViewer.foto_para_tela(imagem_url, self.data_manager, self)
+        pix = FullscreenImageViewer.pixmap_para_tela(abs_path, self) if abs_path else None
+        if pix is not None:
             viewer = PhotoViewer(pix, self)
             viewer.exec_()
 
     def verificar_reset_necessario(self):
-        familias = self.data_manager.carregar_familias()
-        todas = all(f.get("sorteado", False) for f in familias)
         if hasattr(self, "btn_resetar") and self.btn_resetar:
-            self.btn_resetar.setVisible(todas)
-
-    def _criar_item_lista(self, familia):
-        item = QFrame()
-        item.setStyleSheet("QFrame { background-color: white; border: 1px solid #E0E0E0; border-radius: 8px; }")
-        h = QHBoxLayout(item)
-        h.setContentsMargins(12, 8, 12, 8)
-        h.setSpacing(12)
-        numero = QLabel(f"{familia.get('numero', '-')}")
-        numero.setStyleSheet("QLabel { font-size: 16px; font-weight: 700; color: #212121; }")
-        nome = QLabel(f"{familia.get('nome','')}")
-        nome.setStyleSheet("QLabel { font-size: 16px; font-weight: 600; color: #1F2937; }")
-        nome.mousePressEvent = lambda e, f=familia: self._abrir_modal_foto(f)
-        h.addWidget(numero, 0)
-        h.addWidget(nome, 1)
-        _sorteada = familia.get("sorteado")
-        status_icon = QLabel("✓" if _sorteada else "⌛")
-        status_icon.setToolTip("Família sorteada" if _sorteada else "Família aguardando sorteio")
-        status_icon.setStyleSheet("QLabel { color: %s; font-size: 20px; font-weight: 700; }" % ("#2c4b23" if _sorteada else "#757575"))
-        h.addWidget(status_icon, 0)
-        editar = QPushButton("Editar")
-        editar.setStyleSheet("QPushButton { background-color: #2c4b23; color: white; padding: 6px 12px; border-radius: 6px; } QPushButton:hover { background-color: #243f1d; }")
-        editar.clicked.connect(lambda: self.abrir_edicao_familia(familia))
-        excluir = QPushButton("Excluir")
-        excluir.setStyleSheet("QPushButton { background-color: #EF5350; color: white; padding: 6px 12px; border-radius: 6px; } QPushButton:hover { background-color: #E53935; }")
-        excluir.clicked.connect(lambda: self.excluir_familia(familia))
-        h.addWidget(editar, 0)
-        h.addWidget(excluir, 0)
-        return item
+            self.btn_resetar.setVisible(self.data_manager.todas_sorteadas)
 
     def _abrir_modal_foto(self, familia):
         caminho = familia.get("foto", "")
         if not caminho:
             return
-        abs_path = self.data_manager._resolve_photo_abs(caminho)
-        if abs_path and os.path.exists(abs_path):
-            pix = QPixmap(abs_path)
+        abs_path = FullscreenImageViewer.foto_para_tela(familia, self.data_manager, self)
+        pix = FullscreenImageViewer.pixmap_para_tela(abs_path, self)
+        if pix is not None:
             viewer = PhotoViewer(pix, self)
             viewer.exec_()
 
@@ -875,6 +880,11 @@ class PainelPrincipal(QWidget):
         except Exception as e:
             self.notification.show_message(f"Erro ao processar número: {str(e)}", "error")
 
+    def _on_numero_digitado(self, texto):
+        # Antecipa a decodificação da foto enquanto o número é digitado
+        if self.janela_sorteio and self.janela_sorteio.isVisible():
+            self.janela_sorteio.prefetch_numero(texto)
+
     def _on_click_sorteio_botao(self):
         if not self.numero_sorteado:
             # realiza o sorteio (mesmo comportamento do Enter)
@@ -893,47 +903,38 @@ class PainelPrincipal(QWidget):
         QTimer.singleShot(100, self._finalizar_sorteio_impl)
 
     def _finalizar_sorteio_impl(self):
-        familias = self.data_manager.carregar_familias()
-        familia_sorteada = next(
-            (f for f in familias if str(f.get("numero")) == str(self.numero_sorteado)),
-            None
-        )
+        familia_sorteada = self.data_manager.get_by_numero(self.numero_sorteado)
 
         if familia_sorteada:
-            familia_sorteada["sorteado"] = True
-            familia_sorteada["data_sorteio"] = datetime.now().strftime("%d/%m/%Y")
-
-            if self.data_manager.salvar_familias(familias):
-                if self.data_manager.salvar_sorteio(self.numero_sorteado):
-                    self.numero_sorteado = None
-                    self.btn_confirmar_sidebar.setEnabled(False)
-                    self.btn_fechar_sorteio.setVisible(False)
-                    self.btn_confirmar_sidebar.setText("Sortear")
-
-                    if self.janela_sorteio:
-                        self.janela_sorteio.close()
-                        self.janela_sorteio = None
-                        self.numero_input_panel.clear()
-                        self.numero_input_panel.setVisible(False)
-                        self.numero_input_panel.setEnabled(False)
-
-                    msg = f"Família {familia_sorteada['nome']} sorteada com sucesso!"
-                    dlg = JanelaConfirmacao("", parent=self, info_text=msg)
-                    dlg.exec()
-                    
-                    QTimer.singleShot(100, self.atualizar_galeria)
-                    self.auto_save_banner.show_saved()
-                else:
-                    self.notification.show_message("Erro ao salvar sorteio", "error")
+            # Família e último sorteado gravados juntos, em uma única escrita;
+            # o DataManager também atualiza auditoria e estatísticas
+            salvo = self.data_manager.alterar_status_familia(self.numero_sorteado, True)
+
+            if salvo:
+                self.numero_sorteado = None
+                self.btn_confirmar_sidebar.setEnabled(False)
+                self.btn_fechar_sorteio.setVisible(False)
+                self.btn_confirmar_sidebar.setText("Sortear")
+
+                if self.janela_sorteio:
+                    self.janela_sorteio.close()
+                    self.janela_sorteio = None
+                    self.numero_input_panel.clear()
+                    self.numero_input_panel.setVisible(False)
+                    self.numero_input_panel.setEnabled(False)
+
+                msg = f"Família {familia_sorteada['nome']} sorteada com sucesso!"
+                dlg = JanelaConfirmacao("", parent=self, info_text=msg)
+                dlg.exec()
+
+                self.auto_save_banner.show_saved()
             else:
-                self.notification.show_message("Erro ao salvar famílias", "error")
+                self.notification.show_message("Erro ao salvar sorteio", "error")
 
         self.hideLoading()
 
     def abrir_edicao_familia(self, familia):
         def callback_atualizacao():
-            self.data_manager.carregar_familias(force_reload=True)
-            self.atualizar_galeria()
             try:
                 ultimo = self.data_manager.carregar_ultimo_sorteio()
                 if self.janela_sorteio and self.janela_sorteio.isVisible():
@@ -964,7 +965,6 @@ class PainelPrincipal(QWidget):
         if ok:
             self.notification.show_message(f"Família {familia['nome']} removida com sucesso!", "success")
             self.auto_save_banner.show_saved()
-            self.atualizar_galeria()
         else:
             self.notification.show_message("Erro ao remover família", "error")
         self.hideLoading()
@@ -977,9 +977,11 @@ class PainelPrincipal(QWidget):
         self.loading_overlay.hide()
 
     def closeEvent(self, event):
+        self.observador_dados.parar()
+        self.data_manager.remover_ouvinte(self._ouvinte_familias)
         QApplication.quit()
 
-def iniciar_painel():
+def iniciar_painel(versao_tarefas_iniciais=None):
     apply_windows_app_user_model_id()
     app = QApplication(sys.argv)
     try:
@@ -989,4 +991,7 @@ def iniciar_painel():
     except Exception:
         pass
     painel = PainelPrincipal()
+    if versao_tarefas_iniciais is not None:
+        # Janela já aberta com os dados em cache; validação e backup seguem em segundo plano
+        QTimer.singleShot(0, lambda: painel.iniciar_tarefas_iniciais(versao_tarefas_iniciais))
     sys.exit(app.exec())
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from src.journal import FamiliasJournal, SEM_REGISTRO
+
+# Sentinela para `commit`: o último sorteado não faz parte da gravação
+SEM_ALTERACAO = object()
+
+
+def assinatura_arquivo(path):
+    """(inode, tamanho, mtime) do arquivo, ou None se não existir."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def hash_arquivos(*paths):
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(bloco)
+        except OSError:
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+class BackendJson:
+    """Persistência em `familias.json` (com diário) e `sorteio.json`."""
+
+    nome = "json"
+
+    def __init__(self, dados_dir, somente_leitura=False):
+        self.familias_file = os.path.join(dados_dir, "familias.json")
+        self.sorteio_file = os.path.join(dados_dir, "sorteio.json")
+        self.journal_file = os.path.join(dados_dir, "familias.journal")
+        self.journal = FamiliasJournal(self.familias_file, self.journal_file, somente_leitura=somente_leitura)
+
+    def _atomic_write(self, path, data):
+        dir_path = os.path.dirname(path)
+        os.makedirs(dir_path, exist_ok=True)
+        tmp_path = os.path.join(dir_path, f".{os.path.basename(path)}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def inicializar(self):
+        if not os.path.exists(self.familias_file):
+            self.journal.compactar([])
+        if not os.path.exists(self.sorteio_file):
+            self._atomic_write(self.sorteio_file, {"ultimo_sorteado": None})
+
+    def existe(self):
+        return os.path.exists(self.familias_file)
+
+    def assinatura(self):
+        return (assinatura_arquivo(self.familias_file), assinatura_arquivo(self.journal_file))
+
+    def hash_conteudo(self):
+        return hash_arquivos(self.familias_file, self.journal_file)
+
+    def carregar_familias(self):
+        return self.journal.carregar()
+
+    def _garantir_diario(self):
+        if not self.journal.carregado and os.path.exists(self.familias_file):
+            try:
+                self.journal.carregar()
+            except Exception as e:
+                logging.warning(f"Não foi possível carregar o diário de famílias: {e}")
+
+    def _gravar_sorteio_arquivo(self, numero):
+        if numero is None:
+            if os.path.exists(self.sorteio_file):
+                os.remove(self.sorteio_file)
+        else:
+            self._atomic_write(self.sorteio_file, {"ultimo_sorteado": numero})
+
+    def _compactar(self, familias):
+        # sorteio.json antes do snapshot: se cair no meio, o diário ainda vale
+        if self.journal.ultimo is not SEM_REGISTRO:
+            self._gravar_sorteio_arquivo(self.journal.ultimo)
+        self.journal.compactar(familias)
+
+    def commit(self, familias=None, ultimo=SEM_ALTERACAO, diario=True, alteradas=None):
+        """Grava famílias e/ou o último sorteado em uma única escrita.
+
+        Com o diário ativo, tudo vai em uma só linha do `familias.journal`.
+        `alteradas` (registros de `familias` alterados ou inseridos) dispensa
+        a comparação da lista inteira com o estado gravado. Retorna True se
+        outro processo tinha reescrito o snapshot: a gravação foi feita sobre
+        ele e `familias` não é mais a lista em disco.
+        """
+        self._garantir_diario()
+        if familias is None and self.journal.ultimo is SEM_REGISTRO:
+            # Só o último sorteado mudou e o diário não o sobrepõe
+            if ultimo is not SEM_ALTERACAO:
+                self._gravar_sorteio_arquivo(ultimo)
+            return False
+        parcial = alteradas is not None and all(f.get("id") is not None for f in alteradas)
+        if familias is None:
+            ops = []
+        elif parcial:
+            ops = [{"op": "upsert", "familia": f} for f in alteradas]
+        else:
+            ops = self.journal.diferencas(familias)
+        if diario and ops is not None and self.journal.carregado:
+            if ultimo is not SEM_ALTERACAO:
+                ops.append({"op": "ultimo", "numero": ultimo})
+            if self.journal.registrar(ops):
+                return True
+            if familias is not None:
+                if parcial:
+                    self.journal.marcar_persistidas(alteradas)
+                else:
+                    self.journal.marcar_persistido(familias)
+                if self.journal.precisa_compactar():
+                    self._compactar(familias)
+            return False
+        if familias is None:
+            familias = self.journal.carregar()
+        if ultimo is not SEM_ALTERACAO:
+            self.journal.ultimo = ultimo
+        self._compactar(familias)
+        return False
+
+    def salvar_familias(self, familias, diario=True):
+        return self.commit(familias, diario=diario)
+
+    def substituir_familias(self, familias):
+        self._garantir_diario()
+        self._compactar(familias)
+
+    def descartar_corrompido(self):
+        if os.path.exists(self.familias_file):
+            shutil.copy2(self.familias_file, self.familias_file + ".bak")
+        self.journal.compactar([])
+
+    def ler_ultimo(self):
+        """Retorna (existe, numero); levanta exceção se o arquivo estiver corrompido."""
+        self._garantir_diario()
+        if self.journal.ultimo is not SEM_REGISTRO:
+            return self.journal.ultimo is not None, self.journal.ultimo
+        if not os.path.exists(self.sorteio_file):
+            return False, None
+        with open(self.sorteio_file, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        return True, dados.get("ultimo_sorteado")
+
+    def gravar_ultimo(self, numero):
+        self.commit(ultimo=numero)
+
+    def apagar_ultimo(self):
+        self.commit(ultimo=None)
+
+    # Consultas agregadas: o backend JSON não tem índice próprio; o DataManager
+    # responde pelo índice em memória.
+    def contar(self, sorteado=None):
+        return None
+
+    def listar(self, sorteado=None):
+        return None
+
+
+def criar_backend(base_path_data, tipo=None, somente_leitura=False):
+    """Seleciona o backend: explícito, ou SQLite quando `dados/familias.db` existe.
+
+    `somente_leitura` cria um leitor independente, que pode rodar em outra
+    thread sem alterar os arquivos (o SQLite já isola leitores pelo WAL).
+    """
+    dados_dir = os.path.join(base_path_data, "dados")
+    if tipo is None:
+        tipo = "sqlite" if os.path.exists(os.path.join(dados_dir, "familias.db")) else "json"
+    if tipo == "sqlite":
+        from src.persistencia_sqlite import BackendSqlite
+        return BackendSqlite(dados_dir)
+    return BackendJson(dados_dir, somente_leitura=somente_leitura)
@@ -0,0 +1,258 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from src.persistencia import SEM_ALTERACAO, BackendJson, assinatura_arquivo, hash_arquivos
+
+_COLUNAS = ("id", "numero", "nome", "foto", "sorteado", "data_sorteio")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS familias (
+    id INTEGER PRIMARY KEY,
+    numero INTEGER,
+    nome TEXT NOT NULL,
+    foto TEXT NOT NULL DEFAULT '',
+    sorteado INTEGER NOT NULL DEFAULT 0,
+    data_sorteio TEXT,
+    data_sorteio_iso TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_familias_numero ON familias(numero);
+CREATE INDEX IF NOT EXISTS idx_familias_sorteado ON familias(sorteado, numero);
+CREATE INDEX IF NOT EXISTS idx_familias_data ON familias(data_sorteio_iso);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+_INSERT_SQL = "INSERT OR REPLACE INTO familias VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def _data_iso(data_str):
+    """Converte dd/mm/aaaa em aaaa-mm-dd para ordenação indexada."""
+    try:
+        d, m, y = str(data_str).split("/")
+        return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+    except Exception:
+        return None
+
+
+def _serializar(familia):
+    return json.dumps(familia, ensure_ascii=False, sort_keys=True)
+
+
+class BackendSqlite:
+    """Persistência em `dados/familias.db` com colunas indexadas.
+
+    Mantém a mesma interface do `BackendJson`; cada gravação vira uma única
+    transação com apenas as linhas alteradas.
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, dados_dir, db_file=None):
+        self.db_file = db_file or os.path.join(dados_dir, "familias.db")
+        self._lock = threading.RLock()
+        self._conn = None
+        self._persistido = {}
+
+    def _conexao(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def fechar(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Conversão
+
+    def _linha(self, familia):
+        extra = {k: v for k, v in familia.items() if k not in _COLUNAS}
+        data = familia.get("data_sorteio")
+        return (
+            familia.get("id"),
+            familia.get("numero"),
+            str(familia.get("nome", "")),
+            familia.get("foto") or "",
+            1 if familia.get("sorteado") else 0,
+            data,
+            _data_iso(data) if data else None,
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def _familia(self, row):
+        id_val, numero, nome, foto, sorteado, data, extra = row
+        familia = {"id": id_val, "numero": numero, "nome": nome, "foto": foto or "", "sorteado": bool(sorteado)}
+        if data:
+            familia["data_sorteio"] = data
+        if extra:
+            try:
+                familia.update(json.loads(extra))
+            except Exception:
+                pass
+        return familia
+
+    def _select(self, where="", params=()):
+        sql = "SELECT id, numero, nome, foto, sorteado, data_sorteio, extra FROM familias"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY numero"
+        with self._lock:
+            return [self._familia(r) for r in self._conexao().execute(sql, params)]
+
+    # Interface comum
+
+    def inicializar(self):
+        with self._lock:
+            self._conexao()
+
+    def existe(self):
+        return os.path.exists(self.db_file)
+
+    def assinatura(self):
+        return (assinatura_arquivo(self.db_file), assinatura_arquivo(self.db_file + "-wal"))
+
+    def hash_conteudo(self):
+        return hash_arquivos(self.db_file, self.db_file + "-wal")
+
+    def carregar_familias(self):
+        familias = self._select()
+        self._persistido = {f.get("id"): _serializar(f) for f in familias}
+        return familias
+
+    def commit(self, familias=None, ultimo=SEM_ALTERACAO, diario=True, alteradas=None):
+        """Grava famílias e/ou o último sorteado em uma única transação.
+
+        `alteradas` (registros de `familias` alterados ou inseridos) dispensa
+        a comparação da lista inteira com o estado gravado.
+        """
+        removidas, atuais = [], None
+        parcial = familias is not None and alteradas is not None and all(f.get("id") is not None for f in alteradas)
+        alteradas = list(alteradas) if parcial else []
+        if familias is not None and not parcial:
+            atuais = {}
+            for f in familias:
+                chave = f.get("id")
+                if chave is None or chave in atuais:
+                    self.substituir_familias(familias)
+                    familias, atuais = None, None
+                    break
+                atuais[chave] = f
+            if atuais is not None:
+                alteradas = [f for k, f in atuais.items() if self._persistido.get(k) != _serializar(f)]
+                removidas = [k for k in self._persistido if k not in atuais]
+        if not alteradas and not removidas and ultimo is SEM_ALTERACAO:
+            return
+        with self._lock:
+            conn = self._conexao()
+            with conn:
+                if removidas:
+                    conn.executemany("DELETE FROM familias WHERE id = ?", [(k,) for k in removidas])
+                if alteradas:
+                    conn.executemany(_INSERT_SQL, [self._linha(f) for f in alteradas])
+                if ultimo is None:
+                    conn.execute("DELETE FROM meta WHERE chave = 'ultimo_sorteado'")
+                elif ultimo is not SEM_ALTERACAO:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('ultimo_sorteado', ?)",
+                        (json.dumps(ultimo),),
+                    )
+        if atuais is not None:
+            self._persistido = {k: _serializar(f) for k, f in atuais.items()}
+        elif parcial:
+            for f in alteradas:
+                self._persistido[f.get("id")] = _serializar(f)
+
+    def salvar_familias(self, familias, diario=True):
+        return self.commit(familias, diario=diario)
+
+    def substituir_familias(self, familias):
+        with self._lock:
+            conn = self._conexao()
+            with conn:
+                conn.execute("DELETE FROM familias")
+                conn.executemany(_INSERT_SQL, [self._linha(f) for f in familias])
+        self._persistido = {f.get("id"): _serializar(f) for f in familias}
+
+    def descartar_corrompido(self):
+        self.fechar()
+        if os.path.exists(self.db_file):
+            os.replace(self.db_file, self.db_file + ".bak")
+        self.inicializar()
+        self._persistido = {}
+
+    def ler_ultimo(self):
+        with self._lock:
+            row = self._conexao().execute(
+                "SELECT valor FROM meta WHERE chave = 'ultimo_sorteado'"
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def gravar_ultimo(self, numero):
+        self.commit(ultimo=numero)
+
+    def apagar_ultimo(self):
+        self.commit(ultimo=None)
+
+    def contar(self, sorteado=None):
+        sql = "SELECT COUNT(*) FROM familias"
+        params = ()
+        if sorteado is not None:
+            sql += " WHERE sorteado = ?"
+            params = (1 if sorteado else 0,)
+        with self._lock:
+            return self._conexao().execute(sql, params).fetchone()[0]
+
+    def listar(self, sorteado=None):
+        if sorteado is None:
+            return self._select()
+        return self._select("sorteado = ?", (1 if sorteado else 0,))
+
+
+def migrar_json_para_sqlite(base_path_data, substituir=False):
+    """Cria `dados/familias.db` a partir de `familias.json` (+ diário) e `sorteio.json`.
+
+    Retorna a quantidade de famílias migradas. O banco é montado em um arquivo
+    temporário e só então movido para o lugar definitivo.
+    """
+    dados_dir = os.path.join(base_path_data, "dados")
+    destino = os.path.join(dados_dir, "familias.db")
+    if os.path.exists(destino) and not substituir:
+        raise FileExistsError(f"{destino} já existe")
+
+    origem = BackendJson(dados_dir)
+    familias = origem.carregar_familias()
+    try:
+        _, ultimo = origem.ler_ultimo()
+    except Exception:
+        ultimo = None
+
+    tmp = destino + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    novo = BackendSqlite(dados_dir, db_file=tmp)
+    try:
+        novo.substituir_familias(familias)
+        if ultimo is not None:
+            novo.gravar_ultimo(ultimo)
+        novo._conexao().execute("PRAGMA journal_mode=DELETE")
+    finally:
+        novo.fechar()
+    for sufixo in ("-wal", "-shm"):
+        if os.path.exists(destino + sufixo):
+            os.remove(destino + sufixo)
+    os.replace(tmp, destino)
+    logging.info(f"Migração para SQLite: {len(familias)} famílias em {destino}")
+    return len(familias)
@@ -0,0 +1,105 @@
+import itertools
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QSize, Signal
+from PySide6.QtGui import QPixmap
+
+from src.cache_imagens import CachePixmaps
+from src.imagens import decodificar_para
+
+
+class PrefetchFotos(QObject):
+    """Decodifica antecipadamente as fotos das famílias cujo número começa
+    com o que já foi digitado, no tamanho da tela de apresentação. As fotos
+    prontas vão para o `CachePixmaps` compartilhado.
+
+    `prefetch(prefixo, tamanho, dpr)` agenda as candidatas e retorna na hora;
+    `obter(familia, tamanho, dpr)` devolve o QPixmap pronto (ou None), já na
+    densidade da tela. Cada novo prefixo substitui
+    o anterior: candidatas que deixaram de casar não são decodificadas.
+    """
+
+    pronta = Signal(str)
+    _decodificada = Signal(object)
+
+    def __init__(self, data_manager, limite=6, cache=None, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.limite = limite
+        self.cache = cache or CachePixmaps.compartilhado()
+        self._prontas = OrderedDict()
+        self._desejadas = set()
+        self._agendadas = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch-fotos")
+        self._decodificada.connect(self._guardar)
+
+    def _chave(self, familia, tamanho, dpr):
+        return (str(familia.get("numero")), familia.get("foto") or "", tamanho.width(), tamanho.height(), float(dpr))
+
+    def candidatas(self, prefixo):
+        """Até `limite` famílias pendentes com foto cujo número começa com
+        `prefixo`; o número exato primeiro. Usa o índice ordenado de números
+        pendentes do DataManager, sem percorrer as famílias."""
+        com_foto = (f for f in self.data_manager.pendentes_com_prefixo(prefixo) if f.get("foto"))
+        return list(itertools.islice(com_foto, self.limite))
+
+    def prefetch(self, prefixo, tamanho, dpr=1.0):
+        tamanho = QSize(tamanho)
+        candidatas = [(f, self._chave(f, tamanho, dpr)) for f in self.candidatas(prefixo)]
+        self._desejadas = {chave for _, chave in candidatas}
+        for familia, chave in candidatas:
+            if chave in self._prontas:
+                self._prontas.move_to_end(chave)
+                continue
+            if chave in self._agendadas:
+                continue
+            self._agendadas.add(chave)
+            self._executor.submit(self._decodificar, dict(familia), chave, tamanho, dpr)
+
+    def _decodificar(self, familia, chave, tamanho, dpr):
+        path, mtime_ns, img = None, None, None
+        try:
+            # Prefixo mudou antes da vez desta foto: não decodifica
+            if chave in self._desejadas:
+                path = self.data_manager.photo_for(familia, tamanho, dpr)
+                if path and os.path.exists(path):
+                    mtime_ns = os.stat(path).st_mtime_ns
+                    fisico = QSize(max(1, int(tamanho.width() * dpr)), max(1, int(tamanho.height() * dpr)))
+                    img = decodificar_para(path, fisico)
+        except Exception as e:
+            logging.warning(f"Falha no prefetch da foto {familia.get('foto')}: {str(e)}")
+        self._decodificada.emit((chave, path, mtime_ns, img))
+
+    def _guardar(self, resultado):
+        chave, path, mtime_ns, img = resultado
+        self._agendadas.discard(chave)
+        if img is None:
+            return
+        # QPixmap só pode ser criado no thread da interface
+        pixmap = QPixmap.fromImage(img)
+        pixmap.setDevicePixelRatio(chave[4])
+        self.cache.inserir(path, QSize(chave[2], chave[3]), pixmap, mtime_ns)
+        self._prontas[chave] = path
+        self._prontas.move_to_end(chave)
+        while len(self._prontas) > self.limite:
+            antiga = next((k for k in self._prontas if k not in self._desejadas), next(iter(self._prontas)))
+            del self._prontas[antiga]
+        self.pronta.emit(chave[0])
+
+    def obter(self, familia, tamanho, dpr=1.0):
+        tamanho = QSize(tamanho)
+        path = self._prontas.get(self._chave(familia, tamanho, dpr))
+        if path is None or not self.cache.contem(path, tamanho, dpr):
+            return None
+        return self.cache.obter(path, tamanho, dpr)
+
+    def limpar(self):
+        self._desejadas = set()
+        self._prontas.clear()
+
+    def encerrar(self, aguardar=False):
+        self.limpar()
+        self._executor.shutdown(wait=aguardar)
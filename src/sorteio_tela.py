@@ -2,12 +2,14 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLineEdit, QLabel, QSpacerItem,
     QSizePolicy
 )
-from PySide6.QtGui import QPixmap, QGuiApplication, QFont, QMovie
+from PySide6.QtGui import QGuiApplication, QFont, QMovie
 from PySide6.QtCore import Qt, Signal, QTimer, QSize
 import os
 import sys
 
 from .data_manager import DataManager
+from .cache_imagens import CachePixmaps
+from .prefetch_fotos import PrefetchFotos
 from .widgets import TitleLabel
 from .styles import AppStyles
 
@@ -36,9 +38,18 @@ class ResponsiveImage(QLabel):
         if not self._original:
             self.clear()
             return
+        # Comparação em pixels lógicos; a reamostragem, em pixels físicos
+        dpr = self._original.devicePixelRatio()
         w = max(1, int(self.width() * self._scale_ratio))
         h = max(1, int(self.height() * self._scale_ratio))
-        scaled = self._original.scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        logico = self._original.deviceIndependentSize().toSize()
+        alvo = logico.scaled(w, h, Qt.KeepAspectRatio)
+        if abs(alvo.width() - logico.width()) <= 2 and abs(alvo.height() - logico.height()) <= 2:
+            # Foto já pré-escalada para este tamanho (prefetch): nada a reamostrar
+            self.setPixmap(self._original)
+            return
+        scaled = self._original.scaled(int(w * dpr), int(h * dpr), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        scaled.setDevicePixelRatio(dpr)
         self.setPixmap(scaled)
 
     def set_scale_ratio(self, ratio: float):
@@ -60,6 +71,7 @@ class JanelaSorteio(QWidget):
         self.setWindowFlags(Qt.FramelessWindowHint)
         
         self.data_manager = DataManager()
+        self._prefetch = PrefetchFotos(self.data_manager, parent=self)
         self._numero_param = numero
         self.init_ui()
 
@@ -169,13 +181,13 @@ class JanelaSorteio(QWidget):
             self.numero_ultima.hide()
             return
 
-        familias = self.data_manager.carregar_familias()
-        familia = next((f for f in familias if str(f.get("numero")) == str(numero)), None)
+        familia = self.data_manager.get_by_numero(numero)
         if familia:
-            foto_path = familia.get("foto", "")
-            foto_path = self.obter_caminho_arquivo(foto_path)
-            if os.path.exists(foto_path):
-                pixmap = QPixmap(foto_path)
+            screen = self.screen() or QGuiApplication.primaryScreen()
+            pixmap = CachePixmaps.compartilhado().obter(
+                self._foto_para_tela(familia), screen.size(), screen.devicePixelRatio()
+            )
+            if pixmap is not None:
                 self.imagem_ultima.set_pixmap(pixmap)
                 QTimer.singleShot(0, self.imagem_ultima._update_scaled)
             self.nome_ultima.setText(familia.get("nome", "Família Sem Nome"))
@@ -189,15 +201,34 @@ class JanelaSorteio(QWidget):
 
     def mostrar_familia_por_numero(self, numero):
         self.mensagem_label.hide()
-        familias = self.data_manager.carregar_familias()
-        familia = next((f for f in familias if str(f.get("numero")) == str(numero)), None)
+        familia = self.data_manager.get_by_numero(numero)
         if not familia:
             self.exibir_mensagem(f"Família número {numero} não existe.")
             return
         if familia.get("sorteado"):
             self.exibir_mensagem(f"A família número {numero} já foi sorteada.")
             return
-        QTimer.singleShot(100, lambda: self.realizar_sorteio(familia))
+        self.realizar_sorteio(familia)
+
+    def _tamanho_apresentacao(self):
+        # Área que a foto atual ocupa quando revelada: a janela inteira, na escala do ResponsiveImage
+        ratio = self.imagem_label._scale_ratio
+        return QSize(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+
+    def _dpr(self):
+        return (self.screen() or QGuiApplication.primaryScreen()).devicePixelRatio()
+
+    def prefetch_numero(self, prefixo):
+        """Decodifica em segundo plano as fotos que casam com o número sendo digitado."""
+        self._prefetch.prefetch(prefixo, self._tamanho_apresentacao(), self._dpr())
+
+    def _pixmap_apresentacao(self, familia):
+        tamanho = self._tamanho_apresentacao()
+        dpr = self._dpr()
+        pixmap = self._prefetch.obter(familia, tamanho, dpr)
+        if pixmap is not None:
+            return pixmap
+        return CachePixmaps.compartilhado().obter(self._foto_para_tela(familia), tamanho, dpr)
 
     def realizar_sorteio(self, familia):
         self.imagem_ultima.hide()
@@ -209,10 +240,8 @@ class JanelaSorteio(QWidget):
         self.imagem_ultima.clear()
         self.imagem_ultima.setVisible(False)
 
-        foto_path = familia.get("foto", "")
-        foto_path = self.obter_caminho_arquivo(foto_path)
-        if os.path.exists(foto_path):
-            pixmap = QPixmap(foto_path)
+        pixmap = self._pixmap_apresentacao(familia)
+        if pixmap is not None:
             self.imagem_label.set_pixmap(pixmap)
             self.imagem_label.show()
             self.layout.setStretch(4, 1)
@@ -249,6 +278,10 @@ class JanelaSorteio(QWidget):
         if hasattr(self, 'numero_ultima') and self.numero_ultima.isVisible():
             self._position_overlay_bottom_right(self.numero_ultima, self.imagem_ultima, margin=16)
 
+    def closeEvent(self, event):
+        self._prefetch.encerrar()
+        super().closeEvent(event)
+
     def move_to_second_screen(self):
         screens = QGuiApplication.screens()
         if len(screens) > 1:
@@ -256,6 +289,11 @@ class JanelaSorteio(QWidget):
             geom = second.geometry()
             self.move(geom.left(), geom.top())
 
+    def _foto_para_tela(self, familia):
+        # A foto ocupa no máximo a tela em que a janela está; decodifica só a variante necessária
+        screen = self.screen() or QGuiApplication.primaryScreen()
+        return self.data_manager.photo_for(familia, screen.size(), screen.devicePixelRatio())
+
     def obter_caminho_arquivo(self, caminho):
         dm = DataManager()
         return dm._resolve_photo_abs(caminho) if caminho else ""
@@ -0,0 +1,49 @@
+import logging
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from src.backup import TrabalhoBackup
+
+
+class TarefaBackup(QObject):
+    """Backup manual em uma thread de fundo, com progresso e cancelamento.
+
+    `progresso(arquivos_feitos, arquivos_total, bytes_feitos, bytes_total)` e
+    `concluido(ok, cancelado)` chegam no thread da interface.
+    """
+
+    progresso = Signal(int, int, object, object)
+    concluido = Signal(bool, bool)
+    _finalizado = Signal(bool)
+
+    def __init__(self, data_manager, versao, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.versao = versao
+        self.trabalho = TrabalhoBackup()
+        self.ativo = False
+        self._thread = None
+        self._finalizado.connect(self._concluir)
+
+    def iniciar(self):
+        if self.ativo:
+            return
+        self.ativo = True
+        self._thread = threading.Thread(target=self._executar, name="backup", daemon=True)
+        self._thread.start()
+
+    def cancelar(self):
+        self.trabalho.cancelar()
+
+    def _executar(self):
+        try:
+            ok = self.data_manager.criar_backup_manual(self.versao, self.progresso.emit, self.trabalho)
+        except Exception as e:
+            logging.error(f"Erro no backup em segundo plano: {str(e)}")
+            ok = False
+        self._finalizado.emit(ok)
+
+    def _concluir(self, ok):
+        self.ativo = False
+        self.concluido.emit(ok, self.trabalho.cancelado)
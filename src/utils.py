@@ -1,9 +1,7 @@
 from src.data_manager import DataManager
 
-_dm = DataManager()
-
 def carregar_familias():
-    return _dm.carregar_familias()
+    return DataManager().carregar_familias()
 
 def salvar_familias(familias):
-    _dm.salvar_familias(familias)
+    DataManager().salvar_familias(familias)
@@ -5,6 +5,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal, QSize, QTimer, QPropertyAnimation, QEasingCurve, Property, QPoint
 from PySide6.QtGui import QFont, QPixmap, QMovie, QColor
 import os
+from .cache_imagens import CachePixmaps
+from .data_manager import DataManager
 from .styles import AppStyles
 import sys
 
@@ -201,32 +203,27 @@ class FamilyCard(BaseCard):
     edit_clicked = Signal(dict)
     delete_clicked = Signal(dict)
     image_clicked = Signal(str)
+    TAMANHO_FOTO = 120
     
     def __init__(self, familia, parent=None):
         super().__init__(parent)
         self.familia = familia
         self._loaded = False
-        self._abs_image = None
         self._thumb_abs = None
         self._img_container = None
         self._setup_ui()
     
     def _setup_ui(self):
         img_container = ImageContainer(self)
-        relativo = self.familia.get("foto", "")
-        self._abs_image = os.path.join(BASE_PATH, relativo) if relativo and not os.path.isabs(relativo) else relativo
-        self._thumb_abs = self._compute_thumb_abs(relativo)
-        if self._thumb_abs and os.path.exists(self._thumb_abs):
-            pixmap = QPixmap(self._thumb_abs).scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self._thumb_abs = DataManager().photo_for(self.familia, self.TAMANHO_FOTO, self.devicePixelRatioF())
+        pixmap = self._carregar_pixmap(self._thumb_abs)
+        if pixmap is not None:
             img_container.set_image(pixmap)
             self._loaded = True
-        elif self._abs_image and os.path.exists(self._abs_image):
-            pixmap = QPixmap(self._abs_image).scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            img_container.set_image(pixmap)
         else:
             img_container.clear()
 
-        img_container.image_label.mousePressEvent = lambda event: self._on_image_clicked(self._abs_image or self._thumb_abs)
+        img_container.image_label.mousePressEvent = lambda event: self._on_image_clicked()
         self.layout.addWidget(img_container)
         self._img_container = img_container
         
@@ -271,19 +268,18 @@ class FamilyCard(BaseCard):
         botoes_container.setLayout(botoes_layout)
         self.layout.addWidget(botoes_container, alignment=Qt.AlignCenter)
 
-    def _on_image_clicked(self, caminho_imagem):
-        if os.path.exists(caminho_imagem):
+    def _carregar_pixmap(self, path):
+        if not path:
+            return None
+        tamanho = QSize(self.TAMANHO_FOTO, self.TAMANHO_FOTO)
+        return CachePixmaps.compartilhado().obter(path, tamanho, self.devicePixelRatioF())
+
+    def _on_image_clicked(self):
+        caminho_imagem = FullscreenImageViewer.foto_para_tela(self.familia, widget=self)
+        if caminho_imagem and os.path.exists(caminho_imagem):
             viewer = FullscreenImageViewer(caminho_imagem, self)
             viewer.exec_()
 
-    def _compute_thumb_abs(self, rel):
-        if not rel:
-            return None
-        base = os.path.basename(rel)
-        name, _ = os.path.splitext(base)
-        thumb_rel = os.path.join("imagens", "thumbs", f"{name}_thumb.jpg")
-        return os.path.join(BASE_PATH, thumb_rel)
-
     def ensure_image_loaded(self, viewport_top_y, viewport_bottom_y):
         if self._loaded:
             return
@@ -294,13 +290,31 @@ class FamilyCard(BaseCard):
         y_bottom = y_top + self.height()
         if y_bottom < viewport_top_y or y_top > viewport_bottom_y:
             return
-        path = self._thumb_abs if self._thumb_abs and os.path.exists(self._thumb_abs) else self._abs_image
-        if path and os.path.exists(path):
-            pixmap = QPixmap(path).scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pixmap = self._carregar_pixmap(self._thumb_abs)
+        if pixmap is not None:
             self._img_container.set_image(pixmap)
             self._loaded = True
 
 class FullscreenImageViewer(QDialog):
+    @staticmethod
+    def area_foto(widget=None):
+        """Área usada pelos visualizadores: 80% da tela."""
+        screen = (widget.screen() if widget is not None else None) or QApplication.primaryScreen()
+        geometria = screen.geometry()
+        return QSize(int(geometria.width() * 0.8), int(geometria.height() * 0.8)), screen.devicePixelRatio()
+
+    @staticmethod
+    def foto_para_tela(familia, data_manager=None, widget=None):
+        """Menor variante da foto que cobre a área dos visualizadores."""
+        area, dpr = FullscreenImageViewer.area_foto(widget)
+        return (data_manager or DataManager()).photo_for(familia, area, dpr)
+
+    @staticmethod
+    def pixmap_para_tela(path, widget=None):
+        """QPixmap de `path` já reduzido para a área dos visualizadores, na densidade da tela, via cache compartilhado."""
+        area, dpr = FullscreenImageViewer.area_foto(widget)
+        return CachePixmaps.compartilhado().obter(path, area, dpr)
+
     def __init__(self, image_path, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -328,7 +342,7 @@ class FullscreenImageViewer(QDialog):
             }
         """)
 
-        self.original_pixmap = QPixmap(image_path)
+        self.original_pixmap = self.pixmap_para_tela(image_path, parent) or QPixmap(image_path)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -376,8 +390,10 @@ class FullscreenImageViewer(QDialog):
         max_width = int(screen_width * 0.8)
         max_height = int(screen_height * 0.8)
 
-        orig_width = self.original_pixmap.width()
-        orig_height = self.original_pixmap.height()
+        # Tamanho lógico para o layout; a reamostragem mantém a densidade do pixmap
+        dpr = self.original_pixmap.devicePixelRatio()
+        orig_width = self.original_pixmap.deviceIndependentSize().width()
+        orig_height = self.original_pixmap.deviceIndependentSize().height()
 
         width_ratio = max_width / orig_width
         height_ratio = max_height / orig_height
@@ -387,10 +403,11 @@ class FullscreenImageViewer(QDialog):
         new_height = int(orig_height * scale_factor)
 
         scaled_pixmap = self.original_pixmap.scaled(
-            new_width, new_height,
+            int(new_width * dpr), int(new_height * dpr),
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation
         )
+        scaled_pixmap.setDevicePixelRatio(dpr)
         self.photo_label.setPixmap(scaled_pixmap)
         self.photo_container.setFixedSize(new_width + 20, new_height + 20)
 
@@ -583,8 +600,10 @@ class PhotoViewer(QDialog):
         max_width = int(screen_width * 0.8)
         max_height = int(screen_height * 0.8)
 
-        orig_width = self.original_pixmap.width()
-        orig_height = self.original_pixmap.height()
+        # Tamanho lógico para o layout; a reamostragem mantém a densidade do pixmap
+        dpr = self.original_pixmap.devicePixelRatio()
+        orig_width = self.original_pixmap.deviceIndependentSize().width()
+        orig_height = self.original_pixmap.deviceIndependentSize().height()
 
         width_ratio = max_width / orig_width
         height_ratio = max_height / orig_height
@@ -594,10 +613,11 @@ class PhotoViewer(QDialog):
         new_height = int(orig_height * scale_factor)
 
         scaled_pixmap = self.original_pixmap.scaled(
-            new_width, new_height,
+            int(new_width * dpr), int(new_height * dpr),
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation
         )
+        scaled_pixmap.setDevicePixelRatio(dpr)
         self.photo_label.setPixmap(scaled_pixmap)
 
         self.photo_container.setFixedSize(new_width + 20, new_height + 20)
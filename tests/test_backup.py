@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from PySide6.QtGui import QImage
+from src.backup import BackupCancelado, TrabalhoBackup
+from src.data_manager import DataManager
+
+class TestBackupIncremental(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        for i in range(3):
+            path = os.path.join(self.tmp, f'src_{i}.png')
+            img = QImage(400, 300, QImage.Format_RGB32)
+            img.fill(0xFF000000 + i)
+            img.save(path, 'PNG')
+            self.assertTrue(self.dm.adicionar_familia(f'Fam {i}', path))
+            os.remove(path)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _objetos(self):
+        repo = self.dm._repositorio_backup()
+        return sum(len(fs) for _, _, fs in os.walk(repo.objetos_dir))
+
+    def test_backup_reaproveita_objetos(self):
+        # Ciclo já em andamento: o primeiro sorteio do ciclo grava também o ciclo e a auditoria
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        primeiro = self._objetos()
+        self.assertGreaterEqual(primeiro, 7)  # 3 fotos, 3 miniaturas e os dados
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        self.assertEqual(self._objetos(), primeiro)
+        self.dm.alterar_status_familia(2, True)
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        self.assertLessEqual(self._objetos() - primeiro, 2)
+        self.assertEqual(len(self.dm.listar_backups()), 3)
+
+    def test_compressao_por_extensao_e_progresso(self):
+        eventos = []
+        self.assertTrue(self.dm.criar_backup_manual("1.0", lambda *args: eventos.append(args)))
+        repo = self.dm._repositorio_backup()
+        manifesto = repo.ler_manifesto(self.dm.listar_backups()[0])
+        for entrada in manifesto["arquivos"]:
+            objeto = repo._objeto_existente(entrada["sha256"])
+            comprimido = os.path.splitext(entrada["caminho"])[1] in (".json", ".journal")
+            self.assertEqual(objeto.endswith(".z"), comprimido, entrada["caminho"])
+        feitos, total, bytes_feitos, bytes_total = eventos[-1]
+        self.assertEqual(feitos, total)
+        self.assertEqual(bytes_feitos, bytes_total)
+        self.assertEqual(bytes_total, sum(a["tamanho"] for a in manifesto["arquivos"]))
+
+    def test_backup_cancelado_nao_grava_manifesto(self):
+        trabalho = TrabalhoBackup()
+        repo = self.dm._repositorio_backup()
+        with self.assertRaises(BackupCancelado):
+            repo.criar("cancelado", ao_progresso=lambda *args: trabalho.cancelar(), trabalho=trabalho)
+        self.assertEqual(trabalho.arquivos_feitos, 1)
+        self.assertEqual(self.dm.listar_backups(), [])
+        trabalho = TrabalhoBackup()
+        trabalho.cancelar()
+        self.assertFalse(self.dm.criar_backup_manual("1.0", trabalho=trabalho))
+
+    def test_restaurar_snapshot(self):
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        nome = self.dm.listar_backups()[0]
+        self.dm.alterar_status_familia(1, True)
+        self.dm.excluir_familia(3)
+        self.assertTrue(self.dm.restaurar_backup(nome))
+        familias = self.dm.carregar_familias()
+        self.assertEqual([f["nome"] for f in familias], ["Fam 0", "Fam 1", "Fam 2"])
+        self.assertFalse(any(f["sorteado"] for f in familias))
+        for f in familias:
+            self.assertTrue(os.path.exists(os.path.join(self.tmp, f["foto"])))
+        # O estado anterior à restauração também fica guardado
+        self.assertTrue(any(n.startswith("antes_de_restaurar_") for n in self.dm.listar_backups()))
+    def _conteudo_dados(self):
+        conteudo = {}
+        for dirpath, _, filenames in os.walk(os.path.join(self.tmp, "dados")):
+            for fn in filenames:
+                with open(os.path.join(dirpath, fn), "rb") as f:
+                    conteudo[os.path.relpath(os.path.join(dirpath, fn), self.tmp)] = f.read()
+        return conteudo
+
+    def test_restaurar_com_objeto_ausente_nao_altera_dados(self):
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        nome = self.dm.listar_backups()[0]
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        repo = self.dm._repositorio_backup()
+        entrada = next(a for a in repo.ler_manifesto(nome)["arquivos"] if a["caminho"] == "dados/familias.journal")
+        os.remove(repo._objeto_existente(entrada["sha256"]))
+        antes = self._conteudo_dados()
+        self.assertFalse(self.dm.restaurar_backup(nome))
+        self.assertEqual(self._conteudo_dados(), antes)
+        # Backend reaberto e cache conferindo com o disco
+        self.assertTrue(self.dm.get_by_numero(1)["sorteado"])
+        self.assertTrue(self.dm.alterar_status_familia(2, True))
+        DataManager.descartar(self.tmp)
+        relido = DataManager(base_path_override=self.tmp)
+        self.assertEqual([f["numero"] for f in relido.familias_sorteadas()], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
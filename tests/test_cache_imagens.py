@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+from src.cache_imagens import CachePixmaps
+
+app = QApplication.instance() or QApplication([])
+
+class TestCachePixmaps(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.fotos = []
+        for i in range(3):
+            path = os.path.join(self.tmp, f'foto_{i}.png')
+            img = QImage(800, 600, QImage.Format_RGB32)
+            img.fill(0xFF000000 + i)
+            img.save(path, 'PNG')
+            self.fotos.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_acerto_sem_nova_decodificacao(self):
+        cache = CachePixmaps()
+        primeiro = cache.obter(self.fotos[0], QSize(120, 120))
+        self.assertEqual((primeiro.width(), primeiro.height()), (120, 90))
+        segundo = cache.obter(self.fotos[0], QSize(120, 120))
+        self.assertEqual(primeiro.cacheKey(), segundo.cacheKey())
+        self.assertEqual((cache.acertos, cache.falhas), (1, 1))
+        # Outro tamanho é outra entrada
+        cache.obter(self.fotos[0], QSize(400, 400))
+        self.assertEqual(cache.estatisticas()["itens"], 2)
+        self.assertIsNone(cache.obter(os.path.join(self.tmp, 'nao_existe.png'), QSize(10, 10)))
+
+    def test_densidade_da_tela_faz_parte_da_chave(self):
+        cache = CachePixmaps()
+        hidpi = cache.obter(self.fotos[0], QSize(120, 120), 2.0)
+        self.assertEqual((hidpi.width(), hidpi.height()), (240, 180))
+        self.assertEqual(hidpi.devicePixelRatio(), 2.0)
+        self.assertEqual(hidpi.deviceIndependentSize().toSize(), QSize(120, 90))
+        # Mesmos pixels físicos em densidade 1 não reaproveitam a entrada HiDPI
+        comum = cache.obter(self.fotos[0], QSize(240, 240))
+        self.assertEqual(comum.devicePixelRatio(), 1.0)
+        self.assertEqual(cache.estatisticas()["itens"], 2)
+        self.assertTrue(cache.contem(self.fotos[0], QSize(120, 120), 2.0))
+        self.assertFalse(cache.contem(self.fotos[0], QSize(120, 120)))
+
+    def test_arquivo_alterado_nao_e_servido_do_cache(self):
+        cache = CachePixmaps()
+        cache.obter(self.fotos[1], QSize(120, 120))
+        img = QImage(300, 900, QImage.Format_RGB32)
+        img.fill(0xFFAA0000)
+        img.save(self.fotos[1], 'PNG')
+        st = os.stat(self.fotos[1])
+        os.utime(self.fotos[1], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        pixmap = cache.obter(self.fotos[1], QSize(120, 120))
+        self.assertEqual((pixmap.width(), pixmap.height()), (40, 120))
+        self.assertEqual(cache.falhas, 2)
+
+    def test_orcamento_despeja_menos_usados(self):
+        cache = CachePixmaps(orcamento_bytes=2 * 400 * 300 * 4)
+        cache.obter(self.fotos[0], QSize(400, 400))
+        cache.obter(self.fotos[1], QSize(400, 400))
+        cache.obter(self.fotos[0], QSize(400, 400))
+        cache.obter(self.fotos[2], QSize(400, 400))
+        self.assertLessEqual(cache.bytes_usados, cache.orcamento_bytes)
+        self.assertTrue(cache.contem(self.fotos[0], QSize(400, 400)))
+        self.assertFalse(cache.contem(self.fotos[1], QSize(400, 400)))
+        cache.definir_orcamento(0)
+        self.assertEqual(cache.estatisticas()["itens"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 import tempfile
@@ -6,18 +7,14 @@ from src.data_manager import DataManager
 
 class TestDataValidation(unittest.TestCase):
     def setUp(self):
-        DataManager._instance = None
-        DataManager._familias_cache = None
-        DataManager._ultimo_sorteio_cache = None
+        DataManager.descartar_todas()
         self.tmp = tempfile.mkdtemp()
         self.dm = DataManager(base_path_override=self.tmp)
         os.makedirs(os.path.join(self.tmp, 'dados'), exist_ok=True)
         os.makedirs(os.path.join(self.tmp, 'imagens', 'familias'), exist_ok=True)
 
     def tearDown(self):
-        DataManager._instance = None
-        DataManager._familias_cache = None
-        DataManager._ultimo_sorteio_cache = None
+        DataManager.descartar_todas()
         shutil.rmtree(self.tmp, ignore_errors=True)
 
     def write_familias(self, data):
@@ -37,7 +34,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 2, "numero": 2, "nome": "  Família B  ", "foto": os.path.join(self.tmp, 'imagens', 'familias', 'b.png'), "sorteado": True, "data_sorteio": "12/12/2024"},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         ok = self.dm.verificar_integridade_dados()
         self.assertTrue(ok)
@@ -53,7 +49,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 3, "numero": 3, "nome": "OK", "foto": "imagens/familias/z.gif"},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         self.dm.verificar_integridade_dados()
         res = self.dm.carregar_familias(force_reload=True)
@@ -63,12 +58,10 @@ class TestDataValidation(unittest.TestCase):
 
     def test_sorteio_integrity(self):
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump([
                 {"id": 1, "numero": 1, "nome": "A", "foto": "imagens/familias/a.jpg"}
             ], f)
         with open(self.dm.sorteio_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump({"ultimo_sorteado": "x"}, f)
         self.dm.verificar_integridade_dados()
         ok = self.dm.verificar_integridade_sorteio()
@@ -81,7 +74,6 @@ class TestDataValidation(unittest.TestCase):
             f.write(b'\x00')
         familias = [{"id": 1, "numero": 1, "nome": "A", "foto": "imagens/familias/a.jpg"}]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         self.dm.excluir_familia(1)
         self.assertFalse(os.path.exists(foto_path))
@@ -93,7 +85,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 3, "numero": 3, "nome": "C", "foto": ""},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         ok = self.dm.excluir_familia(1)
         self.assertTrue(ok)
@@ -109,7 +100,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 4, "numero": 4, "nome": "D", "foto": ""},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         ok = self.dm.excluir_familia(3)
         self.assertTrue(ok)
@@ -124,7 +114,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 3, "numero": 3, "nome": "C", "foto": ""},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         ok = self.dm.excluir_familia(3)
         self.assertTrue(ok)
@@ -138,7 +127,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 2, "numero": 2, "nome": "B", "foto": ""},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         ok = self.dm.excluir_familia(99)
         self.assertFalse(ok)
@@ -150,7 +138,6 @@ class TestDataValidation(unittest.TestCase):
             {"id": 3, "numero": 3, "nome": "C", "foto": "", "sorteado": True, "data_sorteio": "02/01/2026"},
         ]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         self.dm.salvar_sorteio(3)
         ok = self.dm.excluir_familia(1)
@@ -164,7 +151,6 @@ class TestDataValidation(unittest.TestCase):
             f.write(b'\x00')
         familias = [{"id": 1, "numero": 1, "nome": "A", "foto": "imagens/familias/old.jpg"}]
         with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
-            import json
             json.dump(familias, f)
         new_path = os.path.join(self.tmp, 'imagens', 'familias', 'new.png')
         with open(new_path, 'wb') as f:
@@ -173,5 +159,121 @@ class TestDataValidation(unittest.TestCase):
         self.assertTrue(ok)
         self.assertFalse(os.path.exists(old_path))
 
+    def test_editar_familia_foto_invalida_nao_altera(self):
+        self.write_familias(json.dumps([{"id": 1, "numero": 1, "nome": "A", "foto": ""}]))
+        self.assertFalse(self.dm.editar_familia(1, "Renomeada", os.path.join(self.tmp, 'nao_existe.jpg')))
+        self.assertFalse(self.dm.editar_familia(1, "   "))
+        self.assertEqual(self.dm.get_by_numero(1)["nome"], "A")
+        self.assertEqual(self.dm.carregar_familias(force_reload=True)[0]["nome"], "A")
+
+    def test_indices_por_numero_e_id(self):
+        familias = [
+            {"id": 10, "numero": 1, "nome": "A", "foto": "", "sorteado": False},
+            {"id": 20, "numero": 2, "nome": "B", "foto": "", "sorteado": True, "data_sorteio": "01/01/2026"},
+        ]
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        self.dm.carregar_familias(force_reload=True)
+        self.assertEqual(self.dm.get_by_numero("2")["nome"], "B")
+        self.assertEqual(self.dm.get_by_id(10)["nome"], "A")
+        self.assertIsNone(self.dm.get_by_numero(3))
+        self.assertEqual([f["nome"] for f in self.dm.familias_pendentes()], ["A"])
+        self.dm.alterar_status_familia(1, True)
+        self.assertEqual(len(self.dm.familias_pendentes()), 0)
+        self.assertEqual(len(self.dm.familias_sorteadas()), 2)
+
+    def test_contadores_e_ultima_sorteada(self):
+        familias = [
+            {"id": 1, "numero": 1, "nome": "A", "foto": "", "sorteado": False},
+            {"id": 2, "numero": 2, "nome": "B", "foto": "", "sorteado": True, "data_sorteio": "03/01/2026"},
+            {"id": 3, "numero": 3, "nome": "C", "foto": "", "sorteado": True, "data_sorteio": "02/01/2026"},
+        ]
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        self.dm.carregar_familias(force_reload=True)
+        self.assertEqual((self.dm.total_familias, self.dm.total_sorteadas, self.dm.total_pendentes), (3, 2, 1))
+        self.assertFalse(self.dm.todas_sorteadas)
+        self.assertEqual(self.dm.ultima_sorteada["numero"], 2)
+        self.assertEqual(self.dm.contar_familias("nao_sorteadas"), 1)
+        self.assertTrue(self.dm.alterar_status_familia(2, False))
+        self.assertEqual(self.dm.ultima_sorteada["numero"], 3)
+        self.assertEqual(int(self.dm.carregar_ultimo_sorteio()), 3)
+        # A última sorteada sai do índice sem reconstruir o store
+        store = self.dm._garantir_store()
+        familia = self.dm.get_by_numero(3)
+        familia["sorteado"] = False
+        store.atualizar(familia)
+        self.assertIsNone(store.ultima_sorteada())
+        self.assertEqual((store.total_sorteadas, store.total_pendentes), (0, 3))
+        for numero in (1, 2, 3):
+            familia = self.dm.get_by_numero(numero)
+            familia["sorteado"] = True
+            store.atualizar(familia)
+        self.assertTrue(store.todas_sorteadas)
+
+    def test_indices_apos_exclusao_renumeram(self):
+        familias = [
+            {"id": 1, "numero": 1, "nome": "A", "foto": ""},
+            {"id": 2, "numero": 2, "nome": "B", "foto": ""},
+            {"id": 3, "numero": 3, "nome": "C", "foto": ""},
+        ]
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        self.assertTrue(self.dm.excluir_familia(1))
+        self.assertEqual(self.dm.get_by_numero(1)["nome"], "B")
+        self.assertEqual(self.dm.get_by_id(3)["numero"], 2)
+        self.assertIsNone(self.dm.get_by_numero(3))
+
+    def test_force_reload_sem_mudanca_nao_rele(self):
+        familias = [{"id": 1, "numero": 1, "nome": "A", "foto": ""}]
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        primeira = self.dm.carregar_familias(force_reload=True)
+        geracao = self.dm.generation
+        self.assertIs(self.dm.carregar_familias(force_reload=True), primeira)
+        self.assertEqual(self.dm.generation, geracao)
+        self.dm.alterar_status_familia(1, True)
+        geracao = self.dm.generation
+        self.assertTrue(self.dm.carregar_familias(force_reload=True)[0]["sorteado"])
+        self.assertEqual(self.dm.generation, geracao)
+
+    def test_force_reload_detecta_alteracao_externa(self):
+        self.dm.carregar_familias(force_reload=True)
+        geracao = self.dm.generation
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump([{"id": 1, "numero": 1, "nome": "Externa", "foto": ""}], f)
+        res = self.dm.carregar_familias(force_reload=True)
+        self.assertEqual(res[0]["nome"], "Externa")
+        self.assertGreater(self.dm.generation, geracao)
+
+    def test_hash_conteudo_ignora_toque_sem_mudanca(self):
+        self.dm.verificar_hash_conteudo = True
+        try:
+            primeira = self.dm.carregar_familias(force_reload=True)
+            st = os.stat(self.dm.familias_file)
+            os.utime(self.dm.familias_file, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+            self.assertIs(self.dm.carregar_familias(force_reload=True), primeira)
+        finally:
+            self.dm.verificar_hash_conteudo = False
+
+    def test_instancia_por_pasta_de_dados(self):
+        self.write_familias(json.dumps([{"id": 1, "numero": 1, "nome": "Família A", "foto": ""}]))
+        primeira = self.dm.carregar_familias()
+        outra_pasta = tempfile.mkdtemp()
+        try:
+            outro = DataManager.para(outra_pasta)
+            self.assertIsNot(outro, self.dm)
+            self.assertIs(DataManager(), self.dm)
+            self.assertTrue(outro.salvar_familias([{"id": 1, "numero": 1, "nome": "Família B", "foto": ""}]))
+            self.assertEqual([f["nome"] for f in outro.carregar_familias()], ["Família B"])
+            # O cache da primeira pasta continua carregado
+            self.assertIs(self.dm.carregar_familias(), primeira)
+            self.assertIs(DataManager(base_path_override=outra_pasta), outro)
+            self.assertIs(DataManager(), outro)
+            self.assertIs(DataManager(base_path_override=self.tmp + os.sep), self.dm)
+        finally:
+            DataManager.descartar(outra_pasta)
+            shutil.rmtree(outra_pasta, ignore_errors=True)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from PySide6.QtWidgets import QApplication
+from src.data_manager import DataManager
+from src.estatisticas_dialog import JanelaEstatisticas
+from src.estatisticas_sorteio import EstatisticasSorteio
+from src.journal import FamiliasJournal
+
+app = QApplication.instance() or QApplication([])
+
+
+class TestEstatisticasSorteio(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.assertTrue(self.dm.adicionar_familias([(f"Família {i}", "") for i in range(1, 9)]))
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_agregados_incrementais_conferem_com_historico(self):
+        mes = datetime.now().strftime("%Y-%m")
+        automatica = self.dm.sortear_proxima()
+        a, b = [n for n in range(1, 9) if n != automatica["numero"]][:2]
+        self.assertTrue(self.dm.alterar_status_familia(a, True))
+        self.assertTrue(self.dm.alterar_status_familia(b, True))
+        self.assertTrue(self.dm.alterar_status_familia(b, False))
+        resumo = self.dm.estatisticas()
+        self.assertEqual(resumo["por_mes"], {mes: 2})
+        self.assertEqual((resumo["sorteadas"], resumo["total"], resumo["taxa_conclusao"]), (2, 8, 0.25))
+        self.assertEqual(resumo["espera_media"], 0)
+        self.assertTrue(self.dm.conferir_estatisticas())
+
+        self.assertTrue(self.dm.resetar_sorteio())
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        self.assertTrue(self.dm.excluir_familia(2))
+        resumo = self.dm.estatisticas(limite_espera=3)
+        self.assertEqual(resumo["ciclos_encerrados"], 1)
+        self.assertEqual(resumo["por_mes"], {mes: 3})
+        # Quem nunca foi sorteada vem antes de quem já foi
+        esperando = resumo["mais_esperando"]
+        self.assertEqual(len(esperando), 3)
+        self.assertEqual([u for _, u in esperando], [None, None, None])
+        self.assertTrue(self.dm.conferir_estatisticas())
+
+        # Outra sessão lê os agregados gravados, sem reconstruir
+        relidas = EstatisticasSorteio(os.path.join(self.tmp, "dados"))
+        self.assertTrue(relidas.carregar())
+        self.assertEqual(relidas.estado(), self.dm.reconstruir_estatisticas().estado())
+
+        janela = JanelaEstatisticas(resumo)
+        self.assertEqual(janela.grade_meses.rowCount(), 1)
+        self.assertEqual(janela.lista_espera.count(), 3)
+        janela.deleteLater()
+
+    def test_sorteios_manuais_e_reinicio(self):
+        for numero in (1, 2, 3):
+            self.assertTrue(self.dm.alterar_status_familia(numero, True))
+        inicio = self.dm._garantir_motor().criado_em
+        self.assertIsNotNone(inicio)
+        self.assertTrue(self.dm.resetar_sorteio())
+        entradas = self.dm.historico().entradas()
+        self.assertEqual(len(entradas), 3)
+        for entrada in entradas:
+            self.assertEqual(entrada["inicio_ciclo"], inicio)
+            self.assertLessEqual(entrada["inicio_ciclo"][:10], entrada["data"][:10])
+        self.assertEqual(self.dm.estatisticas()["espera_media"], 0)
+        self.assertTrue(self.dm.conferir_estatisticas())
+
+    def test_ciclo_sem_motor_comeca_no_sorteio_mais_antigo(self):
+        # Base de uma versão anterior: famílias já sorteadas e nenhum ciclo gravado
+        familias = [dict(f) for f in self.dm.carregar_familias()]
+        familias[0].update(sorteado=True, data_sorteio="01/09/2026")
+        familias[1].update(sorteado=True, data_sorteio="11/09/2026")
+        self.assertTrue(self.dm.salvar_familias(familias))
+        self.assertTrue(self.dm.resetar_sorteio())
+        self.assertEqual({e["inicio_ciclo"] for e in self.dm.historico().entradas()}, {"2026-09-01"})
+        self.assertEqual(self.dm.estatisticas()["espera_media"], 5)
+        self.assertTrue(self.dm.conferir_estatisticas())
+
+    def test_agregados_acompanham_alteracao_externa(self):
+        mes = datetime.now().strftime("%Y-%m")
+        for numero in (1, 2):
+            self.assertTrue(self.dm.alterar_status_familia(numero, True))
+        self.assertEqual(self.dm.estatisticas()["por_mes"], {mes: 2})
+        # Mesmo caminho de scripts/mark_all_sorted.py, em outro processo
+        journal = FamiliasJournal(self.dm.familias_file, self.dm.journal_file)
+        familias = journal.carregar()
+        for familia in familias:
+            if not familia.get("sorteado"):
+                familia.update(sorteado=True, data_sorteio="01/10/2026")
+        journal.compactar(familias)
+        self.assertTrue(self.dm.recarregar_se_alterado())
+        resumo = self.dm.estatisticas()
+        self.assertEqual(self.dm.total_sorteadas, 8)
+        self.assertEqual(sum(resumo["por_mes"].values()), 8)
+        self.assertEqual(resumo["por_mes"].get("2026-10"), 8 if mes == "2026-10" else 6)
+        self.assertTrue(self.dm.conferir_estatisticas())
+
+    def test_agregados_acompanham_backup_restaurado(self):
+        mes = datetime.now().strftime("%Y-%m")
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        self.assertTrue(self.dm.criar_backup_manual("1.0"))
+        nome = self.dm.listar_backups()[-1]
+        self.assertTrue(self.dm.adicionar_familias([("Nova Família", "")]))
+        self.assertEqual(len(self.dm.indice_busca().chaves("nova")), 1)
+        for numero in (2, 3):
+            self.assertTrue(self.dm.alterar_status_familia(numero, True))
+        self.assertEqual(self.dm.estatisticas()["por_mes"], {mes: 3})
+        self.assertTrue(self.dm.restaurar_backup(nome))
+        self.assertEqual(self.dm.total_sorteadas, 1)
+        self.assertEqual(self.dm.estatisticas()["por_mes"], {mes: 1})
+        self.assertTrue(self.dm.conferir_estatisticas())
+        self.assertEqual(len(self.dm.indice_busca()), 8)
+        self.assertEqual(self.dm.indice_busca().chaves("nova"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
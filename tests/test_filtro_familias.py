@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.familia_store import chave_familia
+from src.filtro_familias import IndiceBusca, buscar, corresponde, tokens_busca
+
+
+class TestIndiceBusca(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        nomes = ["João Silva", "Maria Conceição", "José da Silva", "Ana-Júlia Souza", "Família Ávila"]
+        self.assertTrue(self.dm.adicionar_familias([(f"{nomes[i % 5]} {i}", "") for i in range(1, 301)]))
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_mesmo_resultado_da_busca_linear(self):
+        familias = self.dm.carregar_familias()
+        indice = self.dm.indice_busca()
+        for termo in ["", "silva", "SILV jo", "conceicao 1", "ávila 29", "ju sou", "12", "ia", "xyz", "  "]:
+            tokens = tokens_busca(termo)
+            esperado = [f for f in familias if corresponde(f, tokens)]
+            self.assertEqual(indice.buscar(termo), esperado, termo)
+            self.assertEqual(buscar(familias, termo, indice), esperado, termo)
+        self.assertIsNone(indice.chaves(""))
+
+    def test_refinamento_incremental(self):
+        familias = self.dm.carregar_familias()
+        indice = self.dm.indice_busca()
+        for termo in ["s", "si", "silva", "silva j", "silva jo 1", "mar", "maria 2"]:
+            esperado = {chave_familia(f) for f in buscar(familias, termo)}
+            self.assertEqual(indice.chaves(termo), esperado, termo)
+        # "silva" e "maria" saíram do resultado anterior, sem consultar os sufixos
+        self.assertNotIn("silva", indice._por_token)
+        self.assertNotIn("maria", indice._por_token)
+        self.assertIn("mar", indice._por_token)
+
+    def test_busca_aproximada(self):
+        self.assertTrue(self.dm.editar_familia(10, novo_nome="Tereza Valter"))
+        self.assertTrue(self.dm.editar_familia(11, novo_nome="Terezinha Valter"))
+        indice = self.dm.indice_busca()
+        self.assertEqual(indice.chaves("Terezsa"), set())
+        numeros = {c: f["numero"] for f in self.dm.carregar_familias() for c in [chave_familia(f)]}
+        resultado = indice.semelhantes("Terezsa Valtr", limite=5)
+        self.assertEqual([numeros[c] for c, _ in resultado[:2]], [10, 11])
+        self.assertGreater(resultado[0][1], resultado[1][1])
+        # Número segue a busca exata; com texto, só restringe as candidatas
+        self.assertEqual([numeros[c] for c, _ in indice.semelhantes("29", limite=3)], [29, 129, 229])
+        self.assertEqual([numeros[c] for c, _ in indice.semelhantes("terezsa 11")], [11])
+        self.assertEqual(indice.semelhantes("qwxyz"), [])
+
+    def test_indice_por_geracao(self):
+        indice = self.dm.indice_busca()
+        self.assertIs(self.dm.indice_busca(), indice)
+        self.assertTrue(self.dm.alterar_status_familia(3, True))
+        novo = self.dm.indice_busca()
+        self.assertIsNot(novo, indice)
+        # Só o status mudou: as palavras e os sufixos são reaproveitados
+        self.assertIs(novo._sufixos, indice._sufixos)
+        self.assertTrue(self.dm.editar_familia(3, novo_nome="Família Zuleica"))
+        self.assertEqual([f["numero"] for f in self.dm.indice_busca().buscar("zule")], [3])
+        self.assertEqual(IndiceBusca([]).buscar("silva"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import unittest
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from src.data_manager import DataManager
+from src.galeria import GaleriaFamilias
+
+app = QApplication.instance() or QApplication([])
+
+class TestGaleria(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.assertTrue(self.dm.adicionar_familias([(f"Família {i}", "") for i in range(1, 501)]))
+        self.dm.alterar_status_familia(7, True)
+        self.galeria = GaleriaFamilias()
+        self.galeria.resize(700, 400)
+
+    def tearDown(self):
+        self.galeria.deleteLater()
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_filtro_sem_recriar_linhas(self):
+        widgets_antes = len(self.galeria.findChildren(QWidget))
+        self.galeria.modelo.definir_familias(self.dm.carregar_familias())
+        self.assertEqual(self.galeria.filtro.rowCount(), 500)
+        self.assertEqual(len(self.galeria.findChildren(QWidget)), widgets_antes)
+        self.galeria.filtro.definir_filtro("sorteadas", "")
+        self.assertEqual(self.galeria.filtro.rowCount(), 1)
+        self.galeria.filtro.definir_filtro("todas", "familia 12")
+        numeros = [self.galeria.filtro.index(i, 0).data(Qt.UserRole + 1)["numero"] for i in range(self.galeria.filtro.rowCount())]
+        self.assertEqual(numeros[:3], [12, 112, 120])
+        self.galeria.filtro.usar_indice(self.dm.indice_busca)
+        self.galeria.filtro.definir_filtro("todas", "familia 7")
+        self.galeria.filtro.definir_filtro("sorteadas", "familia 7")
+        self.assertEqual(self.galeria.filtro.rowCount(), 1)
+
+    def test_busca_aproximada_ordenada(self):
+        self.assertTrue(self.dm.editar_familia(40, novo_nome="Terezinha Valter"))
+        self.assertTrue(self.dm.editar_familia(30, novo_nome="Tereza Valter"))
+        filtro = self.galeria.filtro
+        filtro.usar_indice(self.dm.indice_busca)
+        self.galeria.modelo.definir_familias(self.dm.carregar_familias())
+        filtro.definir_filtro("todas", "terezsa valtr")
+        self.assertTrue(filtro.aproximada)
+        numeros = [filtro.index(i, 0).data(Qt.UserRole + 1)["numero"] for i in range(filtro.rowCount())]
+        self.assertEqual(numeros[:2], [30, 40])
+        filtro.definir_filtro("todas", "tereza")
+        self.assertFalse(filtro.aproximada)
+        self.assertEqual([filtro.index(i, 0).data(Qt.UserRole + 1)["numero"] for i in range(filtro.rowCount())], [30])
+        filtro.definir_filtro("todas", "")
+        self.assertEqual(filtro.index(0, 0).data(Qt.UserRole + 1)["numero"], 1)
+
+    def test_cliques_resolvidos_pelo_delegate(self):
+        self.galeria.modelo.definir_familias(self.dm.carregar_familias())
+        self.galeria.show()
+        app.processEvents()
+        eventos = []
+        self.galeria.delegate.editar.connect(lambda f: eventos.append(("editar", f["numero"])))
+        self.galeria.delegate.excluir.connect(lambda f: eventos.append(("excluir", f["numero"])))
+        areas = self.galeria.delegate._areas(self.galeria.visualRect(self.galeria.filtro.index(2, 0)))
+        QTest.mouseClick(self.galeria.viewport(), Qt.LeftButton, Qt.NoModifier, areas["editar"].center())
+        QTest.mouseClick(self.galeria.viewport(), Qt.LeftButton, Qt.NoModifier, areas["excluir"].center())
+        QTest.mouseClick(self.galeria.viewport(), Qt.LeftButton, Qt.NoModifier, areas["numero"].center())
+        self.assertEqual(eventos, [("editar", 3), ("excluir", 3)])
+
+    def test_alteracoes_aplicadas_por_linha(self):
+        alteracoes = []
+        self.dm.adicionar_ouvinte(alteracoes.append)
+        modelo = self.galeria.modelo
+        modelo.definir_familias(self.dm.carregar_familias())
+        self.dm.adicionar_ouvinte(lambda a: modelo.aplicar_alteracao(a, self.dm.carregar_familias()))
+        eventos = []
+        def registrar(sinal, *args):
+            # Índices válidos viram a linha; ints (first/last) entram como estão
+            linhas = [a.row() if hasattr(a, "row") else a for a in args
+                      if isinstance(a, int) or (hasattr(a, "row") and a.isValid())]
+            eventos.append((sinal,) + tuple(linhas))
+        for sinal in ("modelReset", "rowsInserted", "rowsRemoved", "dataChanged"):
+            getattr(modelo, sinal).connect(lambda *args, s=sinal: registrar(s, *args))
+
+        self.assertTrue(self.dm.alterar_status_familia(20, True))
+        self.assertEqual(eventos, [("dataChanged", 19, 19)])
+        self.assertEqual(alteracoes[-1].numeros(), {20})
+        self.assertTrue(modelo.familia(19)["sorteado"])
+
+        eventos.clear()
+        self.assertTrue(self.dm.adicionar_familias([("Nova", "")]))
+        self.assertEqual(eventos, [("rowsInserted", 500, 500)])
+        self.assertEqual(modelo.familia(500)["nome"], "Nova")
+
+        eventos.clear()
+        self.galeria.filtro.definir_filtro("nao_sorteadas", "")
+        pendentes = self.galeria.filtro.rowCount()
+        self.assertTrue(self.dm.alterar_status_familia(30, True))
+        self.assertEqual(self.galeria.filtro.rowCount(), pendentes - 1)
+        self.assertNotIn("modelReset", [e[0] for e in eventos])
+        self.assertEqual(modelo.rowCount(), len(self.dm.carregar_familias()))
+        self.assertEqual([f["numero"] for f in modelo._familias], sorted(f["numero"] for f in self.dm.carregar_familias()))
+
+        eventos.clear()
+        self.assertTrue(self.dm.editar_familia(40, "Renomeada"))
+        self.assertEqual(eventos, [("dataChanged", 39, 39)])
+        self.assertEqual([f["nome"] for f in alteracoes[-1].atualizadas], ["Renomeada"])
+        self.assertEqual(modelo.familia(39)["nome"], "Renomeada")
+
+if __name__ == '__main__':
+    unittest.main()
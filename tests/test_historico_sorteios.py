@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from src.data_manager import DataManager
+from src.historico_sorteios import HistoricoSorteios
+
+
+class TestHistoricoSorteios(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.assertTrue(self.dm.adicionar_familias([(f"Família {i}", "") for i in range(1, 11)]))
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_reset_arquiva_ciclo(self):
+        automatica = self.dm.sortear_proxima()
+        manual = next(f for f in self.dm.familias_pendentes())
+        self.assertTrue(self.dm.alterar_status_familia(manual["numero"], True))
+        mes = datetime.now().strftime("%Y-%m")
+        self.assertEqual(self.dm.sorteios_por_mes(), {mes: 2})
+        self.assertEqual(self.dm.ultimo_sorteio_da_familia(manual["id"])["data"], datetime.now().strftime("%Y-%m-%d"))
+        ciclo = self.dm._garantir_motor().ciclo
+
+        self.assertTrue(self.dm.resetar_sorteio())
+        self.assertEqual(self.dm.total_sorteadas, 0)
+        historico = self.dm.historico()
+        self.assertEqual(len(historico), 2)
+        ultimo = self.dm.ultimo_sorteio_da_familia(automatica["id"])
+        self.assertEqual((ultimo["ciclo"], ultimo["nome"]), (ciclo, automatica["nome"]))
+        # Sorteio automático guarda o horário da auditoria
+        self.assertIn("T", ultimo["data"])
+        self.assertEqual(self.dm.sorteios_por_mes(), {mes: 2})
+        self.assertEqual(historico.arquivar([dict(ultimo)]), True)
+        self.assertEqual(len(historico), 2)
+
+        self.assertTrue(self.dm.alterar_status_familia(self.dm.get_by_id(automatica["id"])["numero"], True))
+        self.assertTrue(self.dm.resetar_sorteio())
+        self.assertEqual([e["ciclo"] for e in historico.da_familia(automatica["id"])][0], ciclo)
+        self.assertEqual(len(historico.da_familia(automatica["id"])), 2)
+        self.assertEqual(len(historico.do_mes(mes)), 3)
+
+    def test_indice_refeito_apos_gravacao_interrompida(self):
+        historico = HistoricoSorteios(os.path.join(self.tmp, "dados"))
+        entradas = [{"id": i, "numero": i, "nome": f"F{i}", "ciclo": "c1", "data": f"2026-0{i}-01"} for i in (1, 2, 3)]
+        self.assertTrue(historico.arquivar(entradas))
+        with open(historico.arquivo, "ab") as f:
+            f.write(b'{"id": 9, "ciclo": "c2", "da')
+        os.remove(historico.indice_file)
+        relido = HistoricoSorteios(os.path.join(self.tmp, "dados"))
+        self.assertEqual(relido.por_mes(), {"2026-01": 1, "2026-02": 1, "2026-03": 1})
+        self.assertEqual(relido.ultimo_da_familia(2)["data"], "2026-02-01")
+        self.assertIsNone(relido.ultimo_da_familia(9))
+        self.assertTrue(relido.arquivar([{"id": 9, "ciclo": "c2", "data": "2026-04-02"}]))
+        self.assertEqual(HistoricoSorteios(os.path.join(self.tmp, "dados")).ultimo_da_familia(9)["data"], "2026-04-02")
+
+    def test_reinicio_interrompido_arquiva_sorteios_seguintes(self):
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        motor = self.dm._garantir_motor()
+        ciclo = motor.ciclo
+        # Queda logo depois do arquivamento: famílias e motor continuam no ciclo
+        self.assertTrue(self.dm.historico().arquivar(self.dm._entradas_do_ciclo(ciclo)))
+        self.assertTrue(self.dm.alterar_status_familia(2, True))
+        self.assertTrue(self.dm.resetar_sorteio())
+        historico = self.dm.historico()
+        self.assertEqual(sorted(e["id"] for e in historico.entradas()), [1, 2])
+        self.assertEqual({e["ciclo"] for e in historico.entradas()}, {ciclo})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage
+from src.data_manager import DataManager
+from src.imagens import IngestaoImagens, processar_foto
+
+app = QApplication.instance() or QApplication([])
+
+class TestIngestaoImagens(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _make_image(self, nome, w=2400, h=1800, cor=0xFF336699):
+        path = os.path.join(self.tmp, nome)
+        img = QImage(w, h, QImage.Format_RGB32)
+        img.fill(cor)
+        img.save(path, 'PNG')
+        return path
+
+    def _aguardar(self, condicao, limite=20):
+        fim = time.monotonic() + limite
+        while not condicao() and time.monotonic() < fim:
+            app.processEvents()
+            time.sleep(0.01)
+
+    def test_foto_e_miniatura_de_uma_decodificacao(self):
+        origem = self._make_image('grande.png')
+        destino = os.path.join(self.tmp, 'imagens', 'familias', 'grande.png')
+        self.assertTrue(processar_foto(origem, destino, self.dm._thumbs_dir()))
+        otimizada = QImage(destino)
+        self.assertEqual((otimizada.width(), otimizada.height()), (1600, 1200))
+        thumb = QImage(os.path.join(self.tmp, self.dm._thumb_path('imagens/familias/grande.png')))
+        self.assertEqual(max(thumb.width(), thumb.height()), 240)
+
+    def test_importacao_em_lote_com_progresso(self):
+        itens = [(f'Fam {i}', self._make_image(f'src_{i}.png', 800, 600, 0xFF000000 + i)) for i in range(6)]
+        itens.append(('Inválida', os.path.join(self.tmp, 'nao_existe.png')))
+        ingestao = IngestaoImagens(self.dm._thumbs_dir(), max_workers=3)
+        progresso = []
+        ingestao.progresso.connect(lambda feitos, total: progresso.append((feitos, total)))
+        concluidos = []
+        total = self.dm.importar_familias(itens, ingestao, lambda ok, n: concluidos.append((ok, n)))
+        self.assertEqual(total, 6)
+        self._aguardar(lambda: concluidos)
+        ingestao.encerrar()
+        self.assertEqual(concluidos, [(True, 6)])
+        self.assertEqual(progresso[-1], (6, 6))
+        familias = self.dm.carregar_familias()
+        self.assertEqual([f["numero"] for f in familias], list(range(1, 7)))
+        for f in familias:
+            self.assertTrue(os.path.exists(os.path.join(self.tmp, f["foto"])))
+            self.assertTrue(os.path.exists(os.path.join(self.tmp, self.dm._thumb_path(f["foto"]))))
+
+    def test_validacao_regenera_apenas_thumbs_desatualizadas(self):
+        for i in range(3):
+            self.assertTrue(self.dm.adicionar_familia(f'Fam {i}', self._make_image(f'f{i}.png', 600, 400, 0xFF000000 + i)))
+        fotos = [f["foto"] for f in self.dm.carregar_familias()]
+        self.assertEqual(self.dm.atualizar_thumbs(fotos), 0)
+
+        os.remove(os.path.join(self.tmp, self.dm._thumb_path(fotos[0])))
+        img = QImage(300, 900, QImage.Format_RGB32)
+        img.fill(0xFFAA0000)
+        img.save(os.path.join(self.tmp, fotos[1]), 'PNG')
+        self.assertTrue(self.dm.verificar_integridade_dados())
+        self.dm._thread_thumbs.join(10)
+        thumb = QImage(os.path.join(self.tmp, self.dm._thumb_path(fotos[1])))
+        self.assertEqual((thumb.width(), thumb.height()), (80, 240))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, self.dm._thumb_path(fotos[0]))))
+        self.assertEqual(self.dm.atualizar_thumbs(fotos), 0)
+
+        # Miniaturas de antes do manifesto são aproveitadas
+        os.remove(self.dm._manifesto_thumbs().path)
+        self.dm._manifesto = None
+        self.assertEqual(self.dm.atualizar_thumbs(fotos), 0)
+
+    def test_piramide_de_miniaturas_por_tamanho(self):
+        self.assertTrue(self.dm.adicionar_familia('A', self._make_image('grande.png')))
+        familia = self.dm.get_by_numero(1)
+        foto = familia["foto"]
+        def variante(nome):
+            return os.path.join(self.tmp, self.dm._thumb_path(foto).replace("_thumb.", f"_{nome}."))
+        tela = QImage(variante("tela"))
+        self.assertEqual((tela.width(), tela.height()), (1080, 810))
+        self.assertEqual(self.dm.photo_for(familia, 60), variante("mini"))
+        self.assertEqual(self.dm.photo_for(familia, 120), variante("card"))
+        self.assertEqual(self.dm.photo_for(familia, 120, 2.0), variante("thumb"))
+        self.assertEqual(self.dm.photo_for(familia, (1024, 768)), variante("tela"))
+        self.assertEqual(self.dm.photo_for(familia, (1920, 1080)), os.path.join(self.tmp, foto))
+        os.remove(variante("card"))
+        self.assertEqual(self.dm.photo_for(familia, 120), variante("thumb"))
+
+    def test_fotos_identicas_compartilham_arquivo(self):
+        origem = self._make_image('grupo.png', 800, 600)
+        copia = os.path.join(self.tmp, 'grupo_copia.png')
+        shutil.copy2(origem, copia)
+        self.assertTrue(self.dm.adicionar_familia('A', origem))
+        foto = self.dm.get_by_numero(1)["foto"]
+        chamadas = []
+        original = self.dm._processar_foto
+        self.dm._processar_foto = lambda *a: chamadas.append(a) or original(*a)
+        self.assertTrue(self.dm.adicionar_familia('B', copia))
+        self.assertTrue(self.dm.editar_familia(1, nova_foto_path=origem))
+        self.assertEqual(chamadas, [])
+        self.assertEqual(self.dm.get_by_numero(2)["foto"], foto)
+        foto_abs = os.path.join(self.tmp, foto)
+
+        self.assertTrue(self.dm.excluir_familia(1))
+        self.assertTrue(os.path.exists(foto_abs))
+        self.assertTrue(self.dm.excluir_familia(1))
+        self.assertFalse(os.path.exists(foto_abs))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, self.dm._thumb_path(foto))))
+
+if __name__ == '__main__':
+    unittest.main()
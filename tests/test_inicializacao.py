@@ -0,0 +1,55 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from PySide6.QtWidgets import QApplication
+from src.data_manager import DataManager
+from src.inicializacao import TarefasIniciais
+
+app = QApplication.instance() or QApplication([])
+
+class TestInicializacao(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump([
+                {"id": 1, "numero": "1", "nome": " A ", "foto": ""},
+                {"id": 2, "numero": "x", "nome": "Inválida", "foto": ""},
+            ], f)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_validacao_em_leitura_nao_altera_arquivos(self):
+        with open(self.dm.familias_file, 'rb') as f:
+            antes = f.read()
+        resultado = self.dm.validar_em_leitura()
+        with open(self.dm.familias_file, 'rb') as f:
+            self.assertEqual(f.read(), antes)
+        self.assertTrue(resultado["alterado"])
+        self.assertEqual(self.dm.aplicar_validacao(resultado), (True, True))
+        self.assertEqual([(f["numero"], f["nome"]) for f in self.dm.carregar_familias()], [(1, "A")])
+        self.assertEqual(self.dm.aplicar_validacao(self.dm.validar_em_leitura()), (True, False))
+
+    def test_tarefas_em_segundo_plano(self):
+        tarefas = TarefasIniciais(self.dm, "9.9.9")
+        eventos = []
+        tarefas.dados_corrigidos.connect(lambda: eventos.append("corrigidos"))
+        tarefas.concluido.connect(lambda ok: eventos.append(ok))
+        tarefas.iniciar()
+        self.assertTrue(tarefas.ativo)
+        fim = time.monotonic() + 20
+        while tarefas.ativo and time.monotonic() < fim:
+            app.processEvents()
+            time.sleep(0.01)
+        self.assertEqual(eventos, ["corrigidos", True])
+        self.assertEqual(len(self.dm.carregar_familias()), 1)
+        self.assertEqual(self.dm._read_saved_version(), "9.9.9")
+        self.assertEqual(len(self.dm.listar_backups()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.data_manager import DataManager
+from src.journal import FamiliasJournal
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        familias = [
+            {"id": i, "numero": i, "nome": f"Família {i}", "foto": "", "sorteado": False}
+            for i in range(1, 51)
+        ]
+        self.dm._backend.journal.compactar(familias)
+        self.dm.carregar_familias(force_reload=True)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _recarregar(self):
+        DataManager.descartar(self.tmp)
+        self.dm = DataManager(base_path_override=self.tmp)
+        return self.dm.carregar_familias(force_reload=True)
+
+    def test_alteracao_grava_apenas_diario(self):
+        snapshot_antes = os.path.getsize(self.dm.familias_file)
+        self.assertTrue(self.dm.alterar_status_familia(7, True))
+        self.assertEqual(os.path.getsize(self.dm.familias_file), snapshot_antes)
+        self.assertTrue(os.path.exists(self.dm.journal_file))
+        self.assertLess(os.path.getsize(self.dm.journal_file), snapshot_antes // 10)
+        res = self._recarregar()
+        self.assertTrue(self.dm.get_by_numero(7)["sorteado"])
+        self.assertEqual(len(res), 50)
+
+    def test_exclusao_replay_do_diario(self):
+        self.assertTrue(self.dm.excluir_familia(1))
+        res = self._recarregar()
+        self.assertEqual(len(res), 49)
+        self.assertEqual(self.dm.get_by_numero(1)["nome"], "Família 2")
+
+    def test_registro_truncado_descartado(self):
+        self.dm.alterar_status_familia(1, True)
+        with open(self.dm.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"ops":[{"op":"upsert","fam')
+        self._recarregar()
+        self.assertTrue(self.dm.get_by_numero(1)["sorteado"])
+        self.dm.alterar_status_familia(2, True)
+        self._recarregar()
+        self.assertTrue(self.dm.get_by_numero(1)["sorteado"])
+        self.assertTrue(self.dm.get_by_numero(2)["sorteado"])
+
+    def test_snapshot_externo_invalida_diario(self):
+        self.dm.alterar_status_familia(1, True)
+        with open(self.dm.familias_file, 'w', encoding='utf-8') as f:
+            json.dump([{"id": 1, "numero": 1, "nome": "Externa", "foto": ""}], f)
+        res = self._recarregar()
+        self.assertEqual([f["nome"] for f in res], ["Externa"])
+        self.assertFalse(os.path.exists(self.dm.journal_file))
+
+    def test_gravacao_apos_compactacao_externa(self):
+        self.assertTrue(self.dm.alterar_status_familia(3, True))
+        # Outro processo compacta (como scripts/mark_all_sorted.py) sem o app reler
+        externo = FamiliasJournal(self.dm.familias_file, self.dm.journal_file)
+        familias = externo.carregar()
+        familias[1].update(sorteado=True, data_sorteio="01/10/2026")
+        externo.compactar(familias)
+        self.assertTrue(self.dm.alterar_status_familia(1, True))
+        # A gravação vai sobre o snapshot novo e o cache passa a tê-lo
+        self.assertEqual([f["numero"] for f in self.dm.familias_sorteadas()], [1, 2, 3])
+        self._recarregar()
+        self.assertEqual([f["numero"] for f in self.dm.familias_sorteadas()], [1, 2, 3])
+        self.assertFalse(os.path.exists(self.dm.journal_file + ".descartado"))
+
+    def test_compactacao_ao_exceder_limite(self):
+        self.dm._backend.journal.limite_bytes = 1024
+        compactou = False
+        for i in range(200):
+            self.dm.editar_familia(1, f"Nome {i}")
+            if not os.path.exists(self.dm.journal_file):
+                compactou = True
+                break
+        self.assertTrue(compactou)
+        with open(self.dm.familias_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)[0]["nome"], f"Nome {i}")
+
+    def test_confirmacao_em_uma_unica_linha(self):
+        self.assertTrue(self.dm.alterar_status_familia(7, True))
+        with open(self.dm.journal_file, encoding='utf-8') as f:
+            linhas = f.read().splitlines()
+        self.assertEqual(len(linhas), 2)  # cabeçalho + um commit
+        ops = json.loads(linhas[1])["ops"]
+        self.assertIn({"op": "ultimo", "numero": 7}, ops)
+        self._recarregar()
+        self.assertEqual(self.dm.carregar_ultimo_sorteio(force_reload=True), 7)
+
+    def test_alteracao_de_um_registro_nao_refaz_indice(self):
+        store = self.dm._store
+        self.assertTrue(self.dm.alterar_status_familia(7, True))
+        self.assertTrue(self.dm.alterar_status_familia(9, True))
+        self.assertTrue(self.dm.editar_familia(8, "Outro nome"))
+        self.assertTrue(self.dm.adicionar_familias([("Nova", "")]))
+        self.assertTrue(self.dm.alterar_status_familia(9, False))
+        self.assertIs(self.dm._store, store)
+        self.assertEqual((self.dm.total_sorteadas, self.dm.total_pendentes), (1, 50))
+        self.assertEqual(self.dm.ultima_sorteada["numero"], 7)
+        self.assertEqual(self.dm.carregar_ultimo_sorteio(), 7)
+        esperado = [dict(f) for f in self.dm.carregar_familias()]
+        self.assertEqual(self._recarregar(), esperado)
+        self.assertEqual(self.dm.carregar_ultimo_sorteio(force_reload=True), 7)
+
+    def test_transacao_desfaz_cache_quando_gravacao_falha(self):
+        with mock.patch.object(self.dm._backend, "commit", side_effect=OSError("disco cheio")):
+            self.assertFalse(self.dm.alterar_status_familia(7, True))
+        self.assertFalse(self.dm.get_by_numero(7)["sorteado"])
+        self.assertEqual(self.dm.familias_sorteadas(), [])
+        self.assertFalse(os.path.exists(self.dm.journal_file))
+        self.assertTrue(self.dm.alterar_status_familia(7, True))
+        self.assertTrue(self._recarregar()[6]["sorteado"])
+
+if __name__ == '__main__':
+    unittest.main()
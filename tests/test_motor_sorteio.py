@@ -0,0 +1,82 @@
+import json
+import shutil
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.motor_sorteio import MotorSorteio
+
+
+class TestMotorSorteio(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.assertTrue(self.dm.adicionar_familias([(f"Família {i}", "") for i in range(1, 21)]))
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def sorteios(self):
+        return [e for e in self.dm._garantir_motor().eventos() if e["tipo"] == "sorteio"]
+
+    def test_ciclo_completo_reproduzivel(self):
+        ids = []
+        while True:
+            familia = self.dm.sortear_proxima()
+            if familia is None:
+                break
+            self.assertTrue(familia["sorteado"])
+            ids.append(familia["id"])
+        self.assertEqual(sorted(ids), list(range(1, 21)))
+        self.assertTrue(self.dm.todas_sorteadas)
+        self.assertEqual(int(self.dm.carregar_ultimo_sorteio()), self.dm.get_by_id(ids[-1])["numero"])
+        with open(self.dm._garantir_motor().ciclo_file, encoding="utf-8") as f:
+            ciclo = json.load(f)
+        # A ordem sai só da semente
+        self.assertEqual(MotorSorteio.permutacao(ciclo["semente"], range(1, 21)), ids)
+        registros = self.sorteios()
+        self.assertTrue(all(self.dm.verificar_sorteio(r) for r in registros))
+        adulterado = dict(registros[3], id=registros[4]["id"])
+        self.assertFalse(self.dm.verificar_sorteio(adulterado))
+
+    def test_entradas_no_meio_do_ciclo(self):
+        primeira = self.dm.sortear_proxima()
+        manual = self.dm.get_by_numero(5 if primeira["numero"] != 5 else 6)["id"]
+        self.assertTrue(self.dm.alterar_status_familia(self.dm.get_by_id(manual)["numero"], True))
+        self.assertTrue(self.dm.adicionar_familias([("Nova A", ""), ("Nova B", "")]))
+        segunda = self.dm.sortear_proxima()
+        self.assertTrue(self.dm.alterar_status_familia(primeira["numero"], False))
+        sorteadas = [primeira["id"], segunda["id"]]
+        # Outra instância do motor reconstrói o mesmo estado pela auditoria
+        motor = self.dm._garantir_motor()
+        relido = MotorSorteio(motor.dados_dir)
+        self.assertTrue(relido.carregar())
+        self.assertEqual(relido.ordem, motor.ordem)
+        while True:
+            familia = self.dm.sortear_proxima()
+            if familia is None:
+                break
+            sorteadas.append(familia["id"])
+        # Todas as 22 saem; a devolvida sai de novo, a sorteada à mão não
+        self.assertEqual(self.dm.total_pendentes, 0)
+        self.assertEqual(len(sorteadas), 22)
+        self.assertEqual(sorted(set(sorteadas)), [i for i in range(1, 23) if i != manual])
+        self.assertTrue(all(self.dm.verificar_sorteio(r) for r in self.sorteios()))
+
+    def test_reset_inicia_ciclo_com_semente(self):
+        self.dm.sortear_proxima()
+        ciclo_antigo = self.dm._garantir_motor().ciclo
+        self.assertTrue(self.dm.resetar_sorteio())
+        motor = self.dm._garantir_motor()
+        self.assertNotEqual(motor.ciclo, ciclo_antigo)
+        numeros = list(range(1, 21))
+        MotorSorteio.rng(motor.semente, "numeros").shuffle(numeros)
+        por_id = {f["id"]: f["numero"] for f in self.dm.carregar_familias()}
+        self.assertEqual([por_id[i] for i in range(1, 21)], numeros)
+        self.assertEqual(motor.cursor, 0)
+        self.assertEqual(sorted(motor.ordem), list(range(1, 21)))
+
+
+if __name__ == "__main__":
+    unittest.main()
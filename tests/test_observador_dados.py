@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+import time
+import unittest
+from PySide6.QtWidgets import QApplication
+from src.data_manager import DataManager
+from src.journal import FamiliasJournal
+from src.observador_dados import ObservadorDados
+
+app = QApplication.instance() or QApplication([])
+
+class TestObservadorDados(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.dm.salvar_familias([
+            {"id": i, "numero": i, "nome": f"Família {i}", "foto": "", "sorteado": False}
+            for i in range(1, 11)
+        ])
+        self.alteracoes = []
+        self.dm.adicionar_ouvinte(self.alteracoes.append)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _esperar(self, condicao, limite=5):
+        fim = time.monotonic() + limite
+        while not condicao() and time.monotonic() < fim:
+            app.processEvents()
+            time.sleep(0.01)
+
+    def _gravar_externo(self, alterar):
+        # Mesmo caminho de scripts/mark_all_sorted.py: outro processo compacta o diário
+        journal = FamiliasJournal(self.dm.familias_file, self.dm.journal_file)
+        familias = journal.carregar()
+        alterar(familias)
+        journal.compactar(familias)
+
+    def test_alteracao_externa_chega_como_diferenca(self):
+        observador = ObservadorDados(self.dm, atraso_ms=50)
+        recarregas = []
+        observador.alterado.connect(lambda: recarregas.append(1))
+        observador.iniciar()
+        try:
+            self.assertTrue(observador.ativo)
+            for numero in (3, 4):
+                self._gravar_externo(lambda fs: fs[numero - 1].update(sorteado=True, data_sorteio="01/02/2026"))
+            self._esperar(lambda: self.alteracoes)
+            app.processEvents()
+            self.assertEqual(len(self.alteracoes), 1)
+            self.assertEqual(sorted(f["id"] for f in self.alteracoes[0].atualizadas), [3, 4])
+            self.assertEqual(self.dm.total_sorteadas, 2)
+            self.assertEqual(len(recarregas), 1)
+            # Gravação do próprio processo: um evento, sem nova leitura
+            self.assertTrue(self.dm.alterar_status_familia(5, True))
+            geracao = self.dm.generation
+            self.assertFalse(observador.verificar())
+            self.assertEqual(self.dm.generation, geracao)
+            self.assertEqual(len(self.alteracoes), 2)
+        finally:
+            observador.parar()
+
+    def test_polling_sem_mudanca_nao_rele(self):
+        observador = ObservadorDados(self.dm, intervalo_polling_ms=20, polling=True)
+        observador.iniciar()
+        try:
+            geracao = self.dm.generation
+            self._esperar(lambda: False, limite=0.2)
+            self.assertEqual(self.dm.generation, geracao)
+            self._gravar_externo(lambda fs: fs.pop())
+            self._esperar(lambda: self.alteracoes)
+            self.assertEqual([f["id"] for f in self.alteracoes[0].removidas], [10])
+        finally:
+            observador.parar()
+
+if __name__ == '__main__':
+    unittest.main()
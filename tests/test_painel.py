@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from PySide6.QtWidgets import QApplication
+from src.data_manager import DataManager
+from src.painel import PainelPrincipal
+
+app = QApplication.instance() or QApplication([])
+
+class TestPainel(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        self.assertTrue(self.dm.adicionar_familias([(f"Família {i}", "") for i in range(1, 21)]))
+        self.painel = PainelPrincipal()
+        self.painel.atualizar_galeria()
+
+    def tearDown(self):
+        self.painel.close()
+        self.painel.deleteLater()
+        app.processEvents()
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_operacoes_nao_refazem_a_galeria(self):
+        modelo = self.painel.galeria.modelo
+        resets = []
+        modelo.modelReset.connect(lambda: resets.append(1))
+        completa = mock.patch.object(self.painel, "atualizar_galeria", wraps=self.painel.atualizar_galeria)
+        atualizar_galeria = completa.start()
+        self.addCleanup(completa.stop)
+
+        self.painel._executar_exclusao_impl(self.dm.get_by_numero(3))
+        self.assertTrue(self.dm.alterar_status_familia(5, True))
+        self.assertTrue(self.dm.editar_familia(6, "Renomeada"))
+        app.processEvents()
+        self.assertEqual(resets, [])
+        self.assertEqual(atualizar_galeria.call_count, 0)
+        self.assertEqual(modelo.rowCount(), 19)
+        self.assertEqual(modelo.familia(5)["nome"], "Renomeada")
+
+        # Sem diferença por registro (ids repetidos), o modelo é refeito
+        familias = [dict(f) for f in self.dm.carregar_familias()]
+        familias[1]["id"] = familias[0]["id"]
+        self.assertTrue(self.dm.salvar_familias(familias))
+        app.processEvents()
+        self.assertEqual(resets, [1])
+        self.assertEqual(atualizar_galeria.call_count, 1)
+        self.assertEqual(modelo.rowCount(), len(self.dm.carregar_familias()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.persistencia_sqlite import migrar_json_para_sqlite
+
+class TestPersistenciaSqlite(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmp, 'dados'), exist_ok=True)
+        familias = [
+            {"id": 1, "numero": 1, "nome": "A", "foto": "", "sorteado": False},
+            {"id": 2, "numero": 2, "nome": "B", "foto": "", "sorteado": True, "data_sorteio": "01/01/2026"},
+            {"id": 3, "numero": 3, "nome": "C", "foto": "", "sorteado": True, "data_sorteio": "05/01/2026"},
+        ]
+        with open(os.path.join(self.tmp, 'dados', 'familias.json'), 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        with open(os.path.join(self.tmp, 'dados', 'sorteio.json'), 'w', encoding='utf-8') as f:
+            json.dump({"ultimo_sorteado": 3}, f)
+
+    def tearDown(self):
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _abrir(self):
+        DataManager.descartar(self.tmp)
+        return DataManager(base_path_override=self.tmp)
+
+    def test_migracao_seleciona_backend_sqlite(self):
+        self.assertEqual(migrar_json_para_sqlite(self.tmp), 3)
+        dm = self._abrir()
+        self.assertEqual(dm._backend.nome, "sqlite")
+        self.assertEqual([f["nome"] for f in dm.carregar_familias()], ["A", "B", "C"])
+        self.assertEqual(int(dm.carregar_ultimo_sorteio()), 3)
+        with self.assertRaises(FileExistsError):
+            migrar_json_para_sqlite(self.tmp)
+
+    def test_trocar_backend_descarta_cache_do_anterior(self):
+        self.assertEqual(migrar_json_para_sqlite(self.tmp), 3)
+        caminho = os.path.join(self.tmp, 'dados', 'familias.json')
+        with open(caminho, 'r', encoding='utf-8') as f:
+            familias = json.load(f)
+        familias[0]["nome"] = "A (json)"
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(familias, f)
+        DataManager.descartar(self.tmp)
+        dm = DataManager(base_path_override=self.tmp, backend="json")
+        self.assertEqual(dm.get_by_id(1)["nome"], "A (json)")
+        alteracoes = []
+        dm.adicionar_ouvinte(alteracoes.append)
+        self.assertIs(DataManager(base_path_override=self.tmp, backend="sqlite"), dm)
+        self.assertEqual(dm._backend.nome, "sqlite")
+        self.assertEqual([f["nome"] for f in dm.carregar_familias()], ["A", "B", "C"])
+        self.assertEqual(dm.get_by_id(1)["nome"], "A")
+        self.assertEqual([f["nome"] for f in alteracoes[-1].atualizadas], ["A"])
+
+    def test_contagens_delegadas_ao_banco(self):
+        migrar_json_para_sqlite(self.tmp)
+        dm = self._abrir()
+        self.assertEqual(dm.contar_familias("sorteadas"), 2)
+        self.assertEqual(dm.contar_familias("nao_sorteadas"), 1)
+        self.assertEqual([f["nome"] for f in dm.listar_familias("sorteadas")], ["B", "C"])
+        self.assertIsNone(dm._familias_cache)
+
+    def test_operacoes_persistem_no_banco(self):
+        migrar_json_para_sqlite(self.tmp)
+        dm = self._abrir()
+        self.assertTrue(dm.alterar_status_familia(1, True))
+        self.assertTrue(dm.excluir_familia(2))
+        dm = self._abrir()
+        familias = dm.carregar_familias()
+        self.assertEqual([(f["numero"], f["nome"]) for f in familias], [(1, "A"), (2, "C")])
+        self.assertTrue(all(f["sorteado"] for f in familias))
+        self.assertTrue(dm.resetar_sorteio())
+        dm = self._abrir()
+        self.assertEqual(dm.contar_familias("sorteadas"), 0)
+        self.assertIsNone(dm.carregar_ultimo_sorteio())
+        self.assertTrue(dm.editar_familia(dm.get_by_id(1)["numero"], "Z"))
+        self.assertTrue(dm.adicionar_familias([("D", "")]))
+        dm = self._abrir()
+        self.assertEqual(sorted(f["nome"] for f in dm.carregar_familias()), ["C", "D", "Z"])
+
+if __name__ == '__main__':
+    unittest.main()
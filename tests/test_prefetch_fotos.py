@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+from src.data_manager import DataManager
+from src.prefetch_fotos import PrefetchFotos
+
+app = QApplication.instance() or QApplication([])
+
+class TestPrefetchFotos(unittest.TestCase):
+    def setUp(self):
+        DataManager.descartar_todas()
+        self.tmp = tempfile.mkdtemp()
+        self.dm = DataManager(base_path_override=self.tmp)
+        for i in range(12):
+            path = os.path.join(self.tmp, f'src_{i}.png')
+            img = QImage(1200, 900, QImage.Format_RGB32)
+            img.fill(0xFF000000 + i)
+            img.save(path, 'PNG')
+            self.assertTrue(self.dm.adicionar_familia(f'Fam {i + 1}', path))
+        self.prefetch = PrefetchFotos(self.dm, limite=4)
+
+    def tearDown(self):
+        self.prefetch.encerrar(aguardar=True)
+        DataManager.descartar_todas()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _aguardar(self, condicao, limite=20):
+        fim = time.monotonic() + limite
+        while not condicao() and time.monotonic() < fim:
+            app.processEvents()
+            time.sleep(0.01)
+
+    def test_candidatas_por_prefixo(self):
+        self.assertEqual([f["numero"] for f in self.prefetch.candidatas("1")], [1, 10, 11, 12])
+        self.dm.alterar_status_familia(10, True)
+        self.assertEqual([f["numero"] for f in self.prefetch.candidatas("1")], [1, 11, 12])
+        self.assertEqual(self.prefetch.candidatas(""), [])
+        self.assertEqual(self.prefetch.candidatas("01"), [])
+        self.assertEqual([f["numero"] for f in self.prefetch.candidatas("12")], [12])
+        # Volta a pendente e renumeração após exclusão passam pelo índice ordenado
+        self.dm.alterar_status_familia(10, False)
+        self.assertTrue(self.dm.excluir_familia(11))
+        self.assertEqual([f["numero"] for f in self.prefetch.candidatas("1")], [1, 10, 11])
+        self.assertEqual(self.prefetch.candidatas("12"), [])
+
+    def test_foto_pronta_no_tamanho_da_tela(self):
+        tamanho = QSize(400, 400)
+        familia = self.dm.get_by_numero(11)
+        self.prefetch.prefetch("1", tamanho)
+        self._aguardar(lambda: self.prefetch.obter(familia, tamanho) is not None)
+        pixmap = self.prefetch.obter(familia, tamanho)
+        self.assertEqual((pixmap.width(), pixmap.height()), (400, 300))
+        # Outro tamanho de tela não aproveita a foto pré-escalada
+        self.assertIsNone(self.prefetch.obter(familia, QSize(800, 600)))
+        self.prefetch.prefetch("11", tamanho)
+        self.assertIsNotNone(self.prefetch.obter(familia, tamanho))
+
+    def test_foto_pronta_na_densidade_da_tela(self):
+        tamanho = QSize(400, 400)
+        familia = self.dm.get_by_numero(11)
+        self.prefetch.prefetch("11", tamanho, 2.0)
+        self._aguardar(lambda: self.prefetch.obter(familia, tamanho, 2.0) is not None)
+        pixmap = self.prefetch.obter(familia, tamanho, 2.0)
+        self.assertEqual((pixmap.width(), pixmap.height(), pixmap.devicePixelRatio()), (800, 600, 2.0))
+        self.assertIsNone(self.prefetch.obter(familia, tamanho))
+
+if __name__ == '__main__':
+    unittest.main()